@@ -1,345 +1,1688 @@
 import datetime
-import requests 
 import os
-import argparse
-import re
 import json
-from dateutil.easter import easter
-from dateutil.relativedelta import relativedelta as rd, FR
-from holidays.constants import JAN, MAY, AUG, OCT, NOV, DEC
-from holidays.holiday_base import HolidayBase
+import csv
+import sys
+import itertools
+import functools
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
 
-class HolidayEcuador(HolidayBase):
+# numpy, requests, holidays, dateutil, asyncio, http.server, concurrent.futures
+# y argparse se importan dentro de las funciones que los usan, para que
+# importar el módulo sea rápido (ver benchmarks/bench_arranque.py)
+
+# Meses (los mismos valores que holidays.constants)
+JAN, FEB, MAR, APR, MAY, JUN, JUL, AUG, SEP, OCT, NOV, DEC = range(1, 13)
+
+#-------------------------------------------------------- MÉTRICAS --------------------------------------------#
+
+# Límites (en segundos) de los histogramas de tiempos
+LIMITES_HISTOGRAMA = (0.00001, 0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# Descripción de cada métrica para la exportación en formato Prometheus
+DESCRIPCION_METRICAS = {
+    "acredita_calendario_construccion_segundos": "Tiempo de construir un calendario (tipo=anio) o el índice de una provincia (tipo=indice)",
+    "acredita_cache_calendarios_total": "Consultas a CACHE_CALENDARIOS por resultado (acierto/fallo)",
+    "acredita_consultas_feriado_total": "Fechas consultadas en el calendario sin conexión",
+    "acredita_api_latencia_segundos": "Latencia de las peticiones a la API de feriados en línea",
+    "acredita_api_peticiones_total": "Peticiones a la API de feriados en línea por código de estado",
+    "acredita_api_errores_total": "Peticiones a la API fallidas por tipo de error",
+    "acredita_api_reintentos_total": "Reintentos de peticiones a la API",
+    "acredita_api_respaldo_total": "Años resueltos con el calendario sin conexión porque la API falló",
+    "acredita_api_cache_disco_total": "Lecturas de la caché en disco de la API por resultado",
+    "acredita_reglas_total": "Evaluaciones de reglas de elegibilidad por regla y resultado",
+}
+
+
+class Metricas:
     """
-    Una clase para representar un feriado en Ecuador por provincia (HolidayEcuador)
-    Su objetivo es determinar si un
-    fecha específica es u nas vacaciones lo más rápido y flexible posible.
-    https://www.turismo.gob.ec/wp-content/uploads/2020/03/CALENDARIO-DE-FERIADOS.pdf
+    Contadores e histogramas de tiempo de las rutas críticas del módulo.
+
+    Están desactivadas por defecto (o activadas con la variable de entorno
+    ACREDITA_METRICAS=1); mientras lo están, cada punto de medición cuesta
+    solo la comprobación de `activo`. Se exportan como JSON o en el formato
+    de texto de Prometheus.
     ...
-    Atributos (Hereda la clase HolidayBase)
+    Atributos
     ----------
-    prueba: calle
-        código de provincia según ISO3166-2
+    activo: bool
+        si es False no se registra nada
     Métodos
     -------
-    __init__(self, plate, date, time, online=False):
-        Construye todos los atributos necesarios para el objeto HolidayEcuador.
-    _poblar(uno mismo, año):
-        Devoluciones si una fecha es feriado o no
-    """     
-    # Códigos ISO 3166-2 para las principales subdivisiones,
-    # provincias llamadas
-    # https://es.wikipedia.org/wiki/ISO_3166-2:EC
-    PROVINCES = ["EC-P"]  # TODO añadir más provincias
-
-    def __init__(self, **kwargs):
-        """
-        Construye todos los atributos necesarios para el objeto HolidayEcuador
-        """         
-        self.country = "ECU"
-        self.prov = kwargs.pop("prov", "ON")
-        HolidayBase.__init__(self, **kwargs)
-
-    def _populate(self, year):
-        """
-        Comprueba si una fecha es feriado o no
-        
-        Parámetros
-        ----------
-        año: calle
-            año de una fecha
-        Devoluciones
-        -------
-        Devuelve verdadero si una fecha es un día festivo, de lo contrario, se muestra como verdadero.
-        """
-        # Festividades santo domingo
-        self[easter(year, 7, 3)] = "Cantonalización de Santo Domingo" 
-        self[easter(year, 11, 6)] = "Provincialización de Santo Domingo"
+    contar(nombre, valor=1, **etiquetas):
+        Suma valor a un contador
+    observar(nombre, segundos, **etiquetas):
+        Registra un tiempo en un histograma
+    json():
+        Devuelve todas las métricas como diccionario
+    prometheus():
+        Devuelve todas las métricas en el formato de texto de Prometheus
+    extraer():
+        Devuelve las métricas como diccionario y las reinicia
+    combinar(datos):
+        Suma las métricas de un diccionario devuelto por json() o extraer()
+    """
+
+    def __init__(self, activo=False, limites=LIMITES_HISTOGRAMA):
+        self.activo = activo
+        self.limites = tuple(limites)
+        self._contadores = {}
+        self._histogramas = {}
+        self._candado = threading.Lock()
+
+    def activar(self, activo=True):
+        self.activo = activo
+
+    def contar(self, nombre, valor=1, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._candado:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def observar(self, nombre, segundos, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._candado:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            conteos = histograma[0]
+            for i, limite in enumerate(self.limites):
+                if segundos <= limite:
+                    conteos[i] += 1
+                    break
+            else:
+                conteos[-1] += 1
+            histograma[1] += segundos
+            histograma[2] += 1
+
+    def _datos(self):
+        # debe llamarse con el candado tomado
+        return {
+            "contadores": [{"nombre": n, "etiquetas": dict(e), "valor": v}
+                           for (n, e), v in sorted(self._contadores.items(), key=str)],
+            "histogramas": [{"nombre": n, "etiquetas": dict(e), "limites": list(self.limites),
+                             "conteos": list(h[0]), "suma": h[1], "total": h[2]}
+                            for (n, e), h in sorted(self._histogramas.items(), key=str)],
+        }
+
+    def json(self):
+        with self._candado:
+            return self._datos()
+
+    def extraer(self):
+        with self._candado:
+            datos = self._datos()
+            self._contadores.clear()
+            self._histogramas.clear()
+        return datos
+
+    def combinar(self, datos):
+        with self._candado:
+            for contador in datos["contadores"]:
+                clave = (contador["nombre"], tuple(sorted(contador["etiquetas"].items())))
+                self._contadores[clave] = self._contadores.get(clave, 0) + contador["valor"]
+            for entrada in datos["histogramas"]:
+                clave = (entrada["nombre"], tuple(sorted(entrada["etiquetas"].items())))
+                histograma = self._histogramas.setdefault(clave, [[0] * (len(self.limites) + 1), 0.0, 0])
+                histograma[0] = [a + b for a, b in zip(histograma[0], entrada["conteos"])]
+                histograma[1] += entrada["suma"]
+                histograma[2] += entrada["total"]
+
+    def limpiar(self):
+        with self._candado:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def prometheus(self):
+        datos = self.json()
+        lineas = []
+        vistos = set()
+
+        def encabezado(nombre, tipo):
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# HELP {nombre} {DESCRIPCION_METRICAS.get(nombre, nombre)}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+
+        def escapar(valor):
+            # formato de texto de Prometheus: \\, \" y \n dentro del valor de una etiqueta
+            return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def etiquetas(valores, **extra):
+            pares = [f'{k}="{escapar(v)}"' for k, v in list(valores.items()) + list(extra.items())]
+            return "{" + ",".join(pares) + "}" if pares else ""
+
+        for contador in datos["contadores"]:
+            encabezado(contador["nombre"], "counter")
+            lineas.append(f"{contador['nombre']}{etiquetas(contador['etiquetas'])} {contador['valor']}")
+        for histograma in datos["histogramas"]:
+            nombre = histograma["nombre"]
+            encabezado(nombre, "histogram")
+            acumulado = 0
+            for limite, conteo in zip(histograma["limites"] + ["+Inf"], histograma["conteos"]):
+                acumulado += conteo
+                lineas.append(f"{nombre}_bucket{etiquetas(histograma['etiquetas'], le=limite)} {acumulado}")
+            lineas.append(f"{nombre}_sum{etiquetas(histograma['etiquetas'])} {histograma['suma']}")
+            lineas.append(f"{nombre}_count{etiquetas(histograma['etiquetas'])} {histograma['total']}")
+        return "\n".join(lineas) + "\n"
+
+
+# Métricas de todo el proceso
+METRICAS = Metricas(activo=os.environ.get("ACREDITA_METRICAS", "") not in ("", "0"))
+
+
+#-------------------------------------------------------- REGLAS DE FERIADOS --------------------------------------------#
 
+# Una regla de feriado. Si mes es PASCUA, dia es el desplazamiento en días
+# desde el domingo de Pascua. traslado es una tabla por día de la semana
+# (lunes=0) con los días que se mueve el feriado, aplicada desde el año `desde`
+# (None = siempre).
+Regla = namedtuple("Regla", "nombre mes dia traslado desde", defaults=(None, None))
+
+PASCUA = 0
+
+# (Ley 858/Ley de Reforma a la LOSEP (vigente desde el 21 de diciembre de 2016 /R.O # 906))
+# Si el feriado cae en sábado o martes el descanso obligatorio irá al viernes o
+# lunes inmediato anterior; si cae en domingo, al lunes siguiente; si cae en
+# miércoles o jueves, al viernes de esa semana
+LEY_858 = (0, -1, 2, 1, 0, -1, 1)
+LEY_858_DESDE = 2016
+
+# Día de difuntos: de sábado pasa al viernes y de miércoles o domingo se
+# mueve dos días, para unirlo con el feriado del 3 de noviembre
+TRASLADO_DIFUNTOS = (0, 0, 2, 0, 0, -1, 2)
+
+REGLAS_NACIONALES = (
+    Regla("Año Nuevo [New Year's Day]", JAN, 1),
+    Regla("Lunes de carnaval [Carnival of Monday)]", PASCUA, -48),
+    Regla("Martes de carnaval [Tuesday of Carnival)]", PASCUA, -47),
+    Regla("Semana Santa (Viernes Santo) [Good Friday)]", PASCUA, -2),
+    Regla("Día de Pascuas [Easter Day]", PASCUA, 0),
+    Regla("Día Nacional del Trabajo [Labour Day]", MAY, 1, LEY_858, LEY_858_DESDE),
+    Regla("Batalla del Pichincha [Pichincha Battle]", MAY, 24, LEY_858, LEY_858_DESDE),
+    Regla("Primer Grito de la Independencia [First Cry of Independence]", AUG, 10, LEY_858, LEY_858_DESDE),
+    Regla("Independencia de Guayaquil [Guayaquil's Independence]", OCT, 9, LEY_858, LEY_858_DESDE),
+    Regla("Día de los difuntos [Day of the Dead]", NOV, 2, TRASLADO_DIFUNTOS),
+    Regla("Navidad [Christmas]", DEC, 25),
+)
+
+# Provincias según ISO 3166-2:EC con sus feriados provinciales y cantonales
+# (los de la capital provincial)
+PROVINCIAS = {
+    "EC-A": ("Azuay", (Regla("Independencia de Cuenca", NOV, 3),)),
+    "EC-B": ("Bolívar", (Regla("Provincialización de Bolívar", APR, 23),)),
+    "EC-F": ("Cañar", (Regla("Provincialización de Cañar", NOV, 3),)),
+    "EC-C": ("Carchi", (Regla("Provincialización de Carchi", NOV, 19),)),
+    "EC-H": ("Chimborazo", (Regla("Independencia de Riobamba", NOV, 11),)),
+    "EC-X": ("Cotopaxi", (Regla("Independencia de Latacunga", NOV, 11),)),
+    "EC-O": ("El Oro", (Regla("Provincialización de El Oro", APR, 23),)),
+    "EC-E": ("Esmeraldas", (Regla("Independencia de Esmeraldas", AUG, 5),)),
+    "EC-W": ("Galápagos", (Regla("Provincialización de Galápagos", FEB, 18),)),
+    "EC-G": ("Guayas", (Regla("Fundación de Guayaquil", JUL, 25),)),
+    "EC-I": ("Imbabura", (Regla("Fundación de Ibarra", SEP, 28),)),
+    "EC-L": ("Loja", (Regla("Independencia de Loja", NOV, 18),)),
+    "EC-R": ("Los Ríos", (Regla("Provincialización de Los Ríos", OCT, 6),)),
+    "EC-M": ("Manabí", (Regla("Provincialización de Manabí", JUN, 25),)),
+    "EC-S": ("Morona Santiago", (Regla("Provincialización de Morona Santiago", FEB, 24),)),
+    "EC-N": ("Napo", (Regla("Día del Oriente", FEB, 12),)),
+    "EC-D": ("Orellana", (Regla("Provincialización de Orellana", JUL, 30),)),
+    "EC-Y": ("Pastaza", (Regla("Fundación de Puyo", MAY, 12),)),
+    # Fundación de Quito, las reglas son las mismas que el día del trabajo
+    "EC-P": ("Pichincha", (Regla("Fundación de Quito [Foundation of Quito]", DEC, 6, LEY_858, LEY_858_DESDE),)),
+    "EC-SE": ("Santa Elena", (Regla("Provincialización de Santa Elena", NOV, 7),)),
+    "EC-SD": ("Santo Domingo de los Tsáchilas", (
+        Regla("Cantonalización de Santo Domingo", JUL, 3),
+        Regla("Provincialización de Santo Domingo", NOV, 6),
         # Festividades parroquiales 'Luz de américa'
-        self[easter(year, 8, 2)] = "Fiestas patronales"
+        Regla("Fiestas patronales", AUG, 2),
+    )),
+    "EC-U": ("Sucumbíos", (Regla("Provincialización de Sucumbíos", FEB, 13),)),
+    "EC-T": ("Tungurahua", (Regla("Independencia de Ambato", NOV, 12),)),
+    "EC-Z": ("Zamora Chinchipe", (Regla("Provincialización de Zamora Chinchipe", FEB, 10),)),
+}
 
-        # Día de Año Nuevo 
-        self[datetime.date(year, JAN, 1)] = "Año Nuevo [New Year's Day]"
-        
-        # Navidad
-        self[datetime.date(year, DEC, 25)] = "Navidad [Christmas]"
-        
-        # semana Santa
-        self[easter(year) + rd(weekday=FR(-1))] = "Semana Santa (Viernes Santo) [Good Friday)]"
-        self[easter(year)] = "Día de Pascuas [Easter Day]"
-        
-        # Carnaval
-        total_lent_days = 46
-        self[easter(year) - datetime.timedelta(days=total_lent_days+2)] = "Lunes de carnaval [Carnival of Monday)]"
-        self[easter(year) - datetime.timedelta(days=total_lent_days+1)] = "Martes de carnaval [Tuesday of Carnival)]"
-        
-        # Día laboral
-        trabajo = "Día Nacional del Trabajo [Labour Day]"
-        # (Ley 858/Ley de Reforma a la LOSEP (vigente desde el 21 de diciembre de 2016 /R.O # 906)) Si el feriado cae en sábado o martes
-        # el descanso obligatorio irá al viernes o lunes inmediato anterior
-        # respectivamente
-        if year > 2015 and datetime.date(year, MAY, 1).weekday() in (5,1):
-            self[datetime.date(year, MAY, 1) - datetime.timedelta(days=1)] = trabajo
-        # (Ley 858/Ley de Reforma a la LOSEP (vigente desde el 21 de diciembre de 2016 /R.O # 906)) si el feriado cae en domingo
-        # el descanso obligatorio sera para el lunes siguiente
-        elif year > 2015 and datetime.date(year, MAY, 1).weekday() == 6:
-            self[datetime.date(year, MAY, 1) + datetime.timedelta(days=1)] = trabajo
-        # (Ley 858/Ley de Reforma a la LOSEP (vigente desde el 21 de diciembre de 2016 /R.O # 906)) Feriados que sean en miércoles o jueves
-        # se moverá al viernes de esa semana
-        elif year > 2015 and  datetime.date(year, MAY, 1).weekday() in (2,3):
-            self[datetime.date(year, MAY, 1) + rd(weekday=FR)] = trabajo
-        else:
-            self[datetime.date(year, MAY, 1)] = trabajo
-        
-        # Batalla de Pichincha, las reglas son las mismas que el día del trabajo
-        batalla = "Batalla del Pichincha [Pichincha Battle]"
-        if year > 2015 and datetime.date(year, MAY, 24).weekday() in (5,1):
-            self[datetime.date(year, MAY, 24).weekday() - datetime.timedelta(days=1)] = batalla
-        elif year > 2015 and datetime.date(year, MAY, 24).weekday() == 6:
-            self[datetime.date(year, MAY, 24) + datetime.timedelta(days=1)] = batalla
-        elif year > 2015 and  datetime.date(year, MAY, 24).weekday() in (2,3):
-            self[datetime.date(year, MAY, 24) + rd(weekday=FR)] = batalla
-        else:
-            self[datetime.date(year, MAY, 24)] = batalla        
-        
-        # Primer Grito de Independencia, las reglas son las mismas que el día del trabajo
-        grito = "Primer Grito de la Independencia [First Cry of Independence]"
-        if year > 2015 and datetime.date(year, AUG, 10).weekday() in (5,1):
-            self[datetime.date(year, AUG, 10)- datetime.timedelta(days=1)] = grito
-        elif year > 2015 and datetime.date(year, AUG, 10).weekday() == 6:
-            self[datetime.date(year, AUG, 10) + datetime.timedelta(days=1)] = grito
-        elif year > 2015 and  datetime.date(year, AUG, 10).weekday() in (2,3):
-            self[datetime.date(year, AUG, 10) + rd(weekday=FR)] = grito
-        else:
-            self[datetime.date(year, AUG, 10)] = grito       
-        
-        # Independencia de Guayaquil, las reglas son las mismas que el día del trabajo
-        independencia = "Independencia de Guayaquil [Guayaquil's Independence]"
-        if year > 2015 and datetime.date(year, OCT, 9).weekday() in (5,1):
-            self[datetime.date(year, OCT, 9) - datetime.timedelta(days=1)] = independencia
-        elif year > 2015 and datetime.date(year, OCT, 9).weekday() == 6:
-            self[datetime.date(year, OCT, 9) + datetime.timedelta(days=1)] = independencia
-        elif year > 2015 and  datetime.date(year, MAY, 1).weekday() in (2,3):
-            self[datetime.date(year, OCT, 9) + rd(weekday=FR)] = independencia
-        else:
-            self[datetime.date(year, OCT, 9)] = independencia        
-        
-        # Día de Muertos
-        fieles = "Día de los difuntos [Day of the Dead]" 
-        if (datetime.date(year, NOV, 2).weekday() == 5 and  datetime.date(year, NOV, 3).weekday() == 6):
-            self[datetime.date(year, NOV, 2) - datetime.timedelta(days=1)] = fieles    
-        elif (datetime.date(year, NOV, 3).weekday() == 2):
-            self[datetime.date(year, NOV, 2)] = fieles
-        elif (datetime.date(year, NOV, 3).weekday() == 3):
-            self[datetime.date(year, NOV, 2) + datetime.timedelta(days=2)] = fieles
-        elif (datetime.date(year, NOV, 3).weekday() == 5):
-            self[datetime.date(year, NOV, 2)] =  fieles
-        elif (datetime.date(year, NOV, 3).weekday() == 0):
-            self[datetime.date(year, NOV, 2) + datetime.timedelta(days=2)] = fieles
+# Versión de la forma en que compilarFeriados aplica las reglas (Pascua,
+# traslado, desde). Se incrementa al cambiar su lógica aunque las tablas sigan
+# iguales, porque forma parte de huellaReglas y las instantáneas guardadas
+# con la versión anterior se vuelven a generar.
+VERSION_COMPILADOR = 1
+
+# Ordinal del 1970-01-01, origen de numpy.datetime64
+_ORDINAL_1970 = datetime.date(1970, JAN, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=None)
+def reglasProvincia(prov):
+    """
+    Devuelve las reglas (nacionales y provinciales) de una provincia
+
+    Una provincia que no está en PROVINCIAS solo tiene los feriados nacionales.
+    """
+    return REGLAS_NACIONALES + PROVINCIAS.get(prov, (None, ()))[1]
+
+
+@functools.lru_cache(maxsize=64)
+def _pascuas(desde, hasta):
+    """Ordinales del domingo de Pascua de cada año desde..hasta"""
+    from dateutil.easter import easter
+    import numpy as np
+    pascuas = np.array([easter(anio).toordinal() for anio in range(desde, hasta + 1)], dtype=np.int64)
+    pascuas.flags.writeable = False
+    return pascuas
+
+
+def compilarFeriados(prov, desde, hasta):
+    """
+    Evalúa las reglas de una provincia para todos los años desde..hasta a la vez
+
+    Cada regla se calcula con operaciones de NumPy sobre el arreglo de años,
+    así que el costo depende del número de reglas y no de años por reglas.
+
+     RETORNA
+     ----------
+         dict
+             Diccionario {ordinal de fecha: nombre del feriado}; si dos
+             feriados caen el mismo día sus nombres se unen con "; "
+    """
+    import numpy as np
+    anios = np.arange(desde, hasta + 1, dtype=np.int64)
+    feriados = {}
+    for regla in reglasProvincia(prov):
+        if regla.mes == PASCUA:
+            ordinales = _pascuas(desde, hasta) + regla.dia
         else:
-            self[datetime.date(year, NOV, 2)] = fieles
-            
-        # Fundación de Quito, aplica solo para la provincia de Pichincha,
-        # las reglas son las mismas que el día del trabajo
-        Fundacion = "Fundación de Quito [Foundation of Quito]"        
-        if self.prov in ("EC-P"):
-            if year > 2015 and datetime.date(year, DEC, 6).weekday() in (5,1):
-                self[datetime.date(year, DEC, 6) - datetime.timedelta(days=1)] = Fundacion
-            elif year > 2015 and datetime.date(year, DEC, 6).weekday() == 6:
-                self[(datetime.date(year, DEC, 6).weekday()) + datetime.timedelta(days=1)] =Fundacion
-            elif year > 2015 and  datetime.date(year, DEC, 6).weekday() in (2,3):
-                self[datetime.date(year, DEC, 6) + rd(weekday=FR)] = Fundacion
-            else:
-                self[datetime.date(year, DEC, 6)] = Fundacion
+            meses = (anios - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (regla.mes - 1)
+            ordinales = meses.astype("datetime64[D]").astype(np.int64) + (regla.dia - 1) + _ORDINAL_1970
+        if regla.traslado is not None:
+            # el ordinal 1 (0001-01-01) es lunes
+            traslado = np.asarray(regla.traslado)[(ordinales - 1) % 7]
+            if regla.desde is not None:
+                traslado = np.where(anios >= regla.desde, traslado, 0)
+            ordinales = ordinales + traslado
+        for ordinal in ordinales.tolist():
+            feriados[ordinal] = f"{feriados[ordinal]}; {regla.nombre}" if ordinal in feriados else regla.nombre
+    return feriados
 
 
+def calcularFeriados(prov, anio):
+    """
+    Calcula los feriados de un año para una provincia
 
-class PersonaBono:
-    '''
-        La clase persona bono servirá para identificar si una persona es beneficiaria
-        al bono de desarrollo humano que entrega el gobiendo nacional juntos con el 
-        Ministerio de Inclusión Económica y Socia:
-        http://www.ecuadorlegalonline.com/consultas/consultar-si-cobro-el-bono-de-emergencia-del-mies/
+    Parámetros
+    ----------
+    prov: calle
+        código de provincia según ISO3166-2
+    año: int
+        año de una fecha
+    Devoluciones
+    -------
+    Un diccionario {fecha: nombre del feriado}
+    """
+    return {datetime.date.fromordinal(ordinal): nombre
+            for ordinal, nombre in compilarFeriados(prov, anio, anio).items()}
 
-         PARAMETROS
-         -----------
-             nombre:str
-                 Es el nombre del supuesto usuario beneficiario al bono.
-             sexo:str
-                 Corresponde a la indentidad sexual del usuario.
-             edad:int
-                 Años de vida que tiene el usuario.
-             fecha:str
-                Fecha en la que el usuario desee retirar su crédito.
-                Sigue el formato ISO 8601 AAAA-MM-DD: por ejemplo, 2020-04-22
-             ocupacion:str
-                 Corresponde al oficio al que actualmente se dedica el usuario.
-             ingresos:float
-                 Es la cantidad económica con la que cuenta el usuario.
-             enfermedades:str
-                 Son los problema de salud que el usuaria pueda tener
-             online: booleano, opcional
-                 si en línea == Verdadero, se utilizará la API de días festivos abstractos
-             hijos:array
-                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
-                 beneficiaria o beneficiario al bono.
+
+_CANDADO_CLASES = threading.Lock()
+
+
+def _crearHolidayEcuador():
+    """
+    Define la clase HolidayEcuador. Se llama la primera vez que se usa
+    Acredita.HolidayEcuador, porque importar holidays es costoso y solo se
+    necesita para ofrecer la interfaz de HolidayBase.
+    """
+    from holidays.holiday_base import HolidayBase
+
+    class HolidayEcuador(HolidayBase):
+        """
+        Una clase para representar un feriado en Ecuador por provincia (HolidayEcuador)
+        Su objetivo es determinar si un
+        fecha específica es u nas vacaciones lo más rápido y flexible posible.
+        https://www.turismo.gob.ec/wp-content/uploads/2020/03/CALENDARIO-DE-FERIADOS.pdf
+        ...
+        Atributos (Hereda la clase HolidayBase)
+        ----------
+        prueba: calle
+            código de provincia según ISO3166-2
+        Métodos
+        -------
+        __init__(self, plate, date, time, online=False):
+            Construye todos los atributos necesarios para el objeto HolidayEcuador.
+        _poblar(uno mismo, año):
+            Devoluciones si una fecha es feriado o no
+        """     
+        # Códigos ISO 3166-2 para las principales subdivisiones,
+        # provincias llamadas
+        # https://es.wikipedia.org/wiki/ISO_3166-2:EC
+        PROVINCES = sorted(PROVINCIAS)
+
+        def __init__(self, **kwargs):
+            """
+            Construye todos los atributos necesarios para el objeto HolidayEcuador
+            """         
+            self.country = "ECU"
+            self.prov = kwargs.pop("prov", "ON")
+            HolidayBase.__init__(self, **kwargs)
+
+        def _populate(self, year):
+            """
+            Comprueba si una fecha es feriado o no
         
-         METODOS
-         -----------
-             __init__(self, nombre, sexo, edad, ocupacion, ingresos, enfermedades):
-                 Este método sive para construir todolos los métodos correspondientes al 
-                 objeto personaBono
-             esMujer(hijos):
-                 Este método sirve para los beneficiarios que son de sexo femenino, ya que
-                 para mujeres hay otro tipo de bonificaciones según sus condiciones. Retorna
-                 una lista de nombre de los hijos con los datos de cada uno de ellos.
-             esHombre(SeguroSocial):
-                 Este método funciona para las personas de sexo masculino, ya que para ellos
-                 existen varias restricciones al momento de la bonificación, una de ellas es que
-                 la persona debe superar los 65 años de edad o lo que es lo mismo que deber ser
-                 un adulto mayor. Retornando un condicional que valide lo antes mencionado.
-             discapacidad():
-                 Este método es creado para las personas que tienen algún tipo de capacidad diferente
-                 ya que ellos también son beneficiarios al bono de desarrollo humano. Retornando un
-                 condicional que valide este método. 
-             fecha (uno mismo):
-                 Obtiene el valor del atributo de fecha
-             fecha (auto, valor):
-                 Establece el valor del atributo de fecha
-             __encontrarDia(fecha):
-                 Devuelve el día a partir de la fecha: por ejemplo, miércoles
-             __esFeriado:
-                 Devuelve True si la fecha marcada (en formato ISO 8601 AAAA-MM-DD) es un día festivo
-                en Ecuador, de lo contrario, False
+            Parámetros
+            ----------
+            año: calle
+                año de una fecha
+            Devoluciones
+            -------
+            Devuelve verdadero si una fecha es un día festivo, de lo contrario, se muestra como verdadero.
+            """
+            # Las reglas del año se compilan una sola vez por proceso en el
+            # índice de feriados (o en la caché para años fuera de su rango)
+            for fecha, nombre in INDICE_FERIADOS.feriadosDelAnio(self.prov, year).items():
+                self[fecha] = nombre
 
-        '''
-    #Días de la semana
-    __days = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
+        @staticmethod
+        def _reglas(prov, year):
+            """
+            Calcula los feriados de un año para una provincia (ver calcularFeriados)
+            """
+            return calcularFeriados(prov, year)
 
-    #Fines de semana
-    __FinSemana = {"Saturday": [],"Sunday": []}
+    HolidayEcuador.__qualname__ = "HolidayEcuador"
+    return HolidayEcuador
 
-    def __init__(self, nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, API=False):
+
+def __getattr__(nombre):
+    """Crea HolidayEcuador al primer acceso (PEP 562)"""
+    if nombre == "HolidayEcuador":
+        with _CANDADO_CLASES:
+            if "HolidayEcuador" not in globals():
+                globals()["HolidayEcuador"] = _crearHolidayEcuador()
+        return globals()["HolidayEcuador"]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+class CacheCalendarios:
+    """
+    Caché de calendarios de feriados compartida por todo el proceso.
+
+    Guarda los feriados ya calculados por (provincia, año) para que consultar
+    si una fecha es feriado cueste una búsqueda en un diccionario en lugar de
+    reconstruir el calendario completo. Es segura entre hilos y descarta los
+    calendarios menos usados cuando supera su capacidad (LRU).
+    ...
+    Atributos
+    ----------
+    capacidad: int
+        número máximo de calendarios (provincia, año) que se mantienen en memoria
+    aciertos: int
+        consultas resueltas desde la caché
+    fallos: int
+        consultas que tuvieron que construir el calendario
+    Métodos
+    -------
+    obtener(prov, anio):
+        Devuelve el diccionario {fecha: nombre} de los feriados del año
+    esFeriado(prov, fecha):
+        Devuelve True si la fecha es feriado en la provincia
+    precargar(provincias, desde, hasta):
+        Construye de antemano los calendarios de un rango de años
+    limpiar():
+        Vacía la caché
+    """
+
+    def __init__(self, capacidad=256):
         """
-        Construye todos los atributos necesarios para los objetos de la clase PersonaBono
+        Construye todos los atributos necesarios para el objeto CacheCalendarios
+        """
+        if capacidad < 1:
+            raise ValueError('La capacidad de la caché debe ser mayor que cero')
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self._calendarios = OrderedDict()
+        self._candado = threading.Lock()
 
-         PARAMETROS
-         -----------
-             nombre:str
-                 Es el nombre del supuesto usuario beneficiario al bono.
-             sexo:str
-                 Corresponde a la indentidad sexual del usuario.
-             edad:int
-                 Años de vida que tiene el usuario.
-             fecha:str
-                Fecha en la que el usuario desee retirar su crédito.
-                Sigue el formato ISO 8601 AAAA-MM-DD: por ejemplo, 2020-04-22
-             ocupacion:str
-                 Corresponde al oficio al que actualmente se dedica el usuario.
-             ingresos:float
-                 Es la cantidad económica con la que cuenta el usuario.
-             enfermedades:str
-                 Son los problema de salud que el usuaria pueda tener
-             online: booleano, opcional
-                 si en línea == Verdadero, se utilizará la API de días festivos abstractos
-             hijos:array
-                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
-                 beneficiaria o beneficiario al bono.
+    def __len__(self):
+        return len(self._calendarios)
+
+    def obtener(self, prov, anio):
         """
-        self.nombre=nombre
-        self.sexo=sexo
-        self.edad=edad
-        self._fecha=fecha
-        self.ocupacion=ocupacion
-        self.ingresos=ingresos
-        self.enfermedades=enfermedades
-        self.online = API
-        self.hijos=[]
+        Devuelve los feriados de un año para una provincia
 
-    def esMujer (self, hijos):
-        '''
-        Método que da los resultados correspondietes para las personas de sexo femenino
          PARAMETROS
          -----------
-             hijos:array
-                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
-                 beneficiaria al bono de desarrollo humano.
+             prov:str
+                 código de provincia según ISO3166-2
+             anio:int
+                 año del calendario
          RETORNA
          ----------
-             return (hijos in self.hijos):
-                 Retorno de un lista de los detalles de los hijos de la usuaria para determinar
-                 si es beneficiaria o no al bono de desarrollo humano.
-        '''
-        return (hijos in self.hijos)
+             dict
+                 Diccionario {fecha: nombre del feriado}. No debe modificarse,
+                 es compartido por todos los que consultan la caché.
+        """
+        clave = (prov, anio)
+        with self._candado:
+            feriados = self._calendarios.get(clave)
+            if feriados is not None:
+                self._calendarios.move_to_end(clave)
+                self.aciertos += 1
+                if METRICAS.activo:
+                    METRICAS.contar("acredita_cache_calendarios_total", resultado="acierto")
+                return feriados
+            self.fallos += 1
+        # El calendario se calcula fuera del candado para no bloquear a los
+        # demás hilos; si dos hilos lo calculan a la vez gana el primero
+        medir = METRICAS.activo
+        if medir:
+            inicio = time.perf_counter()
+        feriados = calcularFeriados(prov, anio)
+        if medir:
+            METRICAS.contar("acredita_cache_calendarios_total", resultado="fallo")
+            METRICAS.observar("acredita_calendario_construccion_segundos", time.perf_counter() - inicio, tipo="anio")
+        with self._candado:
+            feriados = self._calendarios.setdefault(clave, feriados)
+            self._calendarios.move_to_end(clave)
+            while len(self._calendarios) > self.capacidad:
+                self._calendarios.popitem(last=False)
+        return feriados
+
+    def esFeriado(self, prov, fecha):
+        """
+        Devuelve True si la fecha (datetime.date) es feriado en la provincia
+        """
+        return fecha in self.obtener(prov, fecha.year)
+
+    def precargar(self, provincias, desde, hasta):
+        """
+        Construye de antemano los calendarios de los años desde..hasta (incluidos)
 
-    def esHombre (self, seguroSocial):
-        '''
-        Método que sirve para darle resultados al usuario de sexo masculino.
-         
          PARAMETROS
-         ------------
-             seguroSocial:str
-                 Este parámetro servirá para identificar si la persona tiene algun seguridad social.
-                 Ya que si cuentacon una entonces no podrárecibir el bono de desarrollo humano.
-        
-         RETORNA
-         ----------
-             return True:
-                 Retorna VERDADERO si el usuario excede los años de vida mayore o igual a 65, caso 
-                 contrario retornará un falso.
-        '''
-        self.seguroSocial=seguroSocial
-        if (self.edad >=65):
-            return True
+         -----------
+             provincias:str o list
+                 código o lista de códigos de provincia según ISO3166-2
+             desde:int
+                 primer año a precargar
+             hasta:int
+                 último año a precargar
+        """
+        if isinstance(provincias, str):
+            provincias = [provincias]
+        for prov in provincias:
+            for anio in range(desde, hasta + 1):
+                self.obtener(prov, anio)
 
-    def discapacidad (self):
-        '''
-        Método que sirve para determinar si el usuario posee alguna discapacidad
-         RETORNA
-         ---------
-             return True:
-                 retorna verdadero si el usuario responde si alguna enfermedad que le imposibilite
-                 realizar determinadas actividades.
-        '''
-        if (self.enfermedades=="Si"):
-            return True
+    def limpiar(self):
+        """Vacía la caché y reinicia sus contadores"""
+        with self._candado:
+            self._calendarios.clear()
+            self.aciertos = 0
+            self.fallos = 0
 
-    @property
-    def fecha(self):
-        """Obtiene el valor del atributo de fecha"""
-        return self._fecha
 
+# Caché compartida por HolidayEcuador y PersonaBono.evaluar() para los años
+# fuera del rango del índice de feriados
+CACHE_CALENDARIOS = CacheCalendarios()
 
-    @fecha.setter
-    def fecha(self, valor):
-        """
-        Establece el valor del atributo de fecha
 
-         Parámetros
-         ----------
-             valor: cadena
-        
-         aumenta
-         ------
-             ValorError
-                 Si la cadena de valor no tiene el formato AAAA-MM-DD (por ejemplo, 2021-04-02)
-        """
-        try:
-            if len(valor) != 10:
-                raise ValueError
-            datetime.datetime.strptime(valor, "%Y-%m-%d")
-        except ValueError:
-            raise ValueError('La fecha debe tener el siguiente formato: AAAA-MM-DD (por ejemplo: 2021-04-02)') from None
-        self._fecha = valor
+# Formato de la instantánea de IndiceFeriados (ver IndiceFeriados.guardar):
+# un encabezado fijo, un directorio JSON y los arreglos de cada provincia
+# alineados a 8 bytes, que los procesos leen con mmap sin copiarlos.
+FORMATO_INSTANTANEA = 1
+_MAGIA_INSTANTANEA = b"ACREDITA"
+_ENCABEZADO_INSTANTANEA = "<8sHH32sI"   # magia, versión, reservado, huella de las reglas, bytes del directorio
+_ARREGLOS_INSTANTANEA = (("mapa", "|b1"), ("acumulado", "<i4"), ("feriados", "<i4"), ("indices", "<u2"))
 
-    def __esFeriado(self, date, enLinea ):
-        ''' esta parte contine las condiciones para ver si hay feriado o no en un fecha indicada.
-            
-            parametros
-            ------------
-            tenemos:
-            - date - el cual es la fecha que tenemos o ingresamos.
+
+def huellaReglas():
+    """
+    Huella SHA-256 de las tablas de reglas de feriados y de VERSION_COMPILADOR;
+    cambia si se modifica cualquier regla nacional o provincial o la forma de
+    compilarlas
+    """
+    import hashlib
+    tablas = (VERSION_COMPILADOR, REGLAS_NACIONALES, sorted((prov, reglas) for prov, (_, reglas) in PROVINCIAS.items()))
+    return hashlib.sha256(repr(tablas).encode("utf-8")).digest()
+
+
+def _alinear(posicion):
+    return (posicion + 7) & ~7
+
+
+def _etiquetaProvincia(prov):
+    """Etiqueta de métrica de una provincia: los códigos desconocidos se agrupan para no crear una serie por cada uno"""
+    return prov if prov in PROVINCIAS else "otra"
+
+
+class IndiceFeriados:
+    """
+    Índice compilado de feriados por provincia.
+
+    Para cada provincia guarda un mapa de bits (un arreglo booleano de NumPy)
+    indexado por el ordinal de la fecha desde el 1 de enero de `desde` hasta el
+    31 de diciembre de `hasta`. Se construye una sola vez a partir de las reglas
+    de HolidayEcuador y responde si una fecha es feriado con un acceso a un
+    arreglo. Las provincias se compilan la primera vez que se consultan; los
+    años fuera del rango se resuelven con CACHE_CALENDARIOS.
+    ...
+    Atributos
+    ----------
+    desde: int
+        primer año compilado
+    hasta: int
+        último año compilado
+    Métodos
+    -------
+    esFeriado(prov, ordinal):
+        Devuelve True si el ordinal de fecha es feriado en la provincia
+    esFeriadoVector(prov, ordinales):
+        Versión vectorizada de esFeriado para un arreglo de ordinales
+    feriadosEntre(prov, inicio, fin):
+        Devuelve las fechas de feriado entre dos fechas (incluidas)
+    feriadosDelAnio(prov, anio):
+        Devuelve el diccionario {fecha: nombre} de un año
+    compilar(prov):
+        Compila de antemano el mapa de bits de una provincia
+    esDiaHabil(prov, fecha):
+        Devuelve True si la fecha no es fin de semana ni feriado
+    diasHabilesEntre(prov, inicio, fin):
+        Cuenta los días hábiles entre dos fechas (incluidas)
+    sumarDiasHabiles(prov, fecha, n):
+        Devuelve el n-ésimo día hábil después de la fecha
+    siguienteDiaHabil(prov, fecha, incluir=False):
+        Devuelve el primer día hábil después de la fecha (o desde ella)
+    diaHabilDelMes(prov, anio, mes, n):
+        Devuelve el n-ésimo día hábil de un mes
+    diasHabiles(prov):
+        Devuelve los ordinales de todos los días hábiles del índice
+    modificar(prov, agregados=(), quitados=()):
+        Agrega o quita feriados de una provincia (decretados o trasladados)
+    guardar(ruta, provincias=None):
+        Guarda los calendarios compilados en una instantánea binaria
+    abrir(ruta):
+        Abre una instantánea con mmap (método de clase)
+    """
+
+    def __init__(self, desde=1990, hasta=2100):
+        """
+        Construye todos los atributos necesarios para el objeto IndiceFeriados
+        """
+        if desde > hasta:
+            raise ValueError('El año inicial del índice debe ser menor o igual al año final')
+        self.desde = desde
+        self.hasta = hasta
+        self._inicio = datetime.date(desde, JAN, 1).toordinal()
+        self._fin = datetime.date(hasta, DEC, 31).toordinal()
+        self._mapas = {}
+        self._nombres = {}
+        self._acumulados = {}
+        self._candado = threading.Lock()
+        # (mmap, posición de los datos, directorio) si se abrió de una instantánea
+        self._instantanea = None
+
+    def compilar(self, prov):
+        """
+        Compila el mapa de bits de una provincia si aún no existe y lo devuelve
+        """
+        import numpy as np
+        mapa = self._mapas.get(prov)
+        if mapa is not None:
+            return mapa
+        with self._candado:
+            mapa = self._mapas.get(prov)
+            if mapa is not None:
+                return mapa
+            medir = METRICAS.activo
+            if medir:
+                inicio = time.perf_counter()
+            mapa = np.zeros(self._fin - self._inicio + 1, dtype=np.bool_)
+            nombres = compilarFeriados(prov, self.desde, self.hasta)
+            ordinales = np.fromiter(nombres, dtype=np.int64, count=len(nombres))
+            mapa[ordinales - self._inicio] = True
+            mapa.flags.writeable = False
+            self._nombres[prov] = nombres
+            self._mapas[prov] = mapa
+            if medir:
+                METRICAS.observar("acredita_calendario_construccion_segundos", time.perf_counter() - inicio, tipo="indice")
+        return mapa
+
+    def esFeriado(self, prov, ordinal):
+        """
+        Devuelve True si la fecha con el ordinal indicado (date.toordinal()) es feriado
+        """
+        if METRICAS.activo:
+            METRICAS.contar("acredita_consultas_feriado_total", prov=_etiquetaProvincia(prov))
+        if self._inicio <= ordinal <= self._fin:
+            return bool(self.compilar(prov)[ordinal - self._inicio])
+        return CACHE_CALENDARIOS.esFeriado(prov, datetime.date.fromordinal(ordinal))
+
+    def esFeriadoVector(self, prov, ordinales):
+        """
+        Evalúa esFeriado sobre un arreglo de ordinales de fecha
+
+         PARAMETROS
+         -----------
+             prov:str
+                 código de provincia según ISO3166-2
+             ordinales:array
+                 ordinales de fecha (date.toordinal())
+         RETORNA
+         ----------
+             numpy.ndarray
+                 Arreglo booleano con la misma forma que ordinales
+        """
+        import numpy as np
+        ordinales = np.asarray(ordinales, dtype=np.int64)
+        if METRICAS.activo:
+            METRICAS.contar("acredita_consultas_feriado_total", ordinales.size, prov=_etiquetaProvincia(prov))
+        mapa = self.compilar(prov)
+        posiciones = ordinales - self._inicio
+        dentro = (posiciones >= 0) & (posiciones < mapa.size)
+        resultado = np.zeros(ordinales.shape, dtype=np.bool_)
+        resultado[dentro] = mapa[posiciones[dentro]]
+        if not dentro.all():
+            for i in zip(*np.nonzero(~dentro)):
+                resultado[i] = CACHE_CALENDARIOS.esFeriado(prov, datetime.date.fromordinal(int(ordinales[i])))
+        return resultado
+
+    def feriadosEntre(self, prov, inicio, fin):
+        """
+        Devuelve la lista ordenada de fechas de feriado entre inicio y fin (incluidas)
+
+         PARAMETROS
+         -----------
+             prov:str
+                 código de provincia según ISO3166-2
+             inicio:datetime.date
+                 primera fecha del rango
+             fin:datetime.date
+                 última fecha del rango
+        """
+        import numpy as np
+        desde, hasta = inicio.toordinal(), fin.toordinal()
+        fechas = []
+        # Parte anterior al índice
+        for anio in range(inicio.year, min(fin.year, self.desde - 1) + 1):
+            fechas.extend(f for f in CACHE_CALENDARIOS.obtener(prov, anio) if inicio <= f <= fin)
+        # Parte cubierta por el índice
+        a, b = max(desde, self._inicio), min(hasta, self._fin)
+        if a <= b:
+            posiciones = np.flatnonzero(self.compilar(prov)[a - self._inicio:b - self._inicio + 1])
+            fechas.extend(datetime.date.fromordinal(int(p) + a) for p in posiciones)
+        # Parte posterior al índice
+        for anio in range(max(inicio.year, self.hasta + 1), fin.year + 1):
+            fechas.extend(f for f in CACHE_CALENDARIOS.obtener(prov, anio) if inicio <= f <= fin)
+        return sorted(fechas)
+
+    def feriadosDelAnio(self, prov, anio):
+        """
+        Devuelve el diccionario {fecha: nombre} de los feriados de un año
+        """
+        if not self.desde <= anio <= self.hasta:
+            return CACHE_CALENDARIOS.obtener(prov, anio)
+        self.compilar(prov)
+        nombres = self._nombresDe(prov)
+        return {fecha: nombres[fecha.toordinal()]
+                for fecha in self.feriadosEntre(prov, datetime.date(anio, JAN, 1), datetime.date(anio, DEC, 31))}
+
+    def _nombresDe(self, prov):
+        """Diccionario {ordinal: nombre} de una provincia ya compilada"""
+        nombres = self._nombres.get(prov)
+        if nombres is None:
+            # provincia de una instantánea: los nombres se leen la primera vez que se piden
+            import numpy as np
+            datos, base, directorio = self._instantanea
+            entrada = directorio["provincias"][prov]
+            ordinales = np.frombuffer(datos, "<i4", entrada["total"], base + entrada["feriados"])
+            indices = np.frombuffer(datos, "<u2", entrada["total"], base + entrada["indices"])
+            tabla = directorio["nombres"]
+            nombres = self._nombres.setdefault(prov, dict(zip(ordinales.tolist(), (tabla[i] for i in indices.tolist()))))
+        return nombres
+
+    # Aritmética de días hábiles. Para cada provincia se guarda la suma
+    # acumulada de días hábiles (ni sábado, ni domingo, ni feriado):
+    # acumulado[i] es el número de días hábiles antes de la posición i, así que
+    # contar es una resta y buscar el n-ésimo día hábil es una búsqueda binaria.
+
+    def _acumulado(self, prov):
+        import numpy as np
+        acumulado = self._acumulados.get(prov)
+        if acumulado is None:
+            mapa = self.compilar(prov)
+            # el ordinal 1 (0001-01-01) es lunes
+            diaSemana = (np.arange(self._inicio, self._fin + 1) - 1) % 7
+            habiles = ~mapa & (diaSemana < 5)
+            acumulado = np.zeros(mapa.size + 1, dtype=np.int32)
+            np.cumsum(habiles, out=acumulado[1:])
+            acumulado.flags.writeable = False
+            self._acumulados[prov] = acumulado
+        return acumulado
+
+    def _posicion(self, fecha):
+        ordinal = fecha.toordinal()
+        if not self._inicio <= ordinal <= self._fin:
+            raise ValueError(f'La fecha {fecha} está fuera del rango del índice de feriados ({self.desde}-{self.hasta})')
+        return ordinal - self._inicio
+
+    def _nEsimoDesde(self, prov, posicion, n):
+        """Fecha del n-ésimo día hábil (n >= 1) en la posición indicada o después"""
+        import numpy as np
+        acumulado = self._acumulado(prov)
+        siguiente = int(np.searchsorted(acumulado, acumulado[posicion] + n, side="left"))
+        if siguiente >= acumulado.size:
+            raise ValueError(f'El día hábil buscado está fuera del rango del índice de feriados ({self.desde}-{self.hasta})')
+        return datetime.date.fromordinal(self._inicio + siguiente - 1)
+
+    def esDiaHabil(self, prov, fecha):
+        """
+        Devuelve True si la fecha (datetime.date) no es fin de semana ni feriado
+        """
+        return fecha.weekday() < 5 and not self.esFeriado(prov, fecha.toordinal())
+
+    def diasHabilesEntre(self, prov, inicio, fin):
+        """
+        Cuenta los días hábiles entre inicio y fin (incluidos); 0 si fin < inicio
+        """
+        if fin < inicio:
+            return 0
+        acumulado = self._acumulado(prov)
+        return int(acumulado[self._posicion(fin) + 1] - acumulado[self._posicion(inicio)])
+
+    def sumarDiasHabiles(self, prov, fecha, n):
+        """
+        Devuelve el n-ésimo día hábil (n >= 1) posterior a la fecha
+        """
+        if n < 1:
+            raise ValueError('El número de días hábiles debe ser mayor que cero')
+        return self._nEsimoDesde(prov, self._posicion(fecha) + 1, n)
+
+    def siguienteDiaHabil(self, prov, fecha, incluir=False):
+        """
+        Devuelve el primer día hábil posterior a la fecha; si incluir es True
+        y la fecha es hábil se devuelve la misma fecha
+        """
+        return self._nEsimoDesde(prov, self._posicion(fecha) + (0 if incluir else 1), 1)
+
+    def diaHabilDelMes(self, prov, anio, mes, n):
+        """
+        Devuelve el n-ésimo día hábil (n >= 1) del mes, o None si el mes tiene menos de n días hábiles
+        """
+        if n < 1:
+            raise ValueError('El número de días hábiles debe ser mayor que cero')
+        inicio = self._posicion(datetime.date(anio, mes, 1))
+        fin = self._posicion(datetime.date(anio + mes // 12, mes % 12 + 1, 1) - datetime.timedelta(days=1))
+        # se cuentan los días hábiles del mes antes de buscar, porque en el
+        # último mes del índice el n-ésimo puede quedar fuera de su rango
+        acumulado = self._acumulado(prov)
+        if acumulado[fin + 1] - acumulado[inicio] < n:
+            return None
+        return self._nEsimoDesde(prov, inicio, n)
+
+    def diasHabiles(self, prov):
+        """
+        Devuelve un arreglo ordenado de NumPy con los ordinales de todos los días hábiles del índice
+        """
+        import numpy as np
+        return np.flatnonzero(np.diff(self._acumulado(prov))) + self._inicio
+
+    def modificar(self, prov, agregados=(), quitados=(), nombre="Feriado decretado"):
+        """
+        Agrega o quita feriados de una provincia, por ejemplo cuando se decreta
+        un feriado nuevo o se traslada uno existente
+
+        El mapa de bits se reemplaza por una copia, así que quien ya tenía el
+        anterior (o una instantánea abierta con mmap) no ve un estado a medias.
+
+         PARAMETROS
+         -----------
+             prov:str
+                 código de provincia según ISO3166-2
+             agregados:list
+                 fechas (datetime.date) que pasan a ser feriado
+             quitados:list
+                 fechas (datetime.date) que dejan de ser feriado
+             nombre:str
+                 nombre de los feriados agregados
+        """
+        mapa = self.compilar(prov).copy()
+        nombres = dict(self._nombresDe(prov))
+        for fecha in quitados:
+            mapa[self._posicion(fecha)] = False
+            nombres.pop(fecha.toordinal(), None)
+        for fecha in agregados:
+            mapa[self._posicion(fecha)] = True
+            nombres.setdefault(fecha.toordinal(), nombre)
+        mapa.flags.writeable = False
+        with self._candado:
+            self._mapas[prov] = mapa
+            self._nombres[prov] = nombres
+            self._acumulados.pop(prov, None)
+
+    # Instantánea en disco. Guarda el mapa de bits, la suma acumulada de días
+    # hábiles y los nombres de los feriados de cada provincia para que varios
+    # procesos compartan un solo calendario compilado: cada uno lo abre con
+    # mmap de solo lectura y el sistema operativo comparte las páginas.
+
+    def guardar(self, ruta, provincias=None):
+        """
+        Guarda los calendarios compilados en un archivo binario versionado
+
+        El archivo se escribe aparte y se reemplaza al final, así que otro
+        proceso nunca ve una instantánea a medio escribir.
+
+         PARAMETROS
+         -----------
+             ruta:str
+                 ruta del archivo de la instantánea
+             provincias:list
+                 códigos de provincia a guardar; por defecto todas las de PROVINCIAS
+        """
+        import numpy as np
+        import struct
+        provincias = sorted(PROVINCIAS) if provincias is None else list(provincias)
+        posicionNombre = {}
+        directorio = {"desde": self.desde, "hasta": self.hasta, "provincias": {}}
+        bloques = []
+        desplazamiento = 0
+        for prov in provincias:
+            self.compilar(prov)
+            feriados = self._nombresDe(prov)
+            ordinales = sorted(feriados)
+            arreglos = {
+                "mapa": self.compilar(prov),
+                "acumulado": self._acumulado(prov),
+                "feriados": ordinales,
+                "indices": [posicionNombre.setdefault(feriados[o], len(posicionNombre)) for o in ordinales],
+            }
+            entrada = {"total": len(ordinales)}
+            for clave, tipo in _ARREGLOS_INSTANTANEA:
+                arreglo = np.ascontiguousarray(arreglos[clave], dtype=tipo)
+                entrada[clave] = desplazamiento
+                bloques.append((desplazamiento, arreglo))
+                desplazamiento = _alinear(desplazamiento + arreglo.nbytes)
+            directorio["provincias"][prov] = entrada
+        directorio["nombres"] = sorted(posicionNombre, key=posicionNombre.get)
+        textoDirectorio = json.dumps(directorio, ensure_ascii=False).encode("utf-8")
+        encabezado = struct.pack(_ENCABEZADO_INSTANTANEA, _MAGIA_INSTANTANEA, FORMATO_INSTANTANEA, 0,
+                                 huellaReglas(), len(textoDirectorio))
+        base = _alinear(len(encabezado) + len(textoDirectorio))
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(encabezado)
+            archivo.write(textoDirectorio)
+            for posicion, arreglo in bloques:
+                archivo.seek(base + posicion)
+                archivo.write(arreglo.tobytes())
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abrir(cls, ruta):
+        """
+        Abre una instantánea guardada con guardar() sin copiar sus arreglos
+
+        Lanza ValueError si el archivo no es una instantánea, es de otra
+        versión del formato o se generó con otras reglas de feriados (ver huellaReglas).
+        """
+        import mmap
+        import numpy as np
+        import struct
+        with open(ruta, "rb") as archivo:
+            datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        tamano = struct.calcsize(_ENCABEZADO_INSTANTANEA)
+        if len(datos) < tamano:
+            raise ValueError(f'{ruta} no es una instantánea de feriados')
+        magia, version, _, huella, largo = struct.unpack_from(_ENCABEZADO_INSTANTANEA, datos)
+        if magia != _MAGIA_INSTANTANEA:
+            raise ValueError(f'{ruta} no es una instantánea de feriados')
+        if version != FORMATO_INSTANTANEA:
+            raise ValueError(f'La instantánea {ruta} tiene el formato {version}, se esperaba {FORMATO_INSTANTANEA}')
+        if huella != huellaReglas():
+            raise ValueError(f'La instantánea {ruta} se generó con otras reglas de feriados o con otra versión del compilador')
+        directorio = json.loads(datos[tamano:tamano + largo].decode("utf-8"))
+        base = _alinear(tamano + largo)
+        indice = cls(directorio["desde"], directorio["hasta"])
+        dias = indice._fin - indice._inicio + 1
+        for prov, entrada in directorio["provincias"].items():
+            indice._mapas[prov] = np.frombuffer(datos, "|b1", dias, base + entrada["mapa"])
+            indice._acumulados[prov] = np.frombuffer(datos, "<i4", dias + 1, base + entrada["acumulado"])
+        indice._instantanea = (datos, base, directorio)
+        return indice
+
+
+# Índice compartido por HolidayEcuador y PersonaBono.evaluar()
+INDICE_FERIADOS = IndiceFeriados()
+
+
+def usarInstantanea(ruta, desde=1990, hasta=2100):
+    """
+    Reemplaza INDICE_FERIADOS por el de una instantánea en disco
+
+    Si el archivo no existe, es de otra versión del formato, cubre otros años
+    o se generó con otras reglas de feriados, se vuelve a generar con todas
+    las provincias.
+
+     RETORNA
+     ----------
+         IndiceFeriados
+             El nuevo INDICE_FERIADOS
+    """
+    global INDICE_FERIADOS
+    try:
+        indice = IndiceFeriados.abrir(ruta)
+        vigente = (indice.desde, indice.hasta) == (desde, hasta)
+    except (OSError, ValueError):
+        vigente = False
+    if not vigente:
+        IndiceFeriados(desde, hasta).guardar(ruta)
+        indice = IndiceFeriados.abrir(ruta)
+    INDICE_FERIADOS = indice
+    return indice
+
+
+class TransporteRequests:
+    """
+    Transporte HTTP por defecto del cliente de feriados en línea.
+
+    Reutiliza una sola sesión de requests con un grupo de conexiones, de modo
+    que las consultas al mismo servidor no abren una conexión TCP/TLS nueva
+    cada vez. Cualquier objeto invocable con la misma firma puede usarse en su
+    lugar (por ejemplo, para probar contra un servidor local).
+    """
+
+    def __init__(self, conexiones=10):
+        """
+        Construye todos los atributos necesarios para el objeto TransporteRequests
+        """
+        import requests
+        self.sesion = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones)
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+
+    def __call__(self, url, parametros, tiempoEspera):
+        """
+        Hace una petición GET y devuelve la tupla (código de estado, contenido en bytes)
+        """
+        respuesta = self.sesion.get(url, params=parametros, timeout=tiempoEspera)
+        return respuesta.status_code, respuesta.content
+
+
+class _LimitadorTasa:
+    """
+    Espacia el inicio de las peticiones asíncronas para no superar una tasa
+    """
+
+    def __init__(self, peticionesPorSegundo):
+        self.intervalo = 1.0 / peticionesPorSegundo if peticionesPorSegundo else 0.0
+        self._siguiente = 0.0
+
+    async def esperar(self):
+        import asyncio
+        if not self.intervalo:
+            return
+        ahora = asyncio.get_running_loop().time()
+        turno = max(ahora, self._siguiente)
+        self._siguiente = turno + self.intervalo
+        if turno > ahora:
+            await asyncio.sleep(turno - ahora)
+
+
+class ClienteFeriadosEnLinea:
+    """
+    Cliente de la API de feriados de abstractapi
+    (https://app.abstractapi.com/api/holidays/documentation).
+
+    Descarga todos los feriados de un año con una sola petición y los guarda
+    en memoria y, opcionalmente, en disco durante `ttl` segundos. Las
+    peticiones fallidas se reintentan con espera exponencial y, si la API no
+    responde, se usa el calendario sin conexión de HolidayEcuador; ese
+    respaldo solo se guarda en memoria durante `reintentoRespaldo` segundos,
+    después se vuelve a consultar la API. La clave de la API se lee de la
+    variable de entorno ABSTRACTAPI_KEY; sin clave se usa siempre el respaldo.
+    ...
+    Atributos
+    ----------
+    apiKey: str o None
+        clave de la API; por defecto la de ABSTRACTAPI_KEY
+    url: str
+        dirección de la API
+    pais: str
+        código de país ISO 3166-1 alfa-2
+    tiempoEspera: float
+        segundos de espera máximos por petición
+    reintentos: int
+        número de reintentos después del primer intento fallido
+    espera: float
+        espera inicial entre reintentos, se duplica en cada intento
+    directorioCache: str o None
+        directorio de la caché en disco; None la desactiva
+    ttl: float
+        segundos de validez de una respuesta guardada en memoria o en disco
+    reintentoRespaldo: float
+        segundos que se usa el calendario sin conexión antes de volver a consultar la API
+    provinciaRespaldo: str
+        provincia del calendario sin conexión usado como respaldo
+    concurrencia: int
+        número máximo de descargas asíncronas simultáneas
+    peticionesPorSegundo: float o None
+        límite de peticiones asíncronas por segundo a la API; None lo desactiva
+    Métodos
+    -------
+    esFeriado(fecha):
+        Devuelve True si la fecha es feriado
+    feriadosDelAnio(anio):
+        Devuelve el conjunto de fechas de feriado de un año
+    feriadosDelAnioAsync(anio):
+        Versión asíncrona de feriadosDelAnio
+    precargar(desde, hasta):
+        Descarga de antemano los feriados de un rango de años
+    """
+    URL = "https://holidays.abstractapi.com/v1/"
+
+    def __init__(self, apiKey=None, url=URL, pais="EC", tiempoEspera=5.0, reintentos=3, espera=0.5,
+                 directorioCache=None, ttl=86400, transporte=None, provinciaRespaldo="EC-SD",
+                 concurrencia=4, peticionesPorSegundo=5.0, reintentoRespaldo=60.0):
+        """
+        Construye todos los atributos necesarios para el objeto ClienteFeriadosEnLinea
+        """
+        self.apiKey = apiKey or os.environ.get("ABSTRACTAPI_KEY") or None
+        self.url = url
+        self.pais = pais
+        self.tiempoEspera = tiempoEspera
+        self.reintentos = reintentos
+        self.espera = espera
+        self.directorioCache = directorioCache
+        self.ttl = ttl
+        self.transporte = transporte or TransporteRequests()
+        self.provinciaRespaldo = provinciaRespaldo
+        self.concurrencia = concurrencia
+        self.peticionesPorSegundo = peticionesPorSegundo
+        self.reintentoRespaldo = reintentoRespaldo
+        # {año: (feriados, instante en que caducan según time.time())}
+        self._anios = {}
+        self._candado = threading.Lock()
+        self._candadosAnio = {}
+        self._bucle = None
+        self._enCurso = {}
+        self._limites = None
+
+    def esFeriado(self, fecha):
+        """
+        Devuelve True si la fecha (datetime.date) es feriado
+        """
+        return fecha in self.feriadosDelAnio(fecha.year)
+
+    def feriadosDelAnio(self, anio):
+        """
+        Devuelve el conjunto (frozenset de datetime.date) de feriados de un año
+        """
+        feriados = self._vigente(anio)
+        if feriados is None:
+            # un candado por año: la misma descarga no se repite, pero años
+            # distintos se pueden descargar a la vez desde varios hilos
+            with self._candado:
+                candadoAnio = self._candadosAnio.setdefault(anio, threading.Lock())
+            with candadoAnio:
+                feriados = self._vigente(anio)
+                if feriados is None:
+                    guardado = self._leerCache(anio)
+                    if guardado is None:
+                        guardado = self._descargar(anio)
+                    self._anios[anio] = guardado
+                    feriados = guardado[0]
+        return feriados
+
+    def _vigente(self, anio):
+        """Feriados del año guardados en memoria si no han caducado, si no None"""
+        guardado = self._anios.get(anio)
+        if guardado is not None and time.time() < guardado[1]:
+            return guardado[0]
+        return None
+
+    async def feriadosDelAnioAsync(self, anio):
+        """
+        Versión asíncrona de feriadosDelAnio
+
+        Las consultas simultáneas del mismo año comparten una sola petición en
+        curso; las descargas respetan el límite de concurrencia y de peticiones
+        por segundo del cliente.
+        """
+        import asyncio
+        feriados = self._vigente(anio)
+        if feriados is not None:
+            return feriados
+        enCurso = self._enCursoDelBucle()
+        tarea = enCurso.get(anio)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._descargarAsync(anio))
+            enCurso[anio] = tarea
+            tarea.add_done_callback(lambda _: enCurso.pop(anio, None))
+        return await asyncio.shield(tarea)
+
+    async def _descargarAsync(self, anio):
+        import asyncio
+        semaforo, limitador = self._limitesDelBucle()
+        async with semaforo:
+            if self._vigente(anio) is None:
+                await limitador.esperar()
+            return await asyncio.to_thread(self.feriadosDelAnio, anio)
+
+    def _enCursoDelBucle(self):
+        """
+        Devuelve las descargas en curso del bucle de eventos actual
+        """
+        import asyncio
+        bucle = asyncio.get_running_loop()
+        if self._bucle is not bucle:
+            self._bucle = bucle
+            self._enCurso = {}
+            self._limites = (asyncio.Semaphore(self.concurrencia), _LimitadorTasa(self.peticionesPorSegundo))
+        return self._enCurso
+
+    def _limitesDelBucle(self):
+        self._enCursoDelBucle()
+        return self._limites
+
+    def precargar(self, desde, hasta):
+        """
+        Descarga de antemano los feriados de los años desde..hasta (incluidos)
+        """
+        for anio in range(desde, hasta + 1):
+            self.feriadosDelAnio(anio)
+
+    def _archivoCache(self, anio):
+        return os.path.join(self.directorioCache, f"feriados-{self.pais}-{anio}.json")
+
+    def _leerCache(self, anio):
+        """
+        Devuelve (feriados, instante en que caducan) guardados en disco si
+        existen y no han caducado, si no None
+        """
+        if self.directorioCache is None:
+            return None
+        try:
+            with open(self._archivoCache(anio), encoding="utf-8") as archivo:
+                guardado = json.load(archivo)
+            caduca = guardado.get("guardado", 0) + self.ttl
+            feriados = frozenset(datetime.date.fromisoformat(f) for f in guardado["fechas"])
+        # un archivo dañado o con otro formato cuenta como un fallo de la caché
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            return None
+        if time.time() > caduca:
+            if METRICAS.activo:
+                METRICAS.contar("acredita_api_cache_disco_total", resultado="caducado")
+            return None
+        if METRICAS.activo:
+            METRICAS.contar("acredita_api_cache_disco_total", resultado="acierto")
+        return feriados, caduca
+
+    def _escribirCache(self, anio, feriados):
+        if self.directorioCache is None:
+            return
+        os.makedirs(self.directorioCache, exist_ok=True)
+        ruta = self._archivoCache(anio)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump({"guardado": time.time(), "fechas": sorted(f.isoformat() for f in feriados)}, archivo)
+        os.replace(temporal, ruta)
+
+    def _descargar(self, anio):
+        """
+        Descarga los feriados de un año y devuelve (feriados, instante en que
+        caducan); si la API falla usa el calendario sin conexión, que caduca
+        en reintentoRespaldo segundos para volver a intentar la descarga (sin
+        clave de la API no se hace ninguna petición)
+        """
+        parametros = {"api_key": self.apiKey, "country": self.pais, "year": anio}
+        medir = METRICAS.activo
+        for intento in range(self.reintentos + 1 if self.apiKey else 0):
+            if intento:
+                if medir:
+                    METRICAS.contar("acredita_api_reintentos_total")
+                time.sleep(self.espera * 2 ** (intento - 1))
+            inicio = time.perf_counter()
+            try:
+                estado, contenido = self.transporte(self.url, parametros, self.tiempoEspera)
+            # las excepciones de requests derivan de OSError
+            except OSError as error:
+                if medir:
+                    METRICAS.observar("acredita_api_latencia_segundos", time.perf_counter() - inicio)
+                    METRICAS.contar("acredita_api_errores_total", tipo=type(error).__name__)
+                continue
+            if medir:
+                METRICAS.observar("acredita_api_latencia_segundos", time.perf_counter() - inicio)
+                METRICAS.contar("acredita_api_peticiones_total", estado=estado)
+            # 429 (límite de peticiones) y 5xx son transitorios, se reintentan
+            if estado == 429 or estado >= 500:
+                continue
+            if estado != 200:
+                break
+            try:
+                feriados = self._interpretar(contenido)
+            except (ValueError, KeyError, TypeError):
+                if medir:
+                    METRICAS.contar("acredita_api_errores_total", tipo="respuesta_invalida")
+                break
+            self._escribirCache(anio, feriados)
+            return feriados, time.time() + self.ttl
+        if medir:
+            METRICAS.contar("acredita_api_respaldo_total")
+        return frozenset(INDICE_FERIADOS.feriadosDelAnio(self.provinciaRespaldo, anio)), time.time() + self.reintentoRespaldo
+
+    @staticmethod
+    def _interpretar(contenido):
+        """
+        Convierte la respuesta JSON de abstractapi en un conjunto de fechas
+        """
+        feriados = set()
+        for feriado in json.loads(contenido):
+            if "date_year" in feriado:
+                feriados.add(datetime.date(int(feriado["date_year"]), int(feriado["date_month"]), int(feriado["date_day"])))
+            else:
+                # abstractapi devuelve las fechas en formato MM/DD/AAAA
+                mes, dia, anio = feriado["date"].split("/")
+                feriados.add(datetime.date(int(anio), int(mes), int(dia)))
+        return frozenset(feriados)
+
+
+_CLIENTE_EN_LINEA = None
+
+
+def clienteEnLinea(**kwargs):
+    """
+    Devuelve el cliente de feriados en línea compartido por PersonaBono.evaluar()
+
+    Si se pasan argumentos se reemplaza el cliente compartido por uno nuevo
+    configurado con ellos (ver ClienteFeriadosEnLinea).
+    """
+    global _CLIENTE_EN_LINEA
+    if kwargs or _CLIENTE_EN_LINEA is None:
+        _CLIENTE_EN_LINEA = ClienteFeriadosEnLinea(**kwargs)
+    return _CLIENTE_EN_LINEA
+
+
+MENSAJE_FECHA = 'La fecha debe tener el siguiente formato: AAAA-MM-DD (por ejemplo: 2021-04-02)'
+
+
+@functools.lru_cache(maxsize=8192)
+def ordinalFecha(valor):
+    """
+    Convierte una fecha AAAA-MM-DD en su ordinal (date.toordinal())
+
+    Es la única rutina que interpreta las fechas de los registros; los
+    resultados se guardan en caché porque en un padrón las mismas fechas se
+    repiten muchas veces.
+
+     aumenta
+     ------
+         ValorError
+             Si la cadena no tiene el formato AAAA-MM-DD (por ejemplo, 2021-04-02)
+    """
+    try:
+        if len(valor) != 10 or valor[4] != '-' or valor[7] != '-':
+            raise ValueError
+        ano, maso, menos = valor[:4], valor[5:7], valor[8:]
+        # isascii: isdigit e int también aceptan dígitos Unicode como "２０２１"
+        if not (valor.isascii() and ano.isdigit() and maso.isdigit() and menos.isdigit()):
+            raise ValueError
+        return datetime.date(int(ano), int(maso), int(menos)).toordinal()
+    except (ValueError, TypeError):
+        raise ValueError(MENSAJE_FECHA) from None
+
+
+class ErrorFechas(ValueError):
+    """
+    Error de validarFechas: contiene todas las filas con fechas mal formadas
+
+    Atributos
+    ----------
+    filas: list
+        posiciones de las fechas inválidas
+    ordinales: numpy.ndarray
+        ordinales de las fechas válidas (0 en las filas inválidas)
+    """
+
+    def __init__(self, filas, ordinales):
+        muestra = ", ".join(str(f) for f in filas[:20]) + (", ..." if len(filas) > 20 else "")
+        super().__init__(f"{MENSAJE_FECHA} [{len(filas)} filas inválidas: {muestra}]")
+        self.filas = filas
+        self.ordinales = ordinales
+
+
+def validarFechas(valores):
+    """
+    Valida una columna completa de fechas AAAA-MM-DD y la convierte en ordinales
+
+    Cada valor distinto se interpreta una sola vez. Si hay fechas mal
+    formadas se lanza ErrorFechas con todas sus filas, no solo la primera.
+
+     PARAMETROS
+     -----------
+         valores:array
+             lista o arreglo de cadenas
+     RETORNA
+     ----------
+         numpy.ndarray
+             Arreglo int64 de ordinales de fecha
+    """
+    import numpy as np
+    distintos, posiciones = np.unique(np.asarray(valores, dtype=object).astype(str), return_inverse=True)
+    ordinalesDistintos = np.zeros(len(distintos), dtype=np.int64)
+    invalidos = np.zeros(len(distintos), dtype=np.bool_)
+    for i, valor in enumerate(distintos.tolist()):
+        try:
+            ordinalesDistintos[i] = ordinalFecha(valor)
+        except ValueError:
+            invalidos[i] = True
+    ordinales = ordinalesDistintos[posiciones]
+    if invalidos.any():
+        raise ErrorFechas(np.flatnonzero(invalidos[posiciones]).tolist(), ordinales)
+    return ordinales
+
+
+def _aFecha(fecha):
+    """Convierte una cadena AAAA-MM-DD o un datetime.date en datetime.date"""
+    if isinstance(fecha, datetime.date):
+        return fecha
+    return datetime.date.fromordinal(ordinalFecha(fecha))
+
+
+async def resolverFeriadosAsync(fechas, enLinea=False, prov='EC-SD'):
+    """
+    Determina si cada una de las fechas es feriado
+
+    Las fechas repetidas se resuelven una sola vez y, en línea, cada año
+    distinto se descarga con una sola petición (ver
+    ClienteFeriadosEnLinea.feriadosDelAnioAsync), así que el costo crece con
+    el número de años distintos y no con el número de fechas.
+
+     PARAMETROS
+     -----------
+         fechas:iterable
+             fechas como cadenas AAAA-MM-DD o datetime.date
+         enLinea:bool
+             si es True se usa la API de feriados en línea
+         prov:str
+             provincia del calendario sin conexión
+     RETORNA
+     ----------
+         list
+             Lista de booleanos en el mismo orden que las fechas
+    """
+    import asyncio
+    import numpy as np
+    fechas = [_aFecha(f) for f in fechas]
+    if not enLinea:
+        ordinales = np.fromiter((f.toordinal() for f in fechas), dtype=np.int64, count=len(fechas))
+        return INDICE_FERIADOS.esFeriadoVector(prov, ordinales).tolist()
+    cliente = clienteEnLinea()
+    anios = sorted({f.year for f in fechas})
+    feriados = dict(zip(anios, await asyncio.gather(*(cliente.feriadosDelAnioAsync(a) for a in anios))))
+    return [f in feriados[f.year] for f in fechas]
+
+
+async def evaluarLoteAsync(personas):
+    """
+    Evalúa de una sola vez un lote de objetos PersonaBono
+
+    Devuelve la lista de resultados de evaluar() en el mismo orden que personas.
+    """
+    personas = list(personas)
+    resultados = [None] * len(personas)
+    for enLinea in (False, True):
+        posiciones = [i for i, p in enumerate(personas) if bool(p.online) == enLinea]
+        if posiciones:
+            ordinales = [personas[i].fechaOrdinal for i in posiciones]
+            feriados = await resolverFeriadosAsync([datetime.date.fromordinal(o) for o in ordinales], enLinea)
+            for i, feriado in zip(posiciones, feriados):
+                resultados[i] = feriado
+    return resultados
+
+
+def _internar(valor):
+    """Interna las cadenas de campos categóricos (sexo, ocupación, residencia...)"""
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+# Umbrales de las reglas de elegibilidad
+EDAD_ADULTO_MAYOR = 65     # edad mínima en PersonaBono.esHombre
+UMBRAL_BDH = 28.20         # bono máximo que excluye en Credito.bdh (valor por defecto)
+UMBRAL_PTV_MMA = 34.67     # pensión máxima que excluye en Credito.ptv_mma (valor por defecto)
+
+# Umbrales vigentes del bono por regla; solo se cambian con cambiarUmbrales
+UMBRALES = {"bdh": UMBRAL_BDH, "ptv_mma": UMBRAL_PTV_MMA}
+
+
+def cambiarUmbrales(**umbrales):
+    """
+    Cambia los umbrales vigentes de Credito.bdh y Credito.ptv_mma para todo
+    el proceso, por ejemplo cambiarUmbrales(bdh=30.0)
+
+    Lanza ValueError si se indica un umbral desconocido.
+    """
+    desconocidos = set(umbrales) - set(UMBRALES)
+    if desconocidos:
+        raise ValueError(f'Umbrales desconocidos: {", ".join(sorted(desconocidos))}')
+    UMBRALES.update((regla, float(valor)) for regla, valor in umbrales.items())
+
+
+class PersonaBono:
+    '''
+        La clase persona bono servirá para identificar si una persona es beneficiaria
+        al bono de desarrollo humano que entrega el gobiendo nacional juntos con el 
+        Ministerio de Inclusión Económica y Socia:
+        http://www.ecuadorlegalonline.com/consultas/consultar-si-cobro-el-bono-de-emergencia-del-mies/
+
+         PARAMETROS
+         -----------
+             nombre:str
+                 Es el nombre del supuesto usuario beneficiario al bono.
+             sexo:str
+                 Corresponde a la indentidad sexual del usuario.
+             edad:int
+                 Años de vida que tiene el usuario.
+             fecha:str
+                Fecha en la que el usuario desee retirar su crédito.
+                Sigue el formato ISO 8601 AAAA-MM-DD: por ejemplo, 2020-04-22
+             ocupacion:str
+                 Corresponde al oficio al que actualmente se dedica el usuario.
+             ingresos:float
+                 Es la cantidad económica con la que cuenta el usuario.
+             enfermedades:str
+                 Son los problema de salud que el usuaria pueda tener
+             online: booleano, opcional
+                 si en línea == Verdadero, se utilizará la API de días festivos abstractos
+             hijos:array
+                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
+                 beneficiaria o beneficiario al bono.
+        
+         METODOS
+         -----------
+             __init__(self, nombre, sexo, edad, ocupacion, ingresos, enfermedades):
+                 Este método sive para construir todolos los métodos correspondientes al 
+                 objeto personaBono
+             esMujer(hijos):
+                 Este método sirve para los beneficiarios que son de sexo femenino, ya que
+                 para mujeres hay otro tipo de bonificaciones según sus condiciones. Retorna
+                 una lista de nombre de los hijos con los datos de cada uno de ellos.
+             esHombre(SeguroSocial):
+                 Este método funciona para las personas de sexo masculino, ya que para ellos
+                 existen varias restricciones al momento de la bonificación, una de ellas es que
+                 la persona debe superar los 65 años de edad o lo que es lo mismo que deber ser
+                 un adulto mayor. Retornando un condicional que valide lo antes mencionado.
+             discapacidad():
+                 Este método es creado para las personas que tienen algún tipo de capacidad diferente
+                 ya que ellos también son beneficiarios al bono de desarrollo humano. Retornando un
+                 condicional que valide este método. 
+             fecha (uno mismo):
+                 Obtiene el valor del atributo de fecha
+             fecha (auto, valor):
+                 Establece el valor del atributo de fecha
+             __encontrarDia(fecha):
+                 Devuelve el día a partir de la fecha: por ejemplo, miércoles
+             __esFeriado:
+                 Devuelve True si la fecha marcada (en formato ISO 8601 AAAA-MM-DD) es un día festivo
+                en Ecuador, de lo contrario, False
+             esFinSemana():
+                 Devuelve True si la fecha cae en sábado o domingo
+             diaDePago(prov):
+                 Devuelve la fecha, o el siguiente día hábil de la provincia si no es hábil
+
+        '''
+    # Atributos fijos: sin __dict__ por objeto para cargar registros completos en memoria
+    __slots__ = ("nombre", "sexo", "edad", "_fecha", "_ordinal", "ocupacion", "ingresos", "enfermedades",
+                 "online", "_hijos", "seguroSocial")
+
+    #Días de la semana
+    __days = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
+
+    #Fines de semana
+    __FinSemana = {"Saturday": [],"Sunday": []}
+
+    def __init__(self, nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, API=False):
+        """
+        Construye todos los atributos necesarios para los objetos de la clase PersonaBono
+
+         PARAMETROS
+         -----------
+             nombre:str
+                 Es el nombre del supuesto usuario beneficiario al bono.
+             sexo:str
+                 Corresponde a la indentidad sexual del usuario.
+             edad:int
+                 Años de vida que tiene el usuario.
+             fecha:str
+                Fecha en la que el usuario desee retirar su crédito.
+                Sigue el formato ISO 8601 AAAA-MM-DD: por ejemplo, 2020-04-22
+             ocupacion:str
+                 Corresponde al oficio al que actualmente se dedica el usuario.
+             ingresos:float
+                 Es la cantidad económica con la que cuenta el usuario.
+             enfermedades:str
+                 Son los problema de salud que el usuaria pueda tener
+             online: booleano, opcional
+                 si en línea == Verdadero, se utilizará la API de días festivos abstractos
+             hijos:array
+                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
+                 beneficiaria o beneficiario al bono.
+        """
+        self.nombre=nombre
+        # los campos categóricos se internan para que todos los registros compartan la misma cadena
+        self.sexo=_internar(sexo)
+        self.edad=edad
+        self._fecha=fecha
+        self._ordinal=None
+        self.ocupacion=_internar(ocupacion)
+        self.ingresos=ingresos
+        self.enfermedades=_internar(enfermedades)
+        self.online = API
+        self._hijos=None
+
+    @property
+    def hijos(self):
+        """Lista de hijos del usuario, se crea la primera vez que se usa"""
+        if self._hijos is None:
+            self._hijos = []
+        return self._hijos
+
+    @hijos.setter
+    def hijos(self, valor):
+        self._hijos = valor
+
+    def esMujer (self, hijos):
+        '''
+        Método que da los resultados correspondietes para las personas de sexo femenino
+         PARAMETROS
+         -----------
+             hijos:array
+                 Es la lista de hijos que contiene el usuario, servirá para identidicar si es
+                 beneficiaria al bono de desarrollo humano.
+         RETORNA
+         ----------
+             return (hijos in self.hijos):
+                 Retorno de un lista de los detalles de los hijos de la usuaria para determinar
+                 si es beneficiaria o no al bono de desarrollo humano.
+        '''
+        return (hijos in self.hijos)
+
+    def esHombre (self, seguroSocial):
+        '''
+        Método que sirve para darle resultados al usuario de sexo masculino.
+         
+         PARAMETROS
+         ------------
+             seguroSocial:str
+                 Este parámetro servirá para identificar si la persona tiene algun seguridad social.
+                 Ya que si cuentacon una entonces no podrárecibir el bono de desarrollo humano.
+        
+         RETORNA
+         ----------
+             return True:
+                 Retorna VERDADERO si el usuario excede los años de vida mayore o igual a 65, caso 
+                 contrario retornará un falso.
+        '''
+        self.seguroSocial=seguroSocial
+        adultoMayor = self.edad >=EDAD_ADULTO_MAYOR
+        if METRICAS.activo:
+            METRICAS.contar("acredita_reglas_total", regla="esHombre", resultado=adultoMayor)
+        if adultoMayor:
+            return True
+
+    def discapacidad (self):
+        '''
+        Método que sirve para determinar si el usuario posee alguna discapacidad
+         RETORNA
+         ---------
+             return True:
+                 retorna verdadero si el usuario responde si alguna enfermedad que le imposibilite
+                 realizar determinadas actividades.
+        '''
+        enfermo = self.enfermedades=="Si"
+        if METRICAS.activo:
+            METRICAS.contar("acredita_reglas_total", regla="discapacidad", resultado=enfermo)
+        if enfermo:
+            return True
+
+    @property
+    def fecha(self):
+        """Obtiene el valor del atributo de fecha"""
+        return self._fecha
+
+
+    @fecha.setter
+    def fecha(self, valor):
+        """
+        Establece el valor del atributo de fecha
+
+         Parámetros
+         ----------
+             valor: cadena
+        
+         aumenta
+         ------
+             ValorError
+                 Si la cadena de valor no tiene el formato AAAA-MM-DD (por ejemplo, 2021-04-02)
+        """
+        # la fecha se interpreta una sola vez y su ordinal queda guardado en el registro
+        self._ordinal = ordinalFecha(valor)
+        self._fecha = valor
+
+    @property
+    def fechaOrdinal(self):
+        """Ordinal (date.toordinal()) de la fecha, se calcula una sola vez"""
+        if self._ordinal is None:
+            self._ordinal = ordinalFecha(self._fecha)
+        return self._ordinal
+
+    def __esFeriado(self, ordinal, enLinea ):
+        ''' esta parte contine las condiciones para ver si hay feriado o no en un fecha indicada.
+            
+            parametros
+            ------------
+            tenemos:
+            - ordinal - el ordinal (date.toordinal()) de la fecha que tenemos o ingresamos.
             - enLinea - el cual pasa por defecto false, es para decir que si el feriado es de la API o las personalizadas. 
             -------
             -------
@@ -347,122 +1690,1564 @@ class PersonaBono:
             - abstractapi el cual se encuentra  en : https://app.abstractapi.com/api/holidays/documentation
             entrar con previo registro. 
             '''
-        ano, maso, menos = date.split('-')
         if enLinea: # condicion si es enLinea true
             ''' 
                 se importa los datos de la API conocida como abstract api
                 el cual se encuentra  en : https://app.abstractapi.com/api/holidays/documentation
                 
                 (ejemplo de fechas. https://www.youtube.com/watch?v=wSLbMwNyeLs)'''
-            response = requests.get(f"https://holidays.abstractapi.com/v1/?api_key=91616907df7b4e8282a475d32edfa88a&country=EC&year={ano}&month={maso}&day={menos}")
-            # pera utilizar este link utilizamos requests el cual nos ayudara a conectar con la API
-            print(response.status_code) # retorna en pantalla un codigo 
-            print(response.content)# retorna el contenido de dicha fecha consultada
-            if response.content== b'[]':# verifica si el contenido es nulo manda una lista vacia o retorna False.
-                return False
-            return True # pues si no retorna true
+            # una sola petición descarga todo el año, las demás fechas se responden desde la caché del cliente
+            return clienteEnLinea().esFeriado(datetime.date.fromordinal(ordinal))
         else: # nos conecta con los feriados personalizados o creados 
-            FiestasApi=HolidayBase(prov='EC-SD') # instencia o crea un objeto de la clases feriadoTschilas con un parametro el cual es la cuadad de Santo Domingo
-            return date in FiestasApi
+            # consulta el calendario de Santo Domingo en el índice compilado, que se construye una sola vez por proceso
+            return INDICE_FERIADOS.esFeriado('EC-SD', ordinal)
+
+    def __encontrarDia(self, fecha):
+        """Devuelve el día a partir de la fecha (datetime.date): por ejemplo, Wednesday"""
+        return self.__days[fecha.weekday()]
+
+    def esFinSemana(self):
+        """Devuelve True si la fecha cae en fin de semana"""
+        return self.__encontrarDia(datetime.date.fromordinal(self.fechaOrdinal)) in self.__FinSemana
+
+    def diaDePago(self, prov='EC-SD'):
+        """
+        Devuelve la fecha (datetime.date) en la que se puede pagar: la misma
+        fecha si es día hábil, si no el siguiente día hábil de la provincia
+        """
+        return INDICE_FERIADOS.siguienteDiaHabil(prov, datetime.date.fromordinal(self.fechaOrdinal), incluir=True)
+
+    def evaluar (self):
+
+        # Comprobar si la fecha es un día festivo
+        feriado = bool(self.__esFeriado(self.fechaOrdinal , self.online))
+        if METRICAS.activo:
+            METRICAS.contar("acredita_reglas_total", regla="evaluar", resultado=feriado)
+        return feriado
+
+    async def evaluarAsync (self):
+        """Versión asíncrona de evaluar(), no bloquea el bucle de eventos en modo en línea"""
+        resultado, = await resolverFeriadosAsync([self.fecha], self.online)
+        return resultado
+
+class Credito(PersonaBono):
+    '''
+    La clase Credito(PersonaBono) sirve para identidicar si un usuario que sea beneficiario al bono
+    de desarrollo humano puede recibir el crédito que ofrece el gobierno para las familias que esten
+    emprendiendo algún tipo de negocio y poder reacctivar su condición económica.
+    http://www.ecuadorlegalonline.com/consultas/credito-de-desarrollo-humano/
+
+     ATRIBUTOS
+     ----------
+         -HEREDA DE LA CALSE BASE (PersonaBono).
+         -------------------------------------------
+         
+         bono:float
+             Es el bono recibido por la persona beneficiaria.
+         cedula:str
+             Es el número de identificación de la persona beneficiaria.
+         residencia:str
+             Es el lugar donde habita actualmente la persona beneficiada.
+     
+     METODOS
+     ---------
+         __init__(self, nombre, sexo, edad, ocupacion, ingresos, enfermedades, bono, cedula, residencia):
+             Método que construye todos los atributos para los objetos de la clase Credito(PersonaBono)
+         bdh(): Es la abreviación de (Bono de desarrollo humano)
+             Determina según la cantidad de bonificación que reciba el usuario si
+             es perteneciente al crédito del bono de desarrollo humano.
+             Devuelve un condicional.
+         ptv_mma(): Es la abreviación de (Pención toda una vida y pención mis mejores años)
+             Este método corresponde para identificar si las personas reciben el credito
+             segun reciban el bono de Pención toda una vida o pención mis mejores años.
+             Devuelve un condicional.
+        
+    '''
+
+
+    __slots__ = ("bono", "cedula", "residencia")
+
+    def __init__(self, nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, bono, cedula, residencia, online=False):
+        '''
+        Método que construye todos los atributos para los objetos de la clase Credito(PersonaBono)
+         
+         PARAMETROS
+         ------------
+             -HEREDA DE LA CALSE BASE (PersonaBono).
+             -------------------------------------------
+            
+             bono:float
+                 Es el bono recibido por la persona beneficiaria.
+             cedula:str
+                 Es el número de identificación de la persona beneficiaria.
+             residencia:str
+                 Es el lugar donde habita actualmente la persona beneficiada.
+        '''
+        self.cedula=cedula
+        self.residencia=_internar(residencia)
+        self.bono=bono
+        super().__init__(nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, online)
+
+    def bdh (self): #Bono de desarrollo humano
+        '''
+        Este método sirve para identificar cuantos es el valor que la persona
+        beneficiaria recibe del bono y según ese valor determinar si es 
+        perteneciente al crédito.
+
+         RETORNA
+         --------
+            return False
+                 Devuelve falso si el usuaria recibe un bono menor o igual
+                 a 28.20 $
+        '''
+        excluido = self.bono<=UMBRALES["bdh"]
+        if METRICAS.activo:
+            METRICAS.contar("acredita_reglas_total", regla="bdh", resultado=not excluido)
+        if excluido:
+            return False
+
+    def ptv_mma (self): #Pención toda una vida y pención mis mejores años
+        '''
+        Este método sirve para identificar si una persona es beneficiaria a 
+        recibe la pención toda vida o la pención mis mejores años, y según
+        la cantidad de la perción determinar si puede recibir el crédito.
+
+         RETORNA
+         --------
+            return False
+                 Devuelve falso si el usuaria recibe una pención menor o igual
+                 a 34.67 $
+        '''
+        excluido = self.bono<=UMBRALES["ptv_mma"]
+        if METRICAS.activo:
+            METRICAS.contar("acredita_reglas_total", regla="ptv_mma", resultado=not excluido)
+        if excluido:
+            return False
+
+
+#-------------------------------------------------------- EVALUACIÓN VECTORIZADA --------------------------------------------#
+
+def evaluarColumnas(edad=None, bono=None, enfermedades=None, fechas=None, prov='EC-SD'):
+    """
+    Evalúa las reglas de elegibilidad sobre columnas completas en una sola pasada
+
+    Es el equivalente vectorizado de llamar a los métodos de PersonaBono y
+    Credito objeto por objeto; cada máscara coincide exactamente con ellos:
+
+        esHombre[i]      == bool(persona.esHombre(...))      edad >= EDAD_ADULTO_MAYOR
+        discapacidad[i]  == bool(persona.discapacidad())     enfermedades == "Si"
+        bdh[i]           == (credito.bdh() is not False)     bono > UMBRALES["bdh"]
+        ptv_mma[i]       == (credito.ptv_mma() is not False) bono > UMBRALES["ptv_mma"]
+        feriado[i]       == persona.evaluar()                (sin conexión)
+
+     PARAMETROS
+     -----------
+         edad:array
+             edades de los beneficiarios
+         bono:array
+             bonos recibidos
+         enfermedades:array
+             respuestas "Si"/"No" de enfermedades
+         fechas:array
+             ordinales de fecha (date.toordinal())
+         prov:str
+             provincia del calendario de feriados
+     RETORNA
+     ----------
+         dict
+             Diccionario {regla: máscara booleana de NumPy}; solo contiene las
+             reglas cuyas columnas se pasaron
+    """
+    import numpy as np
+    mascaras = {}
+    if edad is not None:
+        mascaras["esHombre"] = np.asarray(edad) >= EDAD_ADULTO_MAYOR
+    if enfermedades is not None:
+        mascaras["discapacidad"] = np.asarray(enfermedades) == "Si"
+    if bono is not None:
+        bono = np.asarray(bono, dtype=np.float64)
+        mascaras["bdh"] = bono > UMBRALES["bdh"]
+        mascaras["ptv_mma"] = bono > UMBRALES["ptv_mma"]
+    if fechas is not None:
+        mascaras["feriado"] = INDICE_FERIADOS.esFeriadoVector(prov, fechas)
+    if METRICAS.activo:
+        for regla, mascara in mascaras.items():
+            positivos = int(np.count_nonzero(mascara))
+            METRICAS.contar("acredita_reglas_total", positivos, regla=regla, resultado=True)
+            METRICAS.contar("acredita_reglas_total", mascara.size - positivos, regla=regla, resultado=False)
+    return mascaras
+
+
+#-------------------------------------------------------- CÉDULAS --------------------------------------------#
+
+# Resultados de verificarCedulas
+CEDULA_VALIDA = 0
+CEDULA_FORMATO = 1        # no tiene exactamente 10 dígitos
+CEDULA_PROVINCIA = 2      # los dos primeros dígitos no son una provincia (01-24) ni 30 (exterior)
+CEDULA_TIPO = 3           # el tercer dígito no corresponde a una persona natural (0-5)
+CEDULA_VERIFICADOR = 4    # el dígito verificador (módulo 10) no coincide
+
+# Coeficientes del módulo 10 para los nueve primeros dígitos
+_COEFICIENTES_CEDULA = (2, 1, 2, 1, 2, 1, 2, 1, 2)
+
+
+def esCedulaValida(cedula):
+    """
+    Devuelve True si la cédula ecuatoriana es válida (provincia, tipo y dígito verificador)
+    """
+    if not isinstance(cedula, str) or len(cedula) != 10 or not (cedula.isascii() and cedula.isdigit()):
+        return False
+    digitos = [int(d) for d in cedula]
+    provincia = digitos[0] * 10 + digitos[1]
+    if not (1 <= provincia <= 24 or provincia == 30) or digitos[2] > 5:
+        return False
+    suma = sum(p - 9 if p > 9 else p for p in (d * c for d, c in zip(digitos, _COEFICIENTES_CEDULA)))
+    return (10 - suma % 10) % 10 == digitos[9]
+
+
+def verificarCedulas(cedulas):
+    """
+    Verifica una columna completa de cédulas ecuatorianas de una sola vez
+
+    Las cédulas se convierten en una matriz de dígitos de n x 10 y las
+    comprobaciones (código de provincia, tercer dígito y dígito verificador
+    módulo 10) se hacen con operaciones de NumPy sobre toda la matriz.
+
+     PARAMETROS
+     -----------
+         cedulas:array
+             lista o arreglo de cédulas como cadenas
+     RETORNA
+     ----------
+         numpy.ndarray
+             Arreglo int8 con CEDULA_VALIDA o el código del primer error
+             encontrado (CEDULA_FORMATO, CEDULA_PROVINCIA, CEDULA_TIPO,
+             CEDULA_VERIFICADOR)
+    """
+    import numpy as np
+    cedulas = np.asarray(cedulas, dtype=str).ravel()
+    codigos = np.full(cedulas.size, CEDULA_VALIDA, dtype=np.int8)
+    if not cedulas.size:
+        return codigos
+    # cada carácter de una cadena U10 ocupa un entero de 32 bits con su código Unicode
+    digitos = cedulas.astype("U10").view(np.uint32).reshape(-1, 10).astype(np.int16) - ord("0")
+    formato = (np.char.str_len(cedulas) == 10) & ((digitos >= 0) & (digitos <= 9)).all(axis=1)
+    digitos = np.where(formato[:, None], digitos, 0)
+    provincia = digitos[:, 0] * 10 + digitos[:, 1]
+    provinciaValida = ((provincia >= 1) & (provincia <= 24)) | (provincia == 30)
+    productos = digitos[:, :9] * np.array(_COEFICIENTES_CEDULA, dtype=np.int16)
+    suma = np.where(productos > 9, productos - 9, productos).sum(axis=1)
+    verificador = (10 - suma % 10) % 10 == digitos[:, 9]
+    # se asignan en orden inverso para que quede el primer error de la lista
+    codigos[~verificador] = CEDULA_VERIFICADOR
+    codigos[digitos[:, 2] > 5] = CEDULA_TIPO
+    codigos[~provinciaValida] = CEDULA_PROVINCIA
+    codigos[~formato] = CEDULA_FORMATO
+    return codigos
+
+
+def validarCedulas(cedulas):
+    """
+    Devuelve una máscara booleana de NumPy con True en las cédulas válidas (ver verificarCedulas)
+    """
+    return verificarCedulas(cedulas) == CEDULA_VALIDA
+
+
+class IndiceCedulas:
+    """
+    Índice de registros Credito por número de cédula.
+
+    Busca un beneficiario por su cédula con una consulta a un diccionario y
+    detecta las cédulas repetidas al cargarlas, para evitar pagar dos veces
+    a la misma persona.
+    ...
+    Métodos
+    -------
+    agregar(credito):
+        Agrega un registro; devuelve True si su cédula ya estaba en el índice
+    buscar(cedula):
+        Devuelve el primer registro con esa cédula o None
+    registros(cedula):
+        Devuelve la lista de registros con esa cédula
+    duplicados():
+        Devuelve {cedula: [registros]} de las cédulas repetidas
+    invalidas():
+        Devuelve las cédulas del índice que no son válidas
+    """
+
+    def __init__(self, creditos=()):
+        """
+        Construye el índice con los registros de creditos
+        """
+        self._registros = {}
+        # solo las cédulas repetidas guardan una lista, las demás el registro directamente
+        self._duplicados = {}
+        for credito in creditos:
+            self.agregar(credito)
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __contains__(self, cedula):
+        return _normalizarCedula(cedula) in self._registros
+
+    def agregar(self, credito):
+        """
+        Agrega un registro al índice; devuelve True si su cédula ya estaba
+        """
+        cedula = _normalizarCedula(credito.cedula)
+        anterior = self._registros.setdefault(cedula, credito)
+        if anterior is credito:
+            return False
+        self._duplicados.setdefault(cedula, [anterior]).append(credito)
+        return True
+
+    def buscar(self, cedula):
+        """Devuelve el primer registro con la cédula, o None si no está"""
+        return self._registros.get(_normalizarCedula(cedula))
+
+    def registros(self, cedula):
+        """Devuelve todos los registros con la cédula (lista vacía si no está)"""
+        cedula = _normalizarCedula(cedula)
+        if cedula in self._duplicados:
+            return list(self._duplicados[cedula])
+        registro = self._registros.get(cedula)
+        return [] if registro is None else [registro]
+
+    def duplicados(self):
+        """Devuelve {cedula: [registros]} de las cédulas que aparecen más de una vez"""
+        return {cedula: list(registros) for cedula, registros in self._duplicados.items()}
+
+    def invalidas(self):
+        """Devuelve la lista de cédulas del índice que no pasan verificarCedulas"""
+        cedulas = list(self._registros)
+        return [c for c, valida in zip(cedulas, validarCedulas(cedulas).tolist()) if not valida]
+
+
+def _normalizarCedula(cedula):
+    return cedula.strip() if isinstance(cedula, str) else str(cedula)
+
+
+#-------------------------------------------------------- PROCESAMIENTO POR LOTES --------------------------------------------#
+
+# Columnas de la salida del procesamiento por lotes
+COLUMNAS_RESULTADO = ["fila", "cedula", "nombre", "feriado", "esHombre", "discapacidad", "bdh", "ptv_mma", "error"]
+
+
+def _aBooleano(valor):
+    """Convierte el texto de un archivo (true/1/si) en booleano"""
+    if isinstance(valor, str):
+        return valor.strip().lower() in ("true", "1", "si", "sí")
+    return bool(valor)
+
+
+def crearRegistro(registro):
+    """
+    Construye un PersonaBono, o un Credito si el registro tiene la columna bono,
+    a partir de un diccionario leído de un archivo CSV o JSONL
+
+    Lanza ValueError si la fecha no tiene el formato AAAA-MM-DD.
+    """
+    datos = (registro.get("nombre"), registro.get("sexo"), int(registro["edad"]), None,
+             registro.get("ocupacion"), float(registro.get("ingresos") or 0), registro.get("enfermedades"))
+    enLinea = _aBooleano(registro.get("online", False))
+    if registro.get("bono") not in (None, ""):
+        persona = Credito(*datos, float(registro["bono"]), registro.get("cedula"), registro.get("residencia"), enLinea)
+    else:
+        persona = PersonaBono(*datos, enLinea)
+    # la fecha se asigna con el setter para validar su formato
+    persona.fecha = registro.get("fecha") or ""
+    return persona
+
+
+def evaluarRegistro(fila, registro, dependencias=False):
+    """
+    Evalúa todas las reglas de un registro y devuelve un diccionario con
+    las columnas de COLUMNAS_RESULTADO
+
+    Si dependencias es True agrega la columna "dependencias" con los datos de
+    los que depende el resultado (ver reevaluarIncremental).
+    """
+    resultado = dict.fromkeys(COLUMNAS_RESULTADO)
+    resultado.update(fila=fila, cedula=registro.get("cedula"), nombre=registro.get("nombre"))
+    try:
+        persona = crearRegistro(registro)
+        resultado["feriado"] = persona.evaluar()
+        resultado["esHombre"] = persona.esHombre(registro.get("seguroSocial"))
+        resultado["discapacidad"] = persona.discapacidad()
+        if isinstance(persona, Credito):
+            resultado["bdh"] = persona.bdh()
+            resultado["ptv_mma"] = persona.ptv_mma()
+    # ArithmeticError: valores como "edad": Infinity (OverflowError al convertirlos a int)
+    except (ValueError, KeyError, TypeError, ArithmeticError) as error:
+        resultado["error"] = str(error)
+    else:
+        if dependencias:
+            resultado["dependencias"] = _dependencias(persona)
+    if dependencias:
+        resultado.setdefault("dependencias", None)
+    return resultado
+
+
+def _evaluarBloque(bloque, dependencias=False):
+    """Evalúa un bloque de (fila, registro) en un proceso del grupo"""
+    return [evaluarRegistro(fila, registro, dependencias) for fila, registro in bloque]
+
+
+def _iniciarProceso(instantanea, metricas):
+    global INDICE_FERIADOS
+    if instantanea:
+        # todos los procesos abren la misma instantánea y comparten sus páginas
+        INDICE_FERIADOS = IndiceFeriados.abrir(instantanea)
+    if metricas:
+        # un proceso creado con fork hereda las métricas del padre, se empieza de cero
+        METRICAS.limpiar()
+        METRICAS.activar()
+
+
+def _evaluarBloqueMedido(bloque, dependencias=False):
+    """Como _evaluarBloque, pero devuelve también las métricas del bloque para sumarlas en el proceso principal"""
+    return _evaluarBloque(bloque, dependencias), METRICAS.extraer()
+
 
-    def evaluar (self):
+def _formato(ruta, formato):
+    if formato:
+        return formato
+    return "csv" if ruta.lower().endswith(".csv") else "jsonl"
 
-        # Comprobar si la fecha es un día festivo
-        if self.__esFeriado(self.fecha , self.online):
-            return True   
-        return False 
 
-class Credito(PersonaBono):
-    '''
-    La clase Credito(PersonaBono) sirve para identidicar si un usuario que sea beneficiario al bono
-    de desarrollo humano puede recibir el crédito que ofrece el gobierno para las familias que esten
-    emprendiendo algún tipo de negocio y poder reacctivar su condición económica.
-    http://www.ecuadorlegalonline.com/consultas/credito-de-desarrollo-humano/
+def leerRegistros(ruta, formato=None, desde=0):
+    """
+    Lee un archivo CSV o JSONL de registros sin cargarlo completo en memoria
 
-     ATRIBUTOS
+    Devuelve un generador de tuplas (fila, registro), donde fila empieza en 0,
+    omitiendo las primeras `desde` filas. En JSONL fila es el número de línea,
+    así que las líneas vacías se saltan sin cambiar la numeración.
+    """
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if _formato(ruta, formato) == "csv":
+            yield from enumerate(itertools.islice(csv.DictReader(archivo), desde, None), desde)
+        else:
+            # en JSONL las filas omitidas no se decodifican
+            lineas = enumerate(itertools.islice(archivo, desde, None), desde)
+            yield from ((fila, json.loads(linea)) for fila, linea in lineas if linea.strip())
+
+
+def _ultimaFila(ruta, formato):
+    """
+    Devuelve el número de fila de la última línea completa de un archivo de
+    salida (None si aún no tiene resultados) y descarta una última línea
+    incompleta que haya quedado de una ejecución interrumpida
+
+    Solo se lee el final del archivo, así que reanudar no depende de su tamaño.
+    """
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "rb+") as archivo:
+        posicion = archivo.seek(0, os.SEEK_END)
+        cola = b""
+        # se retrocede por bloques hasta tener la última línea completa entera
+        while posicion > 0 and cola.count(b"\n") < 2:
+            leer = min(65536, posicion)
+            posicion -= leer
+            archivo.seek(posicion)
+            cola = archivo.read(leer) + cola
+        ultimo = cola.rfind(b"\n")
+        archivo.truncate(posicion + ultimo + 1)
+    if ultimo < 0:
+        return None
+    linea = cola[cola.rfind(b"\n", 0, ultimo) + 1:ultimo].decode("utf-8")
+    if _formato(ruta, formato) == "csv":
+        fila = next(csv.reader([linea]))[0]
+        return None if fila == "fila" else int(fila)  # solo el encabezado
+    return json.loads(linea)["fila"]
+
+
+def procesarLote(entrada, salida, procesos=None, tamanoBloque=10000, desde=0, reanudar=False,
+                 formatoEntrada=None, formatoSalida=None, progreso=None, instantanea=None, dependencias=False):
+    """
+    Evalúa un archivo de registros por bloques y escribe los resultados en otro archivo
+
+    Los bloques se reparten entre un grupo de procesos y solo hay unos pocos
+    bloques en memoria a la vez, así que el uso de memoria no depende del
+    tamaño del archivo. Los resultados se escriben en el mismo orden que la
+    entrada.
+
+     PARAMETROS
+     -----------
+         entrada:str
+             ruta del archivo CSV o JSONL de registros
+         salida:str
+             ruta del archivo CSV o JSONL de resultados
+         procesos:int
+             número de procesos; por defecto el número de CPUs, 1 evalúa en este proceso
+         tamanoBloque:int
+             número de registros por bloque
+         desde:int
+             número de filas de la entrada que se omiten
+         reanudar:bool
+             si es True continúa después de la última fila escrita en la salida
+         progreso:callable
+             función que recibe el número de filas procesadas después de cada bloque
+         instantanea:str
+             ruta de una instantánea de calendarios (ver usarInstantanea) que
+             abren todos los procesos en lugar de compilar cada uno los suyos
+         dependencias:bool
+             si es True cada resultado guarda también sus dependencias, para
+             actualizar la salida después con reevaluarIncremental (solo JSONL)
+     RETORNA
      ----------
-         -HEREDA DE LA CALSE BASE (PersonaBono).
-         -------------------------------------------
-         
-         bono:float
-             Es el bono recibido por la persona beneficiaria.
-         cedula:str
-             Es el número de identificación de la persona beneficiaria.
-         residencia:str
-             Es el lugar donde habita actualmente la persona beneficiada.
-     
-     METODOS
-     ---------
-         __init__(self, nombre, sexo, edad, ocupacion, ingresos, enfermedades, bono, cedula, residencia):
-             Método que construye todos los atributos para los objetos de la clase Credito(PersonaBono)
-         bdh(): Es la abreviación de (Bono de desarrollo humano)
-             Determina según la cantidad de bonificación que reciba el usuario si
-             es perteneciente al crédito del bono de desarrollo humano.
-             Devuelve un condicional.
-         ptv_mma(): Es la abreviación de (Pención toda una vida y pención mis mejores años)
-             Este método corresponde para identificar si las personas reciben el credito
-             segun reciban el bono de Pención toda una vida o pención mis mejores años.
-             Devuelve un condicional.
-        
-    '''
+         int
+             Número de filas procesadas en esta ejecución
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    if instantanea:
+        usarInstantanea(instantanea)
+    formatoSalida = _formato(salida, formatoSalida)
+    if dependencias and formatoSalida == "csv":
+        raise ValueError('Las dependencias solo se pueden guardar en una salida JSONL')
+    evaluarBloque = functools.partial(_evaluarBloqueMedido if METRICAS.activo and procesos != 1 else _evaluarBloque,
+                                      dependencias=dependencias)
+    if reanudar:
+        # se continúa después de la última fila escrita, que ya incluye el desde original
+        ultima = _ultimaFila(salida, formatoSalida)
+        if ultima is not None:
+            desde = ultima + 1
+    nueva = not (reanudar and os.path.exists(salida) and os.path.getsize(salida))
+    registros = leerRegistros(entrada, formatoEntrada, desde)
+    bloques = iter(lambda: list(itertools.islice(registros, tamanoBloque)), [])
+    procesadas = 0
+    with open(salida, "w" if nueva else "a", newline="", encoding="utf-8") as archivo:
+        if formatoSalida == "csv":
+            escritor = csv.DictWriter(archivo, COLUMNAS_RESULTADO)
+            if nueva:
+                escritor.writeheader()
+            escribir = escritor.writerows
+        else:
+            escribir = lambda filas: archivo.writelines(json.dumps(f, ensure_ascii=False) + "\n" for f in filas)
+        if procesos == 1:
+            resultados = map(evaluarBloque, bloques)
+            grupo = None
+        else:
+            procesos = procesos or os.cpu_count() or 1
+            grupo = ProcessPoolExecutor(procesos, initializer=_iniciarProceso, initargs=(instantanea, METRICAS.activo))
+            if METRICAS.activo:
+                resultados = (METRICAS.combinar(metricas) or bloque for bloque, metricas
+                              in _mapaAcotado(grupo, evaluarBloque, bloques, 2 * procesos))
+            else:
+                resultados = _mapaAcotado(grupo, evaluarBloque, bloques, 2 * procesos)
+        try:
+            for bloque in resultados:
+                escribir(bloque)
+                archivo.flush()
+                procesadas += len(bloque)
+                if progreso is not None:
+                    progreso(desde + procesadas)
+        finally:
+            if grupo is not None:
+                grupo.shutdown(cancel_futures=True)
+    return procesadas
 
 
-    def __init__(self, nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, bono, cedula, residencia, online=False):
-        '''
-        Método que construye todos los atributos para los objetos de la clase Credito(PersonaBono)
-         
-         PARAMETROS
-         ------------
-             -HEREDA DE LA CALSE BASE (PersonaBono).
-             -------------------------------------------
-            
-             bono:float
-                 Es el bono recibido por la persona beneficiaria.
-             cedula:str
-                 Es el número de identificación de la persona beneficiaria.
-             residencia:str
-                 Es el lugar donde habita actualmente la persona beneficiada.
-        '''
-        self.cedula=cedula
-        self.residencia=residencia
-        self.bono=bono
-        super().__init__(nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, online)
+def _mapaAcotado(grupo, funcion, elementos, maximo):
+    """
+    Como grupo.map, pero con a lo sumo `maximo` tareas pendientes a la vez
+    para no leer toda la entrada en memoria
+    """
+    pendientes = []
+    for elemento in elementos:
+        pendientes.append(grupo.submit(funcion, elemento))
+        if len(pendientes) >= maximo:
+            yield pendientes.pop(0).result()
+    for pendiente in pendientes:
+        yield pendiente.result()
 
-    def bdh (self): #Bono de desarrollo humano
-        '''
-        Este método sirve para identificar cuantos es el valor que la persona
-        beneficiaria recibe del bono y según ese valor determinar si es 
-        perteneciente al crédito.
 
-         RETORNA
-         --------
-            return False
-                 Devuelve falso si el usuaria recibe un bono menor o igual
-                 a 28.20 $
-        '''
-        if(self.bono<=28.20):
+#-------------------------------------------------------- EVALUACIÓN INCREMENTAL --------------------------------------------#
+
+def _dependencias(persona):
+    """
+    Datos de los que depende el resultado de un registro: la fecha y la
+    provincia del calendario (None si se consultó en línea) y, en un Credito,
+    el bono y los umbrales con los que se comparó
+    """
+    dependencias = {"prov": None if persona.online else 'EC-SD', "ordinal": persona.fechaOrdinal}
+    if isinstance(persona, Credito):
+        dependencias["bono"] = persona.bono
+        dependencias["umbrales"] = dict(UMBRALES)
+    return dependencias
+
+
+def aplicarCambios(cambios):
+    """
+    Aplica un conjunto de cambios a INDICE_FERIADOS y a los umbrales del bono
+    (con IndiceFeriados.modificar y cambiarUmbrales), para todo el proceso
+
+     PARAMETROS
+     -----------
+         cambios:dict
+             {"prov": provincia (por defecto EC-SD),
+              "agregados": fechas AAAA-MM-DD que pasan a ser feriado,
+              "quitados": fechas AAAA-MM-DD que dejan de ser feriado,
+              "umbrales": {"bdh": nuevo umbral, "ptv_mma": nuevo umbral}}
+    """
+    umbrales = cambios.get("umbrales") or {}
+    desconocidos = set(umbrales) - set(UMBRALES)
+    if desconocidos:
+        raise ValueError(f'Umbrales desconocidos: {", ".join(sorted(desconocidos))}')
+    INDICE_FERIADOS.modificar(cambios.get("prov", 'EC-SD'),
+                              [_aFecha(f) for f in cambios.get("agregados", ())],
+                              [_aFecha(f) for f in cambios.get("quitados", ())])
+    cambiarUmbrales(**umbrales)
+
+
+def reevaluarIncremental(estado, cambios, diferencias=None):
+    """
+    Actualiza los resultados guardados después de un cambio de feriados o de
+    umbrales, re-evaluando solo los registros afectados
+
+    Un registro se re-evalúa si su fecha está entre las fechas agregadas o
+    quitadas de su provincia o si su bono queda entre el umbral guardado y el
+    nuevo. Los registros consultados en línea no se re-evalúan por un cambio
+    de feriados: su resultado viene de la API y no de INDICE_FERIADOS. Las
+    líneas que no pueden estar afectadas se reconocen por el texto de su
+    provincia, su ordinal y su bono y se copian tal cual, sin decodificarlas.
+
+    Los umbrales guardados de un registro no afectado no se actualizan: con
+    ese bono dan el mismo resultado que el umbral nuevo, así que siguen
+    sirviendo para decidir si un cambio posterior lo afecta.
+
+     PARAMETROS
+     -----------
+         estado:str
+             archivo JSONL escrito por procesarLote(..., dependencias=True);
+             se reemplaza por los resultados actualizados
+         cambios:dict
+             conjunto de cambios (ver aplicarCambios), que se aplica antes de re-evaluar
+         diferencias:str o archivo
+             ruta o archivo abierto (por ejemplo sys.stdout) donde se escribe una
+             línea JSON {"fila", "cedula", "campo", "antes", "despues"} por cada
+             resultado que cambió
+     RETORNA
+     ----------
+         tuple
+             (registros re-evaluados, resultados que cambiaron)
+    """
+    import contextlib
+    import re
+    prov = cambios.get("prov", 'EC-SD')
+    fechas = {_aFecha(f).toordinal() for clave in ("agregados", "quitados") for f in cambios.get(clave, ())}
+    umbrales = {regla: float(valor) for regla, valor in (cambios.get("umbrales") or {}).items()}
+    aplicarCambios(cambios)
+    reevaluados = cambiados = 0
+    # dependencias tal como las escribe evaluarRegistro, al final de cada línea
+    patron = re.compile(r'"dependencias": (?:null|\{"prov": (null|"[^"]*"), "ordinal": (\d+)'
+                        r'(?:, "bono": ([^,]+), "umbrales": \{"bdh": ([^,]+), "ptv_mma": ([^}]+)\})?\})\}\s*$')
+    provJson = json.dumps(prov, ensure_ascii=False)
+
+    def posible(coincidencia):
+        """False si la línea no puede estar afectada por los cambios"""
+        if coincidencia[2] is None:
+            return False  # registro con error, sin dependencias
+        if coincidencia[1] == provJson and int(coincidencia[2]) in fechas:
+            return True
+        if coincidencia[3] is None or not umbrales:
             return False
+        bono = float(coincidencia[3])
+        anteriores = {"bdh": float(coincidencia[4]), "ptv_mma": float(coincidencia[5])}
+        return any(min(umbral, anteriores[regla]) < bono <= max(umbral, anteriores[regla])
+                   for regla, umbral in umbrales.items())
 
-    def ptv_mma (self): #Pención toda una vida y pención mis mejores años
-        '''
-        Este método sirve para identificar si una persona es beneficiaria a 
-        recibe la pención toda vida o la pención mis mejores años, y según
-        la cantidad de la perción determinar si puede recibir el crédito.
+    if diferencias is None:
+        diferencias = open(os.devnull, "w")
+    elif isinstance(diferencias, str):
+        diferencias = open(diferencias, "w", encoding="utf-8")
+    else:
+        # un archivo recibido abierto no se cierra al terminar
+        diferencias = contextlib.nullcontext(diferencias)
+    temporal = f"{estado}.{os.getpid()}.tmp"
+    with open(estado, encoding="utf-8") as entrada, open(temporal, "w", encoding="utf-8") as salida, \
+            diferencias as diferencia:
+        for linea in entrada:
+            if not linea.strip():
+                continue
+            coincidencia = patron.search(linea)
+            if coincidencia is not None and not posible(coincidencia):
+                salida.write(linea)
+                continue
+            # línea posiblemente afectada, o escrita con otro formato
+            resultado = json.loads(linea)
+            dependencias = resultado.get("dependencias")
+            if dependencias is None:
+                salida.write(linea)
+                continue
+            campos = []
+            if fechas and dependencias["ordinal"] in fechas and dependencias["prov"] == prov:
+                campos.append("feriado")
+            anteriores = dependencias.get("umbrales")
+            for regla, umbral in umbrales.items():
+                if anteriores is None or anteriores[regla] == umbral:
+                    continue
+                # el resultado solo cambia si el bono queda entre los dos umbrales
+                if min(umbral, anteriores[regla]) < dependencias["bono"] <= max(umbral, anteriores[regla]):
+                    campos.append(regla)
+                    anteriores[regla] = umbral
+            if not campos:
+                salida.write(linea)
+                continue
+            reevaluados += 1
+            for campo, valor in _reevaluarCampos(dependencias, campos).items():
+                if valor != resultado[campo]:
+                    cambiados += 1
+                    diferencia.write(json.dumps({"fila": resultado["fila"], "cedula": resultado["cedula"], "campo": campo,
+                                                 "antes": resultado[campo], "despues": valor}, ensure_ascii=False) + "\n")
+                    resultado[campo] = valor
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+    os.replace(temporal, estado)
+    return reevaluados, cambiados
+
+
+def _reevaluarCampos(dependencias, campos):
+    """Vuelve a calcular los campos indicados con las mismas reglas que evaluarRegistro"""
+    if "bono" in dependencias:
+        persona = Credito(None, None, 0, None, None, 0, None, dependencias["bono"], None, None, dependencias["prov"] is None)
+    else:
+        persona = PersonaBono(None, None, 0, None, None, 0, None, dependencias["prov"] is None)
+    persona._ordinal = dependencias["ordinal"]
+    return {campo: persona.evaluar() if campo == "feriado" else getattr(persona, campo)() for campo in campos}
+
+
+#-------------------------------------------------------- MOTOR DE REGLAS --------------------------------------------#
+
+# Una regla de elegibilidad compara un campo del registro con un valor. Los
+# operadores son <, <=, >, >=, ==, !=, "en" (valor es una lista) y "feriado"
+# o "noFeriado" (valor es la provincia del calendario, por defecto EC-SD).
+ReglaElegibilidad = namedtuple("ReglaElegibilidad", "nombre campo operador valor")
+
+# Costo inicial estimado de cada operador en nanosegundos por registro; se
+# reemplaza por el costo medido cuando la regla ya evaluó _MINIMO_MEDICION registros
+COSTO_OPERADOR = {"<": 1.0, "<=": 1.0, ">": 1.0, ">=": 1.0, "==": 10.0, "!=": 10.0, "en": 50.0,
+                  "feriado": 100.0, "noFeriado": 100.0}
+_MINIMO_MEDICION = 1000
+_COMPARACIONES = {"<": "less", "<=": "less_equal", ">": "greater", ">=": "greater_equal", "==": "equal", "!=": "not_equal"}
+
+
+def _esNumero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def reglasPorDefecto():
+    """
+    Reglas equivalentes a los métodos de PersonaBono y Credito (ver
+    evaluarColumnas), con los umbrales vigentes
+    """
+    return {
+        "esHombre": {"reglas": [{"nombre": "adultoMayor", "campo": "edad", "operador": ">=", "valor": EDAD_ADULTO_MAYOR}]},
+        "discapacidad": {"reglas": [{"nombre": "enfermedad", "campo": "enfermedades", "operador": "==", "valor": "Si"}]},
+        "bdh": {"reglas": [{"nombre": "bonoSobreUmbralBdh", "campo": "bono", "operador": ">", "valor": UMBRALES["bdh"]}]},
+        "ptv_mma": {"reglas": [{"nombre": "bonoSobreUmbralPtvMma", "campo": "bono", "operador": ">", "valor": UMBRALES["ptv_mma"]}]},
+        "feriado": {"reglas": [{"nombre": "fechaFeriado", "campo": "fecha", "operador": "feriado", "valor": 'EC-SD'}]},
+    }
+
+
+class MotorReglas:
+    """
+    Evaluador de reglas de elegibilidad declarativas.
+
+    Cada decisión tiene una lista de reglas y un modo: "todas" (la decisión es
+    True si se cumplen todas las reglas y la decide la primera que no se
+    cumple) o "alguna" (es True si se cumple alguna y la decide la primera que
+    se cumple). Por ejemplo:
+
+        {"credito": {"modo": "todas", "reglas": [
+            {"nombre": "bono", "campo": "bono", "operador": ">", "valor": 28.20},
+            {"nombre": "mayorDeEdad", "campo": "edad", "operador": ">=", "valor": 18},
+            {"nombre": "diaHabil", "campo": "fecha", "operador": "noFeriado", "valor": "EC-SD"}]}}
+
+    Las reglas se compilan en una tabla de decisión que se evalúa por columnas
+    con NumPy: cada regla se evalúa solo sobre los registros que las reglas
+    anteriores aún no decidieron. El resultado no depende del orden de las
+    reglas, así que se ordenan por costo medido entre probabilidad de
+    decidir: primero las comparaciones numéricas baratas y selectivas, al
+    final las consultas de feriados. El orden se recalcula después de cada lote.
+    ...
+    Métodos
+    -------
+    desdeArchivo(ruta):
+        Crea el motor a partir de un archivo JSON (método de clase)
+    evaluarLote(registros):
+        Evalúa todas las decisiones sobre una lista de registros
+    evaluar(registro):
+        Devuelve {decisión: (valor, regla que decidió)} de un registro
+    explicar(registro):
+        Devuelve una línea de texto por decisión con la regla que la decidió
+    decisiones:
+        Nombres de las decisiones (propiedad)
+    orden(decision):
+        Devuelve los nombres de las reglas en el orden en que se evalúan
+    estadisticas():
+        Devuelve la selectividad y el costo medidos de cada regla
+    """
+
+    def __init__(self, decisiones):
+        """
+        Construye la tabla de decisión
+
+        Lanza ValueError si una decisión no tiene reglas o tiene un modo u
+        operador desconocido.
+        """
+        self._tabla = {}
+        for decision, definicion in decisiones.items():
+            modo = definicion.get("modo", "todas")
+            if modo not in ("todas", "alguna"):
+                raise ValueError(f'Modo desconocido en la decisión {decision}: {modo}')
+            reglas = [self._compilar(decision, regla) for regla in definicion.get("reglas", ())]
+            if not reglas:
+                raise ValueError(f'La decisión {decision} no tiene reglas')
+            # [regla, registros evaluados, registros que la cumplieron, segundos]
+            self._tabla[decision] = (modo, [[regla, 0, 0, 0.0] for regla in reglas])
+        self._ordenes = {decision: list(range(len(entradas))) for decision, (_, entradas) in self._tabla.items()}
+        self._candado = threading.Lock()
+        for decision in self._tabla:
+            self._reordenar(decision)
+
+    @classmethod
+    def desdeArchivo(cls, ruta):
+        """Crea el motor con las decisiones de un archivo JSON"""
+        with open(ruta, encoding="utf-8") as archivo:
+            return cls(json.load(archivo))
+
+    @staticmethod
+    def _compilar(decision, definicion):
+        try:
+            regla = ReglaElegibilidad(definicion.get("nombre") or definicion["campo"], definicion["campo"],
+                                      definicion["operador"], definicion.get("valor"))
+        except KeyError as error:
+            raise ValueError(f'A una regla de la decisión {decision} le falta {error}') from None
+        if regla.operador not in COSTO_OPERADOR:
+            raise ValueError(f'Operador desconocido en la regla {regla.nombre}: {regla.operador}')
+        if regla.operador == "en" and not isinstance(regla.valor, (list, tuple)):
+            raise ValueError(f'La regla {regla.nombre} necesita una lista de valores')
+        if regla.operador in ("feriado", "noFeriado") and regla.valor is None:
+            regla = regla._replace(valor='EC-SD')
+        return regla
+
+    def _prioridad(self, modo, entrada):
+        regla, evaluadas, cumplidas, segundos = entrada
+        if evaluadas >= _MINIMO_MEDICION:
+            costo = segundos / evaluadas * 1e9
+        else:
+            costo = COSTO_OPERADOR[regla.operador]
+        # probabilidad de que la regla decida un registro (con suavizado de Laplace)
+        cumple = (cumplidas + 1) / (evaluadas + 2)
+        return costo / (1 - cumple if modo == "todas" else cumple)
+
+    def _reordenar(self, decision):
+        modo, entradas = self._tabla[decision]
+        self._ordenes[decision] = sorted(range(len(entradas)), key=lambda i: self._prioridad(modo, entradas[i]))
+
+    @property
+    def decisiones(self):
+        """Nombres de las decisiones en el orden en que se declararon"""
+        return list(self._tabla)
+
+    def orden(self, decision):
+        """Nombres de las reglas de una decisión en el orden en que se evalúan"""
+        entradas = self._tabla[decision][1]
+        return [entradas[i][0].nombre for i in self._ordenes[decision]]
+
+    def estadisticas(self):
+        """
+        Devuelve {decisión: [{"regla", "evaluadas", "selectividad", "costoNs"}]} en el orden de evaluación
+        """
+        with self._candado:
+            return {decision: [{"regla": entradas[i][0].nombre, "evaluadas": entradas[i][1],
+                                "selectividad": entradas[i][2] / entradas[i][1] if entradas[i][1] else None,
+                                "costoNs": entradas[i][3] / entradas[i][1] * 1e9 if entradas[i][1] else None}
+                               for i in self._ordenes[decision]]
+                    for decision, (_, entradas) in self._tabla.items()}
+
+    def evaluarLote(self, registros):
+        """
+        Evalúa todas las decisiones sobre una lista de registros
 
+         PARAMETROS
+         -----------
+             registros:list
+                 diccionarios con los campos de cada registro (como los lee leerRegistros)
          RETORNA
-         --------
-            return False
-                 Devuelve falso si el usuaria recibe una pención menor o igual
-                 a 34.67 $
-        '''
-        if (self.bono<=34.67):
-            return False
+         ----------
+             tuple
+                 ({decisión: (valores, reglas)}, errores): valores es una máscara
+                 booleana de NumPy, reglas un arreglo con el nombre de la regla
+                 que decidió cada registro (None si ninguna) y errores una lista
+                 con None o el mensaje de error de cada registro
+        """
+        import numpy as np
+        total = len(registros)
+        errores = [None] * total
+        columnas = {}
+        resultados = {}
+        for decision, (modo, entradas) in self._tabla.items():
+            todas = modo == "todas"
+            valores = np.full(total, todas, dtype=np.bool_)
+            decisivas = np.full(total, -1, dtype=np.intp)
+            pendientes = np.arange(total)
+            medidas = []
+            for i in self._ordenes[decision]:
+                if not pendientes.size:
+                    break
+                regla = entradas[i][0]
+                # la conversión de la columna se hace una sola vez por lote y
+                # no depende del orden, así que no cuenta en el costo de la regla
+                columna = self._columna(registros, regla, columnas, errores)
+                inicio = time.perf_counter()
+                cumple = self._cumple(regla, columna[pendientes])
+                medidas.append((i, pendientes.size, int(np.count_nonzero(cumple)), time.perf_counter() - inicio))
+                decide = ~cumple if todas else cumple
+                decididas = pendientes[decide]
+                valores[decididas] = not todas
+                decisivas[decididas] = i
+                pendientes = pendientes[~decide]
+            with self._candado:
+                for i, evaluadas, cumplidas, segundos in medidas:
+                    entradas[i][1] += evaluadas
+                    entradas[i][2] += cumplidas
+                    entradas[i][3] += segundos
+                self._reordenar(decision)
+            # la posición -1 (ninguna regla decidió) toma el último elemento, None
+            nombres = np.array([entrada[0].nombre for entrada in entradas] + [None], dtype=object)
+            resultados[decision] = (valores, nombres[decisivas])
+            if METRICAS.activo:
+                positivos = int(np.count_nonzero(valores))
+                METRICAS.contar("acredita_reglas_total", positivos, regla=decision, resultado=True)
+                METRICAS.contar("acredita_reglas_total", total - positivos, regla=decision, resultado=False)
+        return resultados, errores
+
+    @staticmethod
+    def _columna(registros, regla, columnas, errores):
+        """
+        Convierte un campo de todos los registros en un arreglo de NumPy la
+        primera vez que una regla lo necesita; los valores vacíos o inválidos
+        no cumplen ninguna regla
+        """
+        import numpy as np
+        campo = regla.campo
+        if regla.operador in ("feriado", "noFeriado"):
+            tipo = "fecha"
+        elif regla.operador in ("<", "<=", ">", ">=") or _esNumero(regla.valor) or (
+                regla.operador == "en" and all(_esNumero(v) for v in regla.valor)):
+            tipo = "numero"
+        else:
+            tipo = "texto"
+        columna = columnas.get((campo, tipo))
+        if columna is not None:
+            return columna
+        valores = [registro.get(campo) for registro in registros]
+        if tipo == "fecha":
+            try:
+                columna = validarFechas(["" if v is None else v for v in valores])
+            except ErrorFechas as error:
+                columna = error.ordinales
+                columna[error.filas] = 0
+                for fila in error.filas:
+                    errores[fila] = errores[fila] or MENSAJE_FECHA
+        elif tipo == "numero":
+            columna = np.empty(len(valores), dtype=np.float64)
+            for fila, valor in enumerate(valores):
+                try:
+                    columna[fila] = float(valor) if valor not in (None, "") else np.nan
+                except (TypeError, ValueError):
+                    columna[fila] = np.nan
+                    errores[fila] = errores[fila] or f'El campo {campo} no es numérico: {valor!r}'
+        else:
+            columna = np.array([None if v == "" else v for v in valores], dtype=object)
+        columnas[(campo, tipo)] = columna
+        return columna
+
+    @staticmethod
+    def _cumple(regla, columna):
+        import numpy as np
+        operador = regla.operador
+        if operador in ("feriado", "noFeriado"):
+            validas = columna > 0
+            cumple = np.zeros(columna.size, dtype=np.bool_)
+            cumple[validas] = INDICE_FERIADOS.esFeriadoVector(regla.valor, columna[validas]) == (operador == "feriado")
+            return cumple
+        if columna.dtype == object:
+            presentes = np.fromiter((v is not None for v in columna), dtype=np.bool_, count=columna.size)
+            if operador == "en":
+                opciones = set(regla.valor)
+                return presentes & np.fromiter((v in opciones for v in columna), dtype=np.bool_, count=columna.size)
+            return presentes & getattr(np, _COMPARACIONES[operador])(columna, regla.valor).astype(np.bool_)
+        presentes = ~np.isnan(columna)
+        if operador == "en":
+            return presentes & np.isin(columna, regla.valor)
+        return presentes & getattr(np, _COMPARACIONES[operador])(columna, regla.valor)
+
+    def evaluar(self, registro):
+        """Devuelve {decisión: (valor, nombre de la regla que decidió o None)} de un registro"""
+        resultados, _ = self.evaluarLote([registro])
+        return {decision: (bool(valores[0]), reglas[0]) for decision, (valores, reglas) in resultados.items()}
+
+    def explicar(self, registro):
+        """
+        Devuelve una línea por decisión con su valor y la regla que la decidió,
+        por ejemplo "bdh: False (bonoSobreUmbralBdh: bono > 28.2 no se cumple)"
+        """
+        lineas = []
+        for decision, (valor, nombre) in self.evaluar(registro).items():
+            modo, entradas = self._tabla[decision]
+            if nombre is None:
+                motivo = "se cumplen todas las reglas" if modo == "todas" else "no se cumple ninguna regla"
+            else:
+                regla = next(entrada[0] for entrada in entradas if entrada[0].nombre == nombre)
+                motivo = f"{regla.nombre}: {regla.campo} {regla.operador} {regla.valor} {'se cumple' if valor else 'no se cumple'}"
+            lineas.append(f"{decision}: {valor} ({motivo})")
+        return lineas
+
+
+def procesarLoteReglas(entrada, salida, motor, tamanoBloque=10000, formatoEntrada=None, formatoSalida=None, progreso=None):
+    """
+    Evalúa un archivo de registros con un MotorReglas y escribe por cada
+    registro el valor de cada decisión y la regla que la decidió
+    (columnas <decisión> y <decisión>_regla)
+
+     RETORNA
+     ----------
+         int
+             Número de filas procesadas
+    """
+    formatoSalida = _formato(salida, formatoSalida)
+    columnas = ["fila", "cedula", "nombre"]
+    for decision in motor.decisiones:
+        columnas += [decision, decision + "_regla"]
+    columnas.append("error")
+    registros = leerRegistros(entrada, formatoEntrada)
+    procesadas = 0
+    with open(salida, "w", newline="", encoding="utf-8") as archivo:
+        if formatoSalida == "csv":
+            escritor = csv.DictWriter(archivo, columnas)
+            escritor.writeheader()
+            escribir = escritor.writerows
+        else:
+            escribir = lambda filas: archivo.writelines(json.dumps(f, ensure_ascii=False) + "\n" for f in filas)
+        for bloque in iter(lambda: list(itertools.islice(registros, tamanoBloque)), []):
+            resultados, errores = motor.evaluarLote([registro for _, registro in bloque])
+            filas = [{"fila": fila, "cedula": registro.get("cedula"), "nombre": registro.get("nombre")}
+                     for fila, registro in bloque]
+            for decision, (valores, reglas) in resultados.items():
+                for fila, valor, regla in zip(filas, valores.tolist(), reglas.tolist()):
+                    fila[decision] = valor
+                    fila[decision + "_regla"] = regla
+            for fila, error in zip(filas, errores):
+                fila["error"] = error
+            escribir(filas)
+            procesadas += len(filas)
+            if progreso is not None:
+                progreso(procesadas)
+    return procesadas
+
+
+#-------------------------------------------------------- CALENDARIO DE PAGOS --------------------------------------------#
+
+COLUMNAS_PAGO = ["fila", "cedula", "sucursal", "prov", "fechaSolicitada", "fechaPago", "espera", "error"]
+
+
+def asignarPagos(registros, capacidades=None, capacidadPorDefecto=100):
+    """
+    Asigna a cada beneficiario aprobado un día de pago en su sucursal
+
+    Cada sucursal paga como máximo su capacidad diaria y solo en días hábiles
+    de su provincia. Una sucursal está en una sola provincia: los registros
+    que indican otra, o una provincia que no está en PROVINCIAS, se generan
+    con un error y no consumen su capacidad. Dentro de una sucursal los beneficiarios se atienden en
+    el orden de la fecha solicitada (y de la fila en caso de empate), cada uno
+    en el primer día hábil con cupo desde su fecha, lo que minimiza tanto la
+    espera total como la espera máxima. Los beneficiarios de cada sucursal se
+    ordenan una sola vez y un montículo de (día, sucursal) recorre todas las
+    sucursales a la vez, así que el costo es O(n log n) y los días sin
+    solicitudes no se recorren.
+
+    Las asignaciones se generan en orden de fecha de pago, a medida que se
+    completa cada día, así que pueden escribirse sin esperar al resto.
+
+     PARAMETROS
+     -----------
+         registros:iterable
+             tuplas (fila, registro) como las de leerRegistros; cada registro
+             tiene fecha (la fecha solicitada), cedula y, opcionalmente,
+             sucursal (por defecto su residencia) y prov (por defecto EC-SD)
+         capacidades:dict
+             {sucursal: número máximo de pagos por día}
+         capacidadPorDefecto:int
+             capacidad de las sucursales que no están en capacidades
+     RETORNA
+     ----------
+         generator
+             Diccionarios con las columnas de COLUMNAS_PAGO: espera es el número
+             de días hábiles entre el primer día hábil desde la fecha solicitada
+             y la fecha de pago. Los registros que no se pueden asignar (fecha
+             inválida o fuera del índice de feriados) se generan con fechaPago
+             None y el motivo en error.
+    """
+    import bisect
+    import heapq
+    import numpy as np
+    capacidades = dict(capacidades or {})
+    for sucursal, capacidad in list(capacidades.items()) + [(None, capacidadPorDefecto)]:
+        if capacidad < 1:
+            raise ValueError(f'La capacidad diaria de la sucursal {sucursal or "por defecto"} debe ser mayor que cero')
+    indice = INDICE_FERIADOS
+
+    def error(fila, cedula, sucursal, prov, fecha, mensaje):
+        return {"fila": fila, "cedula": cedula, "sucursal": sucursal, "prov": prov, "fechaSolicitada": fecha,
+                "fechaPago": None, "espera": None, "error": mensaje}
+
+    # Solicitudes agrupadas por sucursal: [filas, cédulas, fechas, ordinales]. Cada
+    # sucursal está en una sola provincia, la del primer registro que la indica;
+    # los registros sin provincia toman la de su sucursal (EC-SD si ninguno la indica)
+    colas = {}
+    provincias = {}
+    for fila, registro in registros:
+        sucursal = registro.get("sucursal") or registro.get("residencia") or ""
+        prov = registro.get("prov") or None
+        fecha = registro.get("fecha") or ""
+        # cada provincia usada compila y guarda sus días hábiles de todo el índice
+        if prov is not None and prov not in PROVINCIAS:
+            yield error(fila, registro.get("cedula"), sucursal, prov, fecha, f'Provincia desconocida: {prov}')
+            continue
+        if prov is not None and provincias.setdefault(sucursal, prov) != prov:
+            yield error(fila, registro.get("cedula"), sucursal, prov, fecha,
+                        f'La sucursal {sucursal} está en la provincia {provincias[sucursal]}, no en {prov}')
+            continue
+        try:
+            ordinal = ordinalFecha(fecha)
+        except ValueError as excepcion:
+            yield error(fila, registro.get("cedula"), sucursal, prov or provincias.get(sucursal, 'EC-SD'), fecha, str(excepcion))
+            continue
+        cola = colas.get(sucursal)
+        if cola is None:
+            cola = colas[sucursal] = ([], [], [], [])
+        cola[0].append(fila)
+        cola[1].append(registro.get("cedula"))
+        cola[2].append(fecha)
+        cola[3].append(ordinal)
+
+    fueraDeRango = f'No hay días hábiles con cupo dentro del índice de feriados ({indice.desde}-{indice.hasta})'
+    habiles = {}
+    estados = []
+    eventos = []
+    for sucursal, (filas, cedulas, fechas, ordinales) in colas.items():
+        prov = provincias.get(sucursal, 'EC-SD')
+        if prov not in habiles:
+            habiles[prov] = indice.diasHabiles(prov)
+        dias = habiles[prov]
+        ordinales = np.asarray(ordinales, dtype=np.int64)
+        # posición del primer día hábil desde la fecha solicitada
+        posiciones = np.searchsorted(dias, ordinales)
+        posiciones[ordinales < indice._inicio] = dias.size
+        orden = np.lexsort((np.asarray(filas), posiciones))
+        posiciones = posiciones[orden].tolist()
+        filas = [filas[i] for i in orden.tolist()]
+        cedulas = [cedulas[i] for i in orden.tolist()]
+        fechas = [fechas[i] for i in orden.tolist()]
+        # las fechas fuera del índice quedan al final del orden
+        total = bisect.bisect_left(posiciones, dias.size)
+        for i in range(total, len(filas)):
+            yield error(filas[i], cedulas[i], sucursal, prov, fechas[i], fueraDeRango)
+        if total:
+            # [prov, sucursal, días hábiles, capacidad, posiciones, filas, cédulas, fechas, total, siguiente registro, siguiente día]
+            estados.append([prov, sucursal, dias, capacidades.get(sucursal, capacidadPorDefecto),
+                            posiciones, filas, cedulas, fechas, total, 0, 0])
+            heapq.heappush(eventos, (int(dias[posiciones[0]]), len(estados) - 1))
+
+    isoDias = {}
+    while eventos:
+        ordinalDia, k = heapq.heappop(eventos)
+        prov, sucursal, dias, capacidad, posiciones, filas, cedulas, fechas, total, i, dia = estados[k]
+        dia = max(dia, posiciones[i])
+        fin = min(i + capacidad, bisect.bisect_right(posiciones, dia, i, total))
+        fechaPago = isoDias.get(ordinalDia)
+        if fechaPago is None:
+            fechaPago = isoDias[ordinalDia] = datetime.date.fromordinal(ordinalDia).isoformat()
+        for j in range(i, fin):
+            yield {"fila": filas[j], "cedula": cedulas[j], "sucursal": sucursal, "prov": prov, "fechaSolicitada": fechas[j],
+                   "fechaPago": fechaPago, "espera": dia - posiciones[j], "error": None}
+        if fin < total:
+            siguiente = max(dia + 1, posiciones[fin])
+            if siguiente >= dias.size:
+                for j in range(fin, total):
+                    yield error(filas[j], cedulas[j], sucursal, prov, fechas[j], fueraDeRango)
+                continue
+            estados[k][9:] = [fin, siguiente]
+            heapq.heappush(eventos, (int(dias[siguiente]), k))
+        else:
+            # la sucursal terminó, se liberan sus listas
+            estados[k] = None
+
+
+def procesarPagos(entrada, salida, capacidades=None, capacidadPorDefecto=100, formatoEntrada=None, formatoSalida=None,
+                  progreso=None, tamanoBloque=10000):
+    """
+    Lee los beneficiarios aprobados de un archivo, les asigna un día de pago
+    con asignarPagos y escribe las asignaciones a medida que se generan
+
+     RETORNA
+     ----------
+         int
+             Número de filas escritas
+    """
+    formatoSalida = _formato(salida, formatoSalida)
+    asignaciones = asignarPagos(leerRegistros(entrada, formatoEntrada), capacidades, capacidadPorDefecto)
+    escritas = 0
+    with open(salida, "w", newline="", encoding="utf-8") as archivo:
+        if formatoSalida == "csv":
+            escritor = csv.DictWriter(archivo, COLUMNAS_PAGO)
+            escritor.writeheader()
+            escribir = escritor.writerows
+        else:
+            escribir = lambda filas: archivo.writelines(json.dumps(f, ensure_ascii=False) + "\n" for f in filas)
+        for bloque in iter(lambda: list(itertools.islice(asignaciones, tamanoBloque)), []):
+            escribir(bloque)
+            escritas += len(bloque)
+            if progreso is not None:
+                progreso(escritas)
+    return escritas
+
+
+#-------------------------------------------------------- SERVICIO --------------------------------------------#
+
+def consultarDiasHabiles(consulta):
+    """
+    Resuelve una consulta de días hábiles expresada como diccionario
+
+    Operaciones (campo "operacion"), todas con "prov" (por defecto EC-SD):
+        "siguiente": {"fecha", "incluir"} -> primer día hábil después de la fecha
+        "sumar":     {"fecha", "n"}       -> n-ésimo día hábil después de la fecha
+        "entre":     {"inicio", "fin"}    -> número de días hábiles entre dos fechas
+        "delMes":    {"anio", "mes", "n"} -> n-ésimo día hábil del mes
+        "esHabil":   {"fecha"}            -> True si la fecha es hábil
+
+    Lanza ValueError si la provincia no está en PROVINCIAS: las consultas
+    llegan de clientes externos y cada provincia compilada queda en memoria.
+    """
+    if not isinstance(consulta, dict):
+        raise TypeError('La consulta de días hábiles debe ser un objeto JSON')
+    prov = consulta.get("prov", "EC-SD")
+    if prov not in PROVINCIAS:
+        raise ValueError(f'Provincia desconocida: {prov}')
+    operacion = consulta.get("operacion")
+    if operacion == "siguiente":
+        return INDICE_FERIADOS.siguienteDiaHabil(prov, _aFecha(consulta["fecha"]), bool(consulta.get("incluir", False))).isoformat()
+    if operacion == "sumar":
+        return INDICE_FERIADOS.sumarDiasHabiles(prov, _aFecha(consulta["fecha"]), int(consulta["n"])).isoformat()
+    if operacion == "entre":
+        return INDICE_FERIADOS.diasHabilesEntre(prov, _aFecha(consulta["inicio"]), _aFecha(consulta["fin"]))
+    if operacion == "delMes":
+        fecha = INDICE_FERIADOS.diaHabilDelMes(prov, int(consulta["anio"]), int(consulta["mes"]), int(consulta["n"]))
+        return fecha and fecha.isoformat()
+    if operacion == "esHabil":
+        return INDICE_FERIADOS.esDiaHabil(prov, _aFecha(consulta["fecha"]))
+    raise ValueError(f'Operación de días hábiles desconocida: {operacion}')
+
+
+def _diasHabiles(consulta):
+    try:
+        return {"resultado": consultarDiasHabiles(consulta), "error": None}
+    # ArithmeticError: valores como "n": 1e30 que no caben en el índice
+    except (ValueError, KeyError, TypeError, ArithmeticError) as error:
+        return {"resultado": None, "error": str(error)}
+
+
+class EstadisticasServicio:
+    """
+    Cuenta las peticiones del servicio y guarda sus últimas latencias por ruta
+    para calcular los percentiles p50 y p99
+    """
+
+    def __init__(self, muestras=10000):
+        self.muestras = muestras
+        self._rutas = {}
+        self._candado = threading.Lock()
+
+    def registrar(self, ruta, segundos, error=False):
+        with self._candado:
+            ruta = self._rutas.setdefault(ruta, {"peticiones": 0, "errores": 0, "latencias": deque(maxlen=self.muestras)})
+            ruta["peticiones"] += 1
+            ruta["errores"] += error
+            ruta["latencias"].append(segundos)
+
+    def resumen(self):
+        import numpy as np
+        with self._candado:
+            rutas = {r: (d["peticiones"], d["errores"], np.array(d["latencias"])) for r, d in self._rutas.items()}
+        resumen = {}
+        for ruta, (peticiones, errores, latencias) in rutas.items():
+            p50, p99 = (round(float(p), 3) for p in np.percentile(latencias, [50, 99]) * 1000)
+            resumen[ruta] = {"peticiones": peticiones, "errores": errores, "p50_ms": p50, "p99_ms": p99}
+        return resumen
+
+
+@functools.lru_cache(maxsize=None)
+def _clasesServicio():
+    """
+    Define las clases del servidor HTTP del servicio; http.server solo se
+    importa cuando se crea un servicio
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlsplit
+
+    class _ManejadorServicio(BaseHTTPRequestHandler):
+        """
+        Rutas del servicio (JSON):
+
+            POST /evaluar            un registro (como en --lote) -> resultado de evaluarRegistro
+            POST /evaluar/lote       {"registros": [...]} -> {"resultados": [...]}
+            POST /diasHabiles        una consulta de consultarDiasHabiles (400 si no es válida)
+            POST /diasHabiles/lote   {"consultas": [...]} -> {"resultados": [...]} con el error de cada consulta
+            GET  /estadisticas       peticiones, errores y latencias p50/p99 por ruta
+            GET  /salud              {"estado": "ok"}
+            GET  /metricas           METRICAS en formato de texto de Prometheus
+            GET  /metricas.json      METRICAS como JSON
+        """
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, estado, cuerpo):
+            # las respuestas de texto (métricas de Prometheus) se envían tal cual
+            if isinstance(cuerpo, str):
+                contenido, tipo = cuerpo.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                contenido, tipo = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+            self.send_response(estado)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(contenido)))
+            self.end_headers()
+            self.wfile.write(contenido)
+
+        def _atender(self, rutas):
+            inicio = time.perf_counter()
+            ruta = urlsplit(self.path).path
+            funcion = rutas.get(ruta)
+            # el cuerpo se lee en _cuerpo; si la ruta no lo usa se descarta antes de responder
+            self._pendiente = "Content-Length" in self.headers
+            if funcion is None:
+                estado, cuerpo = 404, {"error": f"Ruta desconocida: {ruta}"}
+            else:
+                try:
+                    estado, cuerpo = funcion()
+                except (ValueError, KeyError, TypeError, ArithmeticError) as error:
+                    estado, cuerpo = 400, {"error": str(error)}
+                except Exception as error:
+                    # un error inesperado responde 500 y queda en las estadísticas en lugar de cerrar la conexión
+                    estado, cuerpo = 500, {"error": f"Error interno: {type(error).__name__}"}
+            self._descartarCuerpo()
+            self._responder(estado, cuerpo)
+            # las rutas desconocidas se agrupan para no guardar una entrada por cada dirección recibida
+            if funcion is None:
+                ruta = "desconocida"
+            self.server.estadisticas.registrar(ruta, time.perf_counter() - inicio, estado >= 400)
+
+        def _longitud(self):
+            """Content-Length de la petición; si no es válido la conexión se cierra después de responder"""
+            try:
+                longitud = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                longitud = -1
+            if longitud < 0:
+                self.close_connection = True
+                raise ValueError("Content-Length inválido")
+            return longitud
+
+        def _descartarCuerpo(self):
+            """
+            Lee el cuerpo que la ruta no usó; si quedara en la conexión se
+            interpretaría como el inicio de la siguiente petición
+            """
+            if self._pendiente:
+                self._pendiente = False
+                try:
+                    self.rfile.read(self._longitud())
+                except ValueError:
+                    pass
+
+        def _cuerpo(self):
+            self._pendiente = False
+            cuerpo = json.loads(self.rfile.read(self._longitud()) or b"{}")
+            if not isinstance(cuerpo, dict):
+                raise TypeError("El cuerpo de la petición debe ser un objeto JSON")
+            return cuerpo
+
+        def _elementos(self, clave):
+            """Lista `clave` del cuerpo; cada elemento debe ser un objeto JSON"""
+            elementos = self._cuerpo()[clave]
+            if not isinstance(elementos, list) or not all(isinstance(e, dict) for e in elementos):
+                raise TypeError(f'"{clave}" debe ser una lista de objetos JSON')
+            return elementos
+
+        def do_GET(self):
+            rutas = {
+                "/estadisticas": lambda: (200, self.server.estadisticas.resumen()),
+                "/salud": lambda: (200, {"estado": "ok"}),
+                "/metricas": lambda: (200, METRICAS.prometheus()),
+                "/metricas.json": lambda: (200, METRICAS.json()),
+            }
+            self._atender(rutas)
+
+        def do_POST(self):
+            rutas = {
+                "/evaluar": lambda: (200, evaluarRegistro(0, self._cuerpo())),
+                "/evaluar/lote": lambda: (200, {"resultados": [evaluarRegistro(fila, registro) for fila, registro
+                                                               in enumerate(self._elementos("registros"))]}),
+                "/diasHabiles": lambda: (200, {"resultado": consultarDiasHabiles(self._cuerpo()), "error": None}),
+                "/diasHabiles/lote": lambda: (200, {"resultados": [_diasHabiles(c) for c in self._elementos("consultas")]}),
+            }
+            self._atender(rutas)
+
+        def log_message(self, formato, *args):
+            # el servicio atiende muchas peticiones por segundo, no se escribe una línea por cada una
+            pass
+
+
+    class _ServidorEvaluacion(ThreadingHTTPServer):
+        # una cola de conexiones más larga que la de http.server (5) para muchos clientes simultáneos
+        request_queue_size = 128
+        daemon_threads = True
+
+    return _ServidorEvaluacion, _ManejadorServicio
+
+
+def precargarCalendarios(provincias, desde, hasta):
+    """
+    Compila de antemano los calendarios y días hábiles de las provincias para
+    los años desde..hasta (los años fuera del índice van a CACHE_CALENDARIOS)
+    """
+    for prov in provincias:
+        INDICE_FERIADOS.compilar(prov)
+        INDICE_FERIADOS._acumulado(prov)
+    fuera = [a for a in range(desde, hasta + 1) if not INDICE_FERIADOS.desde <= a <= INDICE_FERIADOS.hasta]
+    for prov in provincias:
+        for anio in fuera:
+            CACHE_CALENDARIOS.obtener(prov, anio)
+
+
+def crearServicio(host="127.0.0.1", puerto=8080, provincias=("EC-SD",), desde=None, hasta=None):
+    """
+    Crea el servicio HTTP/JSON de evaluación con los calendarios precargados
+
+    Cada petición se atiende en su propio hilo. Para ponerlo en marcha se
+    llama a serve_forever() sobre el servidor devuelto.
+    """
+    anio = datetime.date.today().year
+    precargarCalendarios(provincias, desde or anio - 1, hasta or anio + 1)
+    _ServidorEvaluacion, _ManejadorServicio = _clasesServicio()
+    servidor = _ServidorEvaluacion((host, puerto), _ManejadorServicio)
+    servidor.estadisticas = EstadisticasServicio()
+    return servidor
+
+
+def _argumentos(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Evalúa beneficiarios del bono de desarrollo humano")
+    parser.add_argument("--lote", metavar="ENTRADA", help="archivo CSV o JSONL de registros a evaluar por lotes")
+    parser.add_argument("--salida", metavar="SALIDA", help="archivo CSV o JSONL de resultados (por defecto ENTRADA.resultados.jsonl)")
+    parser.add_argument("--procesos", type=int, default=None, help="número de procesos (por defecto el número de CPUs)")
+    parser.add_argument("--bloque", type=int, default=10000, help="registros por bloque")
+    parser.add_argument("--desde", type=int, default=0, help="omitir las primeras N filas de la entrada")
+    parser.add_argument("--reanudar", action="store_true", help="continuar después de la última fila escrita en la salida")
+    parser.add_argument("--metricas", metavar="ARCHIVO", help="activar las métricas y guardarlas al terminar (.prom para formato Prometheus, si no JSON)")
+    parser.add_argument("--servicio", action="store_true", help="atender peticiones HTTP/JSON de evaluación")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección del servicio")
+    parser.add_argument("--puerto", type=int, default=8080, help="puerto del servicio")
+    parser.add_argument("--provincias", nargs="+", default=["EC-SD"], help="provincias cuyos calendarios se precargan")
+    parser.add_argument("--anios", type=int, nargs=2, metavar=("DESDE", "HASTA"), help="años cuyos calendarios se precargan")
+    parser.add_argument("--pagos", metavar="ENTRADA", help="asignar días de pago a los beneficiarios aprobados de ENTRADA")
+    parser.add_argument("--capacidad", type=int, default=100, help="pagos por día de cada sucursal con --pagos")
+    parser.add_argument("--capacidades", metavar="ARCHIVO", help="archivo JSON {sucursal: pagos por día} con --pagos")
+    parser.add_argument("--reglas", metavar="ARCHIVO", help="evaluar el lote con las decisiones declaradas en un archivo JSON (ver MotorReglas)")
+    parser.add_argument("--dependencias", action="store_true", help="guardar con cada resultado sus dependencias para --reevaluar (salida JSONL)")
+    parser.add_argument("--reevaluar", metavar="ESTADO", help="actualizar los resultados de ESTADO con los cambios de --cambios")
+    parser.add_argument("--cambios", metavar="ARCHIVO", help="archivo JSON con los feriados agregados o quitados y los nuevos umbrales")
+    parser.add_argument("--diferencias", metavar="ARCHIVO", help="archivo JSONL con los resultados que cambiaron (por defecto la salida estándar)")
+    parser.add_argument("--instantanea", metavar="ARCHIVO", help="instantánea de calendarios compartida entre procesos (se genera si no existe o cambiaron las reglas)")
+    argumentos = parser.parse_args(argv)
+    if argumentos.reevaluar and not argumentos.cambios:
+        parser.error("--reevaluar necesita --cambios")
+    if argumentos.reglas:
+        incompatibles = [opcion for opcion, usada in (("--procesos", argumentos.procesos is not None),
+                                                       ("--desde", argumentos.desde), ("--reanudar", argumentos.reanudar),
+                                                       ("--dependencias", argumentos.dependencias)) if usada]
+        if incompatibles:
+            parser.error(f"--reglas no admite {', '.join(incompatibles)}")
+    return argumentos
+
+
+def guardarMetricas(ruta):
+    """Guarda METRICAS en un archivo: formato Prometheus si termina en .prom, si no JSON"""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        if ruta.endswith(".prom"):
+            archivo.write(METRICAS.prometheus())
+        else:
+            json.dump(METRICAS.json(), archivo, indent=2, ensure_ascii=False)
+
+
+def _mostrarProgreso(inicio):
+    def mostrar(filas):
+        segundos = time.time() - inicio
+        print(f"procesadas {filas} filas ({filas / segundos if segundos else 0:.0f} filas/s)", file=sys.stderr)
+    return mostrar
 
 
 #-------------------------------------------------------- MAIN PRINCIPAL --------------------------------------------#
 
 if __name__ == '__main__':
 
+    argumentos = _argumentos()
+    if argumentos.metricas:
+        METRICAS.activar()
+    if argumentos.instantanea:
+        usarInstantanea(argumentos.instantanea)
+    if argumentos.lote:
+        salida = argumentos.salida or argumentos.lote + ".resultados.jsonl"
+        if argumentos.reglas:
+            procesarLoteReglas(argumentos.lote, salida, MotorReglas.desdeArchivo(argumentos.reglas), argumentos.bloque,
+                               progreso=_mostrarProgreso(time.time()))
+            if argumentos.metricas:
+                guardarMetricas(argumentos.metricas)
+            sys.exit(0)
+        procesarLote(argumentos.lote, salida, argumentos.procesos, argumentos.bloque, argumentos.desde,
+                     argumentos.reanudar, progreso=_mostrarProgreso(time.time()), instantanea=argumentos.instantanea,
+                     dependencias=argumentos.dependencias)
+        if argumentos.metricas:
+            guardarMetricas(argumentos.metricas)
+        sys.exit(0)
+    if argumentos.pagos:
+        capacidades = None
+        if argumentos.capacidades:
+            with open(argumentos.capacidades, encoding="utf-8") as archivo:
+                capacidades = json.load(archivo)
+        procesarPagos(argumentos.pagos, argumentos.salida or argumentos.pagos + ".pagos.jsonl", capacidades,
+                      argumentos.capacidad, progreso=_mostrarProgreso(time.time()))
+        sys.exit(0)
+    if argumentos.reevaluar:
+        with open(argumentos.cambios, encoding="utf-8") as archivo:
+            cambios = json.load(archivo)
+        reevaluados, cambiados = reevaluarIncremental(argumentos.reevaluar, cambios, argumentos.diferencias or sys.stdout)
+        print(f"re-evaluados {reevaluados} registros, {cambiados} resultados cambiaron", file=sys.stderr)
+        if argumentos.metricas:
+            guardarMetricas(argumentos.metricas)
+        sys.exit(0)
+    if argumentos.servicio:
+        # el servicio siempre publica sus métricas en /metricas
+        METRICAS.activar()
+        servidor = crearServicio(argumentos.host, argumentos.puerto, argumentos.provincias, *(argumentos.anios or ()))
+        print(f"Servicio en http://{argumentos.host}:{servidor.server_port}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
     nombre=input("Nombre: ")
     sexo=input("Sexo: ")
     edad=int(input("Edad: "))
@@ -0,0 +1,76 @@
+"""
+Mide el tiempo de importar Acredita con `python -X importtime` y comprueba
+que las dependencias pesadas no se cargan al importarlo.
+
+    python benchmarks/bench_arranque.py [--repeticiones 7]
+
+Presupuesto: importar Acredita (tiempo acumulado que informa -X importtime,
+con el bytecode ya compilado) no debe pasar de PRESUPUESTO_MS, y ninguno de
+los módulos de MODULOS_DIFERIDOS debe quedar cargado. Si alguna condición no
+se cumple el script termina con código 1. Como referencia, antes de diferir
+las importaciones el módulo tardaba unos 240 ms en importarse.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_MS = 25
+
+# Módulos que solo deben importarse en los caminos que los necesitan
+MODULOS_DIFERIDOS = ("numpy", "requests", "holidays", "dateutil", "asyncio", "http.server",
+                     "concurrent.futures", "argparse")
+
+
+def ejecutar(codigo, *opciones):
+    entorno = dict(os.environ)
+    # permite guardar el bytecode para medir el arranque habitual y no la compilación
+    entorno.pop("PYTHONDONTWRITEBYTECODE", None)
+    return subprocess.run([sys.executable, *opciones, "-c", codigo], cwd=RAIZ, env=entorno,
+                          capture_output=True, text=True, check=True)
+
+
+def tiempoImportacion():
+    """Tiempo acumulado (ms) de importar Acredita según -X importtime"""
+    salida = ejecutar("import Acredita", "-X", "importtime").stderr
+    # formato de cada línea: "import time: <propio> | <acumulado> | <módulo>"
+    for linea in salida.splitlines():
+        _, acumulado, modulo = (c.strip() for c in linea.replace("import time:", "").split("|"))
+        if modulo == "Acredita":
+            return int(acumulado) / 1000
+    raise RuntimeError("-X importtime no informó la importación de Acredita")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=7)
+    argumentos = parser.parse_args()
+
+    ejecutar("import Acredita")  # compila el bytecode
+    tiempos = [tiempoImportacion() for _ in range(argumentos.repeticiones)]
+    mediana = statistics.median(tiempos)
+    cargados = ejecutar("import sys, Acredita; print(' '.join(m for m in %r if m in sys.modules))"
+                        % (MODULOS_DIFERIDOS,)).stdout.split()
+    primeraEvaluacion = ejecutar(
+        "import time; inicio = time.perf_counter(); import Acredita; "
+        "Acredita.PersonaBono('n', 'M', 70, '2021-12-25', 'o', 0.0, 'No').evaluar(); "
+        "print((time.perf_counter() - inicio) * 1000)").stdout
+
+    print(f"importar Acredita: mediana {mediana:.1f} ms (mín {min(tiempos):.1f}, máx {max(tiempos):.1f}), "
+          f"presupuesto {PRESUPUESTO_MS} ms")
+    print(f"importar y evaluar una fecha sin conexión: {float(primeraEvaluacion):.1f} ms")
+    errores = []
+    if mediana > PRESUPUESTO_MS:
+        errores.append(f"la importación supera el presupuesto ({mediana:.1f} ms > {PRESUPUESTO_MS} ms)")
+    if cargados:
+        errores.append(f"módulos cargados al importar: {', '.join(cargados)}")
+    for error in errores:
+        print(f"ERROR: {error}", file=sys.stderr)
+    sys.exit(1 if errores else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compara el evaluador vectorizado evaluarColumnas con los métodos de
+PersonaBono/Credito evaluados objeto por objeto.
+
+    python benchmarks/bench_elegibilidad.py --filas 1000000 10000000
+
+La evaluación objeto por objeto se mide sobre una muestra (--muestra) y se
+extrapola linealmente al número de filas; sobre esa muestra también se
+comprueba que ambos resultados coinciden.
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+
+def generarColumnas(filas, semilla=0):
+    aleatorio = np.random.default_rng(semilla)
+    inicio = datetime.date(2020, 1, 1).toordinal()
+    return {
+        "edad": aleatorio.integers(18, 100, filas),
+        "bono": np.round(aleatorio.uniform(0, 60, filas), 2),
+        "enfermedades": aleatorio.choice(np.array(["Si", "No"]), filas),
+        "fechas": aleatorio.integers(inicio, inicio + 5 * 365, filas),
+    }
+
+
+def evaluarObjetos(columnas):
+    resultados = {regla: [] for regla in ("esHombre", "discapacidad", "bdh", "ptv_mma", "feriado")}
+    for edad, bono, enfermedades, fecha in zip(columnas["edad"].tolist(), columnas["bono"].tolist(),
+                                               columnas["enfermedades"].tolist(), columnas["fechas"].tolist()):
+        credito = Acredita.Credito("n", "M", edad, datetime.date.fromordinal(fecha).isoformat(), "o", 0.0,
+                                   enfermedades, bono, "0000000000", "r")
+        resultados["esHombre"].append(bool(credito.esHombre(None)))
+        resultados["discapacidad"].append(bool(credito.discapacidad()))
+        resultados["bdh"].append(credito.bdh() is not False)
+        resultados["ptv_mma"].append(credito.ptv_mma() is not False)
+        resultados["feriado"].append(credito.evaluar())
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--muestra", type=int, default=200_000)
+    argumentos = parser.parse_args()
+
+    # compila el índice antes de medir
+    Acredita.INDICE_FERIADOS.compilar("EC-SD")
+    for filas in argumentos.filas:
+        columnas = generarColumnas(filas)
+        inicio = time.perf_counter()
+        mascaras = Acredita.evaluarColumnas(**columnas)
+        vectorizado = time.perf_counter() - inicio
+
+        muestra = {k: v[:argumentos.muestra] for k, v in columnas.items()}
+        inicio = time.perf_counter()
+        objetos = evaluarObjetos(muestra)
+        porObjeto = (time.perf_counter() - inicio) * filas / len(muestra["edad"])
+        for regla, valores in objetos.items():
+            if not np.array_equal(mascaras[regla][:len(valores)], np.array(valores)):
+                raise SystemExit(f"la regla {regla} no coincide con la evaluación por objeto")
+
+        print(f"{filas:>12,} filas  vectorizado {vectorizado:8.3f} s  "
+              f"por objeto {porObjeto:8.2f} s (estimado)  aceleración x{porObjeto / vectorizado:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara la memoria de los registros PersonaBono/Credito (con __slots__ y
+campos categóricos internados) con la representación anterior basada en
+__dict__.
+
+    python benchmarks/bench_memoria.py --filas 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+
+class CreditoConDict:
+    """Réplica de la representación anterior de Credito (atributos en __dict__)"""
+
+    def __init__(self, nombre, sexo, edad, fecha, ocupacion, ingresos, enfermedades, bono, cedula, residencia, online=False):
+        self.cedula = cedula
+        self.residencia = residencia
+        self.bono = bono
+        self.nombre = nombre
+        self.sexo = sexo
+        self.edad = edad
+        self._fecha = fecha
+        self.ocupacion = ocupacion
+        self.ingresos = ingresos
+        self.enfermedades = enfermedades
+        self.online = online
+        self.hijos = []
+
+    def esHombre(self, seguroSocial):
+        self.seguroSocial = seguroSocial
+
+
+def filas(cantidad, semilla=0):
+    """Genera filas como si vinieran de un archivo: cada cadena es un objeto nuevo"""
+    aleatorio = random.Random(semilla)
+    for i in range(cantidad):
+        yield (f"nombre{i}", "".join(aleatorio.choice(["M", "F"])), aleatorio.randint(18, 99),
+               f"2021-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}",
+               "".join(aleatorio.choice(["agricultor", "comerciante", "ninguna"])), 100.0,
+               "".join(aleatorio.choice(["Si", "No"])), 30.0, f"{1700000000 + i}",
+               "".join(aleatorio.choice(["Quito", "Santo Domingo", "Guayaquil"])))
+
+
+def medir(clase, cantidad):
+    tracemalloc.start()
+    registros = []
+    for fila in filas(cantidad):
+        registro = clase(*fila)
+        registro.esHombre(None)
+        registros.append(registro)
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return actual / cantidad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=200_000)
+    argumentos = parser.parse_args()
+    anterior = medir(CreditoConDict, argumentos.filas)
+    actual = medir(Acredita.Credito, argumentos.filas)
+    print(f"{argumentos.filas:,} registros")
+    print(f"  __dict__ (anterior)  {anterior:8.0f} bytes/registro")
+    print(f"  __slots__ (actual)   {actual:8.0f} bytes/registro  ({1 - actual / anterior:.0%} menos)")
+
+
+if __name__ == "__main__":
+    main()
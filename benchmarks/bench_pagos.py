@@ -0,0 +1,86 @@
+"""
+Mide cómo escala asignarPagos con el número de beneficiarios y comprueba
+que las asignaciones respetan la capacidad de cada sucursal, los días
+hábiles de cada provincia y la fecha solicitada.
+
+    python benchmarks/bench_pagos.py --maximo 1000000 --sucursales 200
+"""
+import argparse
+import collections
+import datetime
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+
+def generarRegistros(cantidad, sucursales, aleatorio):
+    """
+    Solicitudes de 2024 repartidas entre sucursales de todas las provincias;
+    una de cada diez no indica la provincia y debe tomar la de su sucursal
+    """
+    provincias = sorted(Acredita.PROVINCIAS)
+    primero = datetime.date(2024, 1, 1).toordinal()
+    fechas = [datetime.date.fromordinal(o).isoformat() for o in range(primero, primero + 366)]
+    dias = aleatorio.integers(0, len(fechas), cantidad).tolist()
+    numeros = aleatorio.integers(0, sucursales, cantidad).tolist()
+    return [(fila, {"cedula": str(1700000000 + fila), "fecha": fechas[dia], "sucursal": f"S{numero:03d}",
+                    "prov": provincias[numero % len(provincias)] if fila % 10 else None})
+            for fila, (dia, numero) in enumerate(zip(dias, numeros))]
+
+
+def verificar(asignaciones, capacidad):
+    # la capacidad es de la sucursal, sin importar la provincia de cada registro
+    pagos = collections.Counter()
+    provincias = {}
+    for asignacion in asignaciones:
+        if asignacion["error"]:
+            continue
+        assert provincias.setdefault(asignacion["sucursal"], asignacion["prov"]) == asignacion["prov"], asignacion
+        pago = datetime.date.fromisoformat(asignacion["fechaPago"])
+        assert pago >= datetime.date.fromisoformat(asignacion["fechaSolicitada"]), asignacion
+        assert Acredita.INDICE_FERIADOS.esDiaHabil(asignacion["prov"], pago), asignacion
+        pagos[asignacion["sucursal"], pago] += 1
+    assert max(pagos.values()) <= capacidad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minimo", type=int, default=10_000)
+    parser.add_argument("--maximo", type=int, default=1_000_000)
+    parser.add_argument("--sucursales", type=int, default=200)
+    parser.add_argument("--ocupacion", type=float, default=0.9,
+                        help="demanda diaria media entre capacidad de cada sucursal")
+    argumentos = parser.parse_args()
+    aleatorio = np.random.default_rng(0)
+    for prov in Acredita.PROVINCIAS:
+        Acredita.INDICE_FERIADOS.diasHabiles(prov)
+
+    cantidad = argumentos.minimo
+    anterior = None
+    while cantidad <= argumentos.maximo:
+        # la capacidad crece con la demanda para mantener la misma ocupación
+        capacidad = max(1, math.ceil(cantidad / argumentos.sucursales / 250 / argumentos.ocupacion))
+        registros = generarRegistros(cantidad, argumentos.sucursales, aleatorio)
+        inicio = time.perf_counter()
+        asignaciones = list(Acredita.asignarPagos(registros, capacidadPorDefecto=capacidad))
+        segundos = time.perf_counter() - inicio
+        if cantidad <= 100_000:
+            verificar(asignaciones, capacidad)
+        espera = np.array([a["espera"] for a in asignaciones if not a["error"]])
+        escala = segundos / (cantidad * math.log2(cantidad)) * 1e9
+        crecimiento = f", x{segundos / anterior:.1f} respecto al anterior" if anterior else ""
+        print(f"{cantidad:>10,d} beneficiarios, capacidad {capacidad:>4d}: {segundos:7.2f} s, "
+              f"{segundos / cantidad * 1e9:6.0f} ns/beneficiario, {escala:5.1f} ns/(n log n){crecimiento}; "
+              f"espera media {espera.mean():.2f}, máxima {espera.max()} días hábiles")
+        anterior = segundos
+        cantidad *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Mide el costo de compilar las reglas de feriados de las 24 provincias de
+Ecuador para un rango de 100 años y el costo de consulta según el número de
+provincias compiladas.
+
+    python benchmarks/bench_provincias.py --desde 2000 --hasta 2099
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--desde", type=int, default=2000)
+    parser.add_argument("--hasta", type=int, default=2099)
+    parser.add_argument("--consultas", type=int, default=1_000_000)
+    argumentos = parser.parse_args()
+    anios = argumentos.hasta - argumentos.desde + 1
+
+    indice = Acredita.IndiceFeriados(argumentos.desde, argumentos.hasta)
+    inicio = time.perf_counter()
+    for prov in Acredita.HolidayEcuador.PROVINCES:
+        indice.compilar(prov)
+    compilacion = time.perf_counter() - inicio
+    print(f"compilar {len(Acredita.HolidayEcuador.PROVINCES)} provincias x {anios} años: {compilacion * 1000:.1f} ms")
+
+    # misma cantidad de trabajo con HolidayEcuador año por año
+    inicio = time.perf_counter()
+    for prov in Acredita.HolidayEcuador.PROVINCES:
+        for anio in range(argumentos.desde, argumentos.hasta + 1):
+            Acredita.HolidayEcuador._reglas(prov, anio)
+    print(f"reglas año por año (sin compilar):      {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    aleatorio = np.random.default_rng(0)
+    primero = datetime.date(argumentos.desde, 1, 1).toordinal()
+    ordinales = aleatorio.integers(primero, primero + anios * 365, argumentos.consultas)
+    muestra = ordinales[:100_000].tolist()
+    for cantidad in (1, len(Acredita.HolidayEcuador.PROVINCES)):
+        provincias = Acredita.HolidayEcuador.PROVINCES[:cantidad]
+        inicio = time.perf_counter()
+        for prov in provincias:
+            indice.esFeriadoVector(prov, ordinales)
+        vectorial = (time.perf_counter() - inicio) / (cantidad * len(ordinales))
+        inicio = time.perf_counter()
+        for prov in provincias:
+            for ordinal in muestra:
+                indice.esFeriado(prov, ordinal)
+        escalar = (time.perf_counter() - inicio) / (cantidad * len(muestra))
+        print(f"consulta con {cantidad:2d} provincias: esFeriado {escalar * 1e9:6.0f} ns, "
+              f"esFeriadoVector {vectorial * 1e9:5.1f} ns por fecha")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Suite de benchmarks de Acredita: población de calendarios, consultas de
+feriados sin conexión (calendario frío y caliente) y en línea (contra un
+servidor local), reglas de Credito y procesamiento por lotes de punta a punta.
+
+    python benchmarks/suite.py --salida resultados.json
+    python benchmarks/suite.py --comparar benchmarks/linea_base.json
+    python benchmarks/suite.py --guardar-linea-base
+
+Los resultados se escriben en JSON: cada métrica tiene su valor, su unidad y
+si un valor mayor es mejor. Con --comparar se calcula la variación frente a
+una línea base guardada y el script termina con código 1 si alguna métrica
+empeora más que --tolerancia.
+"""
+import argparse
+import csv
+import datetime
+import http.server
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+
+
+class Resultados:
+    def __init__(self):
+        self.metricas = {}
+
+    def agregar(self, nombre, valor, unidad, mayorEsMejor=False):
+        self.metricas[nombre] = {"valor": round(valor, 3), "unidad": unidad, "mayorEsMejor": mayorEsMejor}
+        print(f"  {nombre:45s} {valor:14,.3f} {unidad}")
+
+
+def cronometrar(funcion, repeticiones=1, rondas=3, preparar=None):
+    """Segundos por repetición de funcion(), el mejor de varias rondas"""
+    mejor = float("inf")
+    for _ in range(rondas):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) / repeticiones)
+    return mejor
+
+
+def reiniciarCalendarios():
+    """Descarta los calendarios compilados para medir el caso frío"""
+    Acredita.INDICE_FERIADOS = Acredita.IndiceFeriados()
+    Acredita.CACHE_CALENDARIOS.limpiar()
+    Acredita._pascuas.cache_clear()
+
+
+def benchPoblacion(resultados, escala):
+    print("población de calendarios")
+    provincias = Acredita.HolidayEcuador.PROVINCES
+    anios = range(2000, 2000 + max(1, int(20 * escala)))
+    segundos = cronometrar(lambda: [Acredita.calcularFeriados(p, a) for p in provincias for a in anios])
+    resultados.agregar("reglas_por_provincia_y_anio", segundos / (len(provincias) * len(anios)) * 1e6, "us")
+    segundos = cronometrar(lambda: [Acredita.INDICE_FERIADOS.compilar(p) for p in provincias], preparar=reiniciarCalendarios)
+    resultados.agregar("compilar_indice_por_provincia", segundos / len(provincias) * 1e3, "ms")
+    segundos = cronometrar(lambda: [Acredita.HolidayEcuador(prov=p, years=list(anios)) for p in provincias])
+    resultados.agregar("populate_holiday_ecuador_por_provincia_y_anio", segundos / (len(provincias) * len(anios)) * 1e6, "us")
+
+
+def benchConsultas(resultados, escala):
+    print("consultas sin conexión")
+    persona = Acredita.PersonaBono("n", "M", 70, "2021-12-25", "o", 0.0, "No")
+    resultados.agregar("evaluar_calendario_frio", cronometrar(persona.evaluar, preparar=reiniciarCalendarios) * 1e3, "ms")
+    repeticiones = max(1, int(200_000 * escala))
+    resultados.agregar("evaluar_calendario_caliente", cronometrar(persona.evaluar, repeticiones) * 1e9, "ns")
+    fechas = [(datetime.date(2021, 1, 1) + datetime.timedelta(i % 365)).isoformat() for i in range(repeticiones)]
+    segundos = cronometrar(lambda: [Acredita.PersonaBono("n", "M", 70, f, "o", 0.0, "No").evaluar() for f in fechas])
+    resultados.agregar("crear_y_evaluar_persona", segundos / repeticiones * 1e9, "ns")
+
+
+class _ServidorFeriados(http.server.BaseHTTPRequestHandler):
+    """Imita la API de abstractapi: devuelve Navidad y Año Nuevo del año pedido"""
+
+    def do_GET(self):
+        anio = self.path.split("year=")[1].split("&")[0]
+        cuerpo = json.dumps([{"date": f"01/01/{anio}"}, {"date": f"12/25/{anio}"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def benchEnLinea(resultados, escala):
+    import asyncio
+    print("consultas en línea (servidor local)")
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ServidorFeriados)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}/"
+    try:
+        clientes = []
+        segundos = cronometrar(lambda: clientes[-1].esFeriado(datetime.date(2021, 12, 25)),
+                               preparar=lambda: clientes.append(Acredita.ClienteFeriadosEnLinea(apiKey="local", url=url)))
+        resultados.agregar("en_linea_descarga_anio", segundos * 1e3, "ms")
+        cliente = clientes[-1]
+        repeticiones = max(1, int(200_000 * escala))
+        resultados.agregar("en_linea_consulta_en_cache", cronometrar(lambda: cliente.esFeriado(datetime.date(2021, 12, 24)), repeticiones) * 1e9, "ns")
+        fechas = [datetime.date(2000 + i % 20, 1 + i % 12, 1 + i % 28) for i in range(max(1, int(100_000 * escala)))]
+        segundos = cronometrar(lambda: asyncio.run(Acredita.resolverFeriadosAsync(fechas, enLinea=True)),
+                               preparar=lambda: Acredita.clienteEnLinea(apiKey="local", url=url, peticionesPorSegundo=None))
+        resultados.agregar("en_linea_lote_async_20_anios", len(fechas) / segundos, "fechas/s", True)
+    finally:
+        servidor.shutdown()
+
+
+def benchCredito(resultados, escala):
+    import numpy as np
+    print("reglas de Credito")
+    filas = max(1, int(1_000_000 * escala))
+    aleatorio = np.random.default_rng(0)
+    bonos = np.round(aleatorio.uniform(0, 60, filas), 2)
+    creditos = [Acredita.Credito("n", "M", 70, "2021-12-25", "o", 0.0, "No", b, "0", "r") for b in bonos.tolist()]
+    segundos = cronometrar(lambda: [(c.bdh(), c.ptv_mma()) for c in creditos])
+    resultados.agregar("bdh_ptv_mma_por_objeto", filas / segundos, "filas/s", True)
+    segundos = cronometrar(lambda: Acredita.evaluarColumnas(bono=bonos))
+    resultados.agregar("bdh_ptv_mma_vectorizado", filas / segundos, "filas/s", True)
+
+
+def benchLote(resultados, escala):
+    print("procesamiento por lotes")
+    filas = max(1, int(200_000 * escala))
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, "registros.csv")
+        with open(entrada, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["nombre", "sexo", "edad", "fecha", "ocupacion", "ingresos", "enfermedades", "bono", "cedula", "residencia"])
+            for i in range(filas):
+                fecha = (datetime.date(2021, 1, 1) + datetime.timedelta(i % 365)).isoformat()
+                escritor.writerow([f"n{i}", "MF"[i % 2], 18 + i % 80, fecha, "o", 100, ("Si", "No")[i % 2], i % 60, f"{i:010d}", "r"])
+        for procesos in (1, None):
+            salida = os.path.join(directorio, "resultados.jsonl")
+            segundos = cronometrar(lambda: Acredita.procesarLote(entrada, salida, procesos=procesos, tamanoBloque=10_000), rondas=1)
+            resultados.agregar(f"lote_{'1_proceso' if procesos == 1 else 'todos_los_procesos'}", filas / segundos, "filas/s", True)
+
+
+BENCHMARKS = {
+    "poblacion": benchPoblacion,
+    "consultas": benchConsultas,
+    "en_linea": benchEnLinea,
+    "credito": benchCredito,
+    "lote": benchLote,
+}
+
+
+def metadatos():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"fecha": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()}
+
+
+def comparar(actual, base, tolerancia):
+    """Imprime la variación de cada métrica y devuelve las que empeoran más que la tolerancia"""
+    regresiones = []
+    print(f"\ncomparación con la línea base ({base['metadatos'].get('commit')}, {base['metadatos'].get('fecha')})")
+    for nombre, metrica in actual["metricas"].items():
+        anterior = base["metricas"].get(nombre)
+        if anterior is None or not anterior["valor"]:
+            continue
+        cambio = metrica["valor"] / anterior["valor"] - 1
+        # variación positiva = mejora
+        mejora = cambio if metrica["mayorEsMejor"] else -cambio
+        marca = "REGRESIÓN" if mejora < -tolerancia else ""
+        print(f"  {nombre:45s} {mejora:+8.1%} {marca}")
+        if marca:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--solo", nargs="+", choices=sorted(BENCHMARKS), help="ejecutar solo estos benchmarks")
+    parser.add_argument("--escala", type=float, default=1.0, help="factor del tamaño de los datos (p. ej. 0.1 para una prueba rápida)")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", nargs="?", const=LINEA_BASE, help="línea base con la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="empeoramiento relativo máximo permitido")
+    parser.add_argument("--guardar-linea-base", action="store_true", help=f"guardar los resultados en {LINEA_BASE}")
+    argumentos = parser.parse_args()
+
+    # carga numpy y dateutil antes de medir, el costo de importarlos lo mide bench_arranque.py
+    Acredita.calcularFeriados("EC-SD", 2000)
+    resultados = Resultados()
+    for nombre in argumentos.solo or BENCHMARKS:
+        BENCHMARKS[nombre](resultados, argumentos.escala)
+    documento = {"metadatos": dict(metadatos(), escala=argumentos.escala), "metricas": resultados.metricas}
+
+    for ruta in filter(None, (argumentos.salida, argumentos.guardar_linea_base and LINEA_BASE)):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(documento, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        if base["metadatos"].get("escala") != argumentos.escala:
+            print(f"aviso: la línea base se midió con escala {base['metadatos'].get('escala')}", file=sys.stderr)
+        if comparar(documento, base, argumentos.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Acredita  # noqa: E402
+
+
+@pytest.fixture
+def estadoGlobal(monkeypatch):
+    """Índice de feriados y umbrales propios de la prueba, que se restauran al terminar"""
+    monkeypatch.setattr(Acredita, "INDICE_FERIADOS", Acredita.IndiceFeriados())
+    monkeypatch.setattr(Acredita, "UMBRALES", dict(Acredita.UMBRALES))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import Acredita
+
+
+CEDULAS = [
+    ("1710034065", Acredita.CEDULA_VALIDA),
+    ("0926687856", Acredita.CEDULA_VALIDA),
+    ("3050000003", Acredita.CEDULA_VALIDA),
+    ("2400000002", Acredita.CEDULA_VALIDA),
+    ("1710034064", Acredita.CEDULA_VERIFICADOR),
+    ("0926687855", Acredita.CEDULA_VERIFICADOR),
+    ("1760034065", Acredita.CEDULA_TIPO),
+    ("2510034065", Acredita.CEDULA_PROVINCIA),
+    ("0010034065", Acredita.CEDULA_PROVINCIA),
+    ("171003406", Acredita.CEDULA_FORMATO),
+    ("17100340655", Acredita.CEDULA_FORMATO),
+    ("17100340a5", Acredita.CEDULA_FORMATO),
+    ("", Acredita.CEDULA_FORMATO),
+    ("１７１００３４０６５", Acredita.CEDULA_FORMATO),
+]
+
+
+@pytest.mark.parametrize("cedula, codigo", CEDULAS)
+def test_cedula_individual(cedula, codigo):
+    assert Acredita.esCedulaValida(cedula) == (codigo == Acredita.CEDULA_VALIDA)
+
+
+def test_cedulas_vectorizadas():
+    cedulas, codigos = zip(*CEDULAS)
+    assert Acredita.verificarCedulas(list(cedulas)).tolist() == list(codigos)
+    assert Acredita.validarCedulas(list(cedulas)).tolist() == [c == Acredita.CEDULA_VALIDA for c in codigos]
+
+
+def test_cedulas_vectorizadas_equivalen_a_la_verificacion_individual():
+    aleatorio = np.random.default_rng(0)
+    cedulas = [f"{n:010d}" for n in aleatorio.integers(0, 10 ** 10, 20000).tolist()]
+    cedulas += ["1710034065 ", " 1710034065", "17100340-5", "1710034065\n"]
+    assert Acredita.validarCedulas(cedulas).tolist() == [Acredita.esCedulaValida(c) for c in cedulas]
+    assert Acredita.verificarCedulas([]).tolist() == []
+
+
+def _credito(cedula, nombre="n"):
+    return Acredita.Credito(nombre, "F", 70, "2024-01-02", "o", 0.0, "No", 20.0, cedula, "r")
+
+
+def test_indice_de_cedulas_detecta_duplicados_e_invalidas():
+    a, b, c, d = _credito("1710034065", "a"), _credito(" 1710034065", "b"), _credito("0926687856", "c"), _credito("1710034064", "d")
+    indice = Acredita.IndiceCedulas([a, c, d])
+    assert len(indice) == 3
+    assert not indice.duplicados()
+    assert indice.agregar(b)
+    assert len(indice) == 3
+    assert "1710034065" in indice and "1710034066" not in indice
+    assert indice.buscar("1710034065 ") is a
+    assert indice.registros("1710034065") == [a, b]
+    assert indice.registros("0926687856") == [c]
+    assert indice.registros("0000000000") == []
+    assert indice.duplicados() == {"1710034065": [a, b]}
+    assert indice.invalidas() == ["1710034064"]
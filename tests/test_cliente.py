@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+import Acredita
+
+
+class _ServidorFeriados(http.server.BaseHTTPRequestHandler):
+    """Imita la API de abstractapi: responde los estados de `estados` y después Navidad y Año Nuevo"""
+    estados = []
+    peticiones = 0
+    demora = 0.0
+    activas = 0
+    maximoActivas = 0
+    candado = threading.Lock()
+
+    def do_GET(self):
+        clase = type(self)
+        with clase.candado:
+            clase.peticiones += 1
+            clase.activas += 1
+            clase.maximoActivas = max(clase.maximoActivas, clase.activas)
+            estado = self.estados.pop(0) if self.estados else 200
+        time.sleep(self.demora)
+        with clase.candado:
+            clase.activas -= 1
+        anio = self.path.split("year=")[1].split("&")[0]
+        cuerpo = json.dumps([{"date": f"01/01/{anio}"}, {"date": f"12/25/{anio}"}] if estado == 200 else {}).encode()
+        self.send_response(estado)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    _ServidorFeriados.estados = []
+    _ServidorFeriados.peticiones = _ServidorFeriados.maximoActivas = 0
+    _ServidorFeriados.demora = 0.0
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ServidorFeriados)
+    threading.Thread(target=servidor.serve_forever, args=(0.01,), daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}/"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+API_2021 = frozenset({datetime.date(2021, 1, 1), datetime.date(2021, 12, 25)})
+
+
+def _cliente(url, **kwargs):
+    kwargs.setdefault("apiKey", "prueba")
+    return Acredita.ClienteFeriadosEnLinea(url=url, espera=0, transporte=Acredita.TransporteRequests(1), **kwargs)
+
+
+def _respaldo(anio):
+    return frozenset(Acredita.INDICE_FERIADOS.feriadosDelAnio("EC-SD", anio))
+
+
+def test_cliente_reintenta_errores_transitorios(servidor):
+    _ServidorFeriados.estados = [503, 429]
+    cliente = _cliente(servidor, reintentos=2)
+    assert cliente.feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 3
+    # la respuesta queda en memoria
+    assert cliente.esFeriado(datetime.date(2021, 12, 25))
+    assert _ServidorFeriados.peticiones == 3
+
+
+def test_cliente_usa_respaldo_y_lo_vuelve_a_intentar(servidor):
+    _ServidorFeriados.estados = [500, 500]
+    cliente = _cliente(servidor, reintentos=1, reintentoRespaldo=60)
+    assert cliente.feriadosDelAnio(2021) == _respaldo(2021)
+    # mientras el respaldo está vigente no se consulta la API
+    assert cliente.feriadosDelAnio(2021) == _respaldo(2021)
+    assert _ServidorFeriados.peticiones == 2
+
+    _ServidorFeriados.estados = [500, 500]
+    cliente = _cliente(servidor, reintentos=1, reintentoRespaldo=0)
+    assert cliente.feriadosDelAnio(2021) == _respaldo(2021)
+    # el respaldo caducó y la API ya responde
+    assert cliente.feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 5
+
+
+def test_cliente_sin_clave_usa_respaldo(servidor, monkeypatch):
+    monkeypatch.delenv("ABSTRACTAPI_KEY", raising=False)
+    assert _cliente(servidor, apiKey=None).feriadosDelAnio(2021) == _respaldo(2021)
+    assert _ServidorFeriados.peticiones == 0
+    monkeypatch.setenv("ABSTRACTAPI_KEY", "entorno")
+    assert _cliente(servidor, apiKey=None).feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 1
+
+
+def test_cliente_respeta_ttl_en_memoria(servidor):
+    cliente = _cliente(servidor, ttl=0)
+    assert cliente.feriadosDelAnio(2021) == API_2021
+    assert cliente.feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 2
+
+
+def test_cliente_cache_en_disco_con_ttl(servidor, tmp_path):
+    assert _cliente(servidor, directorioCache=str(tmp_path)).feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 1
+    # otro cliente lee el disco sin consultar la API
+    assert _cliente(servidor, directorioCache=str(tmp_path)).feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 1
+
+    ruta = tmp_path / "feriados-EC-2021.json"
+    guardado = json.loads(ruta.read_text(encoding="utf-8"))
+    guardado["guardado"] -= 7200
+    ruta.write_text(json.dumps(guardado), encoding="utf-8")
+    assert _cliente(servidor, directorioCache=str(tmp_path), ttl=3600).feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 2
+    # la respuesta de respaldo no se guarda en disco
+    _ServidorFeriados.estados = [500]
+    _cliente(servidor, directorioCache=str(tmp_path), reintentos=0).feriadosDelAnio(2022)
+    assert not (tmp_path / "feriados-EC-2022.json").exists()
+
+
+@pytest.mark.parametrize("contenido", ["[]", "{}", '{"guardado": 1e18}', '{"guardado": "ayer", "fechas": []}',
+                                       '{"guardado": 1e18, "fechas": ["2021-13-01"]}', "no es JSON"])
+def test_cliente_cache_en_disco_invalida_es_un_fallo(servidor, tmp_path, contenido):
+    (tmp_path / "feriados-EC-2021.json").write_text(contenido, encoding="utf-8")
+    assert _cliente(servidor, directorioCache=str(tmp_path)).feriadosDelAnio(2021) == API_2021
+    assert _ServidorFeriados.peticiones == 1
+
+
+def test_consultas_asincronas_simultaneas_comparten_la_peticion(servidor):
+    _ServidorFeriados.demora = 0.2
+    cliente = _cliente(servidor, peticionesPorSegundo=None)
+
+    async def consultar():
+        return await asyncio.gather(cliente.feriadosDelAnioAsync(2021), cliente.feriadosDelAnioAsync(2021))
+
+    assert asyncio.run(consultar()) == [API_2021, API_2021]
+    assert _ServidorFeriados.peticiones == 1
+
+
+def test_descargas_asincronas_respetan_concurrencia_y_tasa(servidor):
+    _ServidorFeriados.demora = 0.1
+    cliente = _cliente(servidor, concurrencia=2, peticionesPorSegundo=20)
+    inicio = time.perf_counter()
+
+    async def consultar():
+        return await asyncio.gather(*(cliente.feriadosDelAnioAsync(a) for a in range(2020, 2026)))
+
+    asyncio.run(consultar())
+    assert _ServidorFeriados.peticiones == 6
+    assert _ServidorFeriados.maximoActivas <= 2
+    # seis peticiones a 20 por segundo necesitan al menos cinco intervalos de 50 ms
+    assert time.perf_counter() - inicio >= 0.25
+
+
+def test_resolver_feriados_en_linea_descarga_cada_anio_una_vez(servidor, monkeypatch):
+    monkeypatch.setattr(Acredita, "_CLIENTE_EN_LINEA", _cliente(servidor, peticionesPorSegundo=None))
+    fechas = ["2021-12-25", "2021-12-24", datetime.date(2022, 1, 1), "2022-01-01", "2021-01-01"]
+    assert asyncio.run(Acredita.resolverFeriadosAsync(fechas, enLinea=True)) == [True, False, True, True, True]
+    assert _ServidorFeriados.peticiones == 2
@@ -0,0 +1,107 @@
+import datetime
+
+import pytest
+
+import Acredita
+
+DESDE, HASTA = 2023, 2025
+PRIMERO, ULTIMO = datetime.date(DESDE, 1, 1), datetime.date(HASTA, 12, 31)
+UN_DIA = datetime.timedelta(days=1)
+
+
+@pytest.fixture(scope="module")
+def indice():
+    return Acredita.IndiceFeriados(DESDE, HASTA)
+
+
+@pytest.fixture(scope="module", params=["EC-SD", "EC-P", "EC-G"])
+def calendario(request):
+    """(provincia, conjunto de días hábiles calculado día por día)"""
+    prov = request.param
+    feriados = {datetime.date.fromordinal(o) for o in Acredita.compilarFeriados(prov, DESDE, HASTA)}
+    habiles = set()
+    dia = PRIMERO
+    while dia <= ULTIMO:
+        if dia.weekday() < 5 and dia not in feriados:
+            habiles.add(dia)
+        dia += UN_DIA
+    return prov, habiles
+
+
+def _fechas(paso=11):
+    return [PRIMERO + datetime.timedelta(days=d) for d in range(0, (ULTIMO - PRIMERO).days + 1, paso)] + [ULTIMO]
+
+
+def _nEsimo(habiles, fecha, n):
+    """n-ésimo día hábil desde la fecha (incluida), o None si queda fuera del índice"""
+    while fecha <= ULTIMO:
+        if fecha in habiles:
+            n -= 1
+            if not n:
+                return fecha
+        fecha += UN_DIA
+    return None
+
+
+def test_es_dia_habil(indice, calendario):
+    prov, habiles = calendario
+    for fecha in _fechas(1):
+        assert indice.esDiaHabil(prov, fecha) == (fecha in habiles)
+
+
+def test_dias_habiles_entre(indice, calendario):
+    prov, habiles = calendario
+    fechas = _fechas(37)
+    for inicio in fechas:
+        for fin in fechas:
+            esperado = sum(1 for d in habiles if inicio <= d <= fin)
+            assert indice.diasHabilesEntre(prov, inicio, fin) == esperado
+    assert indice.diasHabilesEntre(prov, PRIMERO, ULTIMO) == len(habiles)
+    with pytest.raises(ValueError):
+        indice.diasHabilesEntre(prov, PRIMERO - UN_DIA, ULTIMO)
+    with pytest.raises(ValueError):
+        indice.diasHabilesEntre(prov, PRIMERO, ULTIMO + UN_DIA)
+
+
+def test_sumar_dias_habiles(indice, calendario):
+    prov, habiles = calendario
+    for fecha in _fechas():
+        for n in (1, 2, 5, 23):
+            esperado = _nEsimo(habiles, fecha + UN_DIA, n)
+            if esperado is None:
+                with pytest.raises(ValueError):
+                    indice.sumarDiasHabiles(prov, fecha, n)
+            else:
+                assert indice.sumarDiasHabiles(prov, fecha, n) == esperado
+    with pytest.raises(ValueError):
+        indice.sumarDiasHabiles(prov, PRIMERO, 0)
+
+
+@pytest.mark.parametrize("incluir", [False, True])
+def test_siguiente_dia_habil(indice, calendario, incluir):
+    prov, habiles = calendario
+    for fecha in _fechas(1):
+        esperado = _nEsimo(habiles, fecha if incluir else fecha + UN_DIA, 1)
+        if esperado is None:
+            with pytest.raises(ValueError):
+                indice.siguienteDiaHabil(prov, fecha, incluir)
+        else:
+            assert indice.siguienteDiaHabil(prov, fecha, incluir) == esperado
+
+
+def test_dia_habil_del_mes(indice, calendario):
+    prov, habiles = calendario
+    for anio in range(DESDE, HASTA + 1):
+        for mes in range(1, 13):
+            delMes = sorted(d for d in habiles if (d.year, d.month) == (anio, mes))
+            for n in range(1, 25):
+                assert indice.diaHabilDelMes(prov, anio, mes, n) == (delMes[n - 1] if n <= len(delMes) else None)
+    with pytest.raises(ValueError):
+        indice.diaHabilDelMes(prov, HASTA, 12, 0)
+    with pytest.raises(ValueError):
+        indice.diaHabilDelMes(prov, HASTA + 1, 1, 1)
+
+
+def test_dia_habil_del_mes_en_el_ultimo_mes_del_indice():
+    assert Acredita.INDICE_FERIADOS.diaHabilDelMes("EC-SD", 2100, 12, 30) is None
+    assert Acredita.INDICE_FERIADOS.diaHabilDelMes("EC-SD", 1990, 1, 30) is None
@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+import Acredita
+
+VALIDAS = ["2021-04-02", "2000-02-29", "1990-01-01", "2100-12-31", "0001-01-01"]
+INVALIDAS = ["2021-4-02", "2021/04/02", "2021-02-29", "2021-13-01", "2021-00-10", "", "2021-04-02 ", "２０２１-04-02",
+             "+021-04-02", "2021-04-0a", None, 20210402]
+
+
+@pytest.mark.parametrize("valor", VALIDAS)
+def test_ordinal_fecha_valida(valor):
+    assert Acredita.ordinalFecha(valor) == datetime.date.fromisoformat(valor).toordinal()
+
+
+@pytest.mark.parametrize("valor", INVALIDAS)
+def test_ordinal_fecha_invalida(valor):
+    with pytest.raises(ValueError, match="AAAA-MM-DD"):
+        Acredita.ordinalFecha(valor)
+
+
+def test_validar_fechas_devuelve_ordinales():
+    valores = VALIDAS * 3
+    assert Acredita.validarFechas(valores).tolist() == [datetime.date.fromisoformat(v).toordinal() for v in valores]
+
+
+def test_error_fechas_lista_todas_las_filas_invalidas():
+    valores = []
+    for i in range(60):
+        valores.append(INVALIDAS[i % 10] if i % 3 == 1 else VALIDAS[i % 5])
+    with pytest.raises(Acredita.ErrorFechas) as error:
+        Acredita.validarFechas(valores)
+    assert error.value.filas == list(range(1, 60, 3))
+    assert isinstance(error.value, ValueError)
+    # el mensaje muestra las primeras 20 filas
+    assert "20 filas inválidas" in str(error.value)
+    ordinales = error.value.ordinales.tolist()
+    for fila, valor in enumerate(valores):
+        esperado = 0 if fila % 3 == 1 else datetime.date.fromisoformat(valor).toordinal()
+        assert ordinales[fila] == esperado
+
+
+def test_setter_de_fecha_guarda_el_ordinal():
+    persona = Acredita.PersonaBono("n", "M", 70, "2021-12-25", "o", 0.0, "No")
+    assert persona.fechaOrdinal == datetime.date(2021, 12, 25).toordinal()
+    persona.fecha = "2022-01-03"
+    assert persona.fecha == "2022-01-03"
+    assert persona.fechaOrdinal == datetime.date(2022, 1, 3).toordinal()
+    with pytest.raises(ValueError):
+        persona.fecha = "03/01/2022"
+    # una fecha inválida no reemplaza la anterior
+    assert persona.fechaOrdinal == datetime.date(2022, 1, 3).toordinal()
@@ -0,0 +1,90 @@
+import csv
+import datetime
+import json
+
+import pytest
+
+import Acredita
+
+
+class _ClienteFalso:
+    """Reemplaza la API en línea: Navidad y Año Nuevo son feriado"""
+
+    def __init__(self):
+        self.consultas = 0
+
+    def esFeriado(self, fecha):
+        self.consultas += 1
+        return (fecha.month, fecha.day) in ((1, 1), (12, 25))
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    cliente = _ClienteFalso()
+    monkeypatch.setattr(Acredita, "_CLIENTE_EN_LINEA", cliente)
+    return cliente
+
+
+def _escribirRegistros(ruta, cantidad):
+    columnas = ["nombre", "sexo", "edad", "fecha", "ocupacion", "ingresos", "enfermedades", "bono", "cedula",
+                "residencia", "seguroSocial", "online"]
+    inicio = datetime.date(2021, 1, 1).toordinal()
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(columnas)
+        for i in range(cantidad):
+            escritor.writerow([f"N{i}", "MF"[i % 2], 20 + i % 60, datetime.date.fromordinal(inicio + i % 365).isoformat(),
+                               "o", 100, "Si" if i % 11 == 0 else "No", "" if i % 4 == 0 else 20 + i % 30,
+                               str(1700000000 + i), "R", "true" if i % 3 == 0 else "false",
+                               "true" if i % 7 == 0 else ""])
+
+
+def _leer(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+
+def _sinUmbrales(ruta):
+    filas = _leer(ruta)
+    for fila in filas:
+        if fila["dependencias"]:
+            fila["dependencias"].pop("umbrales", None)
+    return filas
+
+
+def test_reevaluacion_incremental_igual_a_evaluacion_completa(estadoGlobal, cliente, tmp_path):
+    entrada, estado, completo = (str(tmp_path / n) for n in ("entrada.csv", "estado.jsonl", "completo.jsonl"))
+    _escribirRegistros(entrada, 1500)
+    Acredita.procesarLote(entrada, estado, procesos=1, tamanoBloque=200, dependencias=True)
+
+    cambios = [
+        {"agregados": ["2021-03-15", "2021-06-07"], "quitados": ["2021-12-25"], "umbrales": {"bdh": 40}},
+        {"quitados": ["2021-03-15"], "umbrales": {"bdh": 30, "ptv_mma": 25}},
+        {"prov": "EC-P", "agregados": ["2021-07-01"]},
+    ]
+    for cambio in cambios:
+        antes = _leer(estado)
+        diferencias = str(tmp_path / "diferencias.jsonl")
+        reevaluados, cambiados = Acredita.reevaluarIncremental(estado, cambio, diferencias)
+        assert reevaluados > 0 or cambio.get("prov") == "EC-P"
+        Acredita.procesarLote(entrada, completo, procesos=1, tamanoBloque=200, dependencias=True)
+        assert _sinUmbrales(estado) == _sinUmbrales(completo)
+        # cada resultado que cambió aparece una vez en las diferencias
+        despues = _leer(estado)
+        esperadas = [{"fila": a["fila"], "cedula": a["cedula"], "campo": campo, "antes": a[campo], "despues": d[campo]}
+                     for a, d in zip(antes, despues) for campo in ("feriado", "bdh", "ptv_mma") if a[campo] != d[campo]]
+        assert _leer(diferencias) == esperadas
+        assert cambiados == len(esperadas)
+
+
+def test_registros_en_linea_no_se_reevaluan_por_cambios_de_feriados(estadoGlobal, cliente, tmp_path):
+    entrada, estado = str(tmp_path / "entrada.csv"), str(tmp_path / "estado.jsonl")
+    _escribirRegistros(entrada, 730)
+    Acredita.procesarLote(entrada, estado, procesos=1, dependencias=True)
+    cliente.consultas = 0
+    # fechas de registros en línea (i % 7 == 0) y sin conexión
+    fechas = [datetime.date(2021, 1, 1) + datetime.timedelta(days=d) for d in range(0, 28)]
+    reevaluados, _ = Acredita.reevaluarIncremental(estado, {"agregados": [f.isoformat() for f in fechas]})
+    assert cliente.consultas == 0
+    locales = sum(1 for i in range(730) if i % 7 and i % 365 < 28)
+    assert reevaluados == locales
@@ -0,0 +1,120 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import Acredita
+
+DESDE, HASTA = 2020, 2026
+
+
+@pytest.fixture
+def guardados(monkeypatch):
+    """Lista de las rutas que IndiceFeriados.guardar escribe durante la prueba"""
+    rutas = []
+    guardar = Acredita.IndiceFeriados.guardar
+
+    def contar(self, ruta, provincias=None):
+        rutas.append(ruta)
+        return guardar(self, ruta, provincias)
+
+    monkeypatch.setattr(Acredita.IndiceFeriados, "guardar", contar)
+    return rutas
+
+
+@pytest.fixture
+def agregarRegla():
+    """Agrega una regla a EC-SD durante la prueba (reglasProvincia guarda las reglas en caché)"""
+    nombre, reglas = Acredita.PROVINCIAS["EC-SD"]
+
+    def agregar(regla):
+        Acredita.PROVINCIAS["EC-SD"] = (nombre, reglas + (regla,))
+        Acredita.reglasProvincia.cache_clear()
+
+    yield agregar
+    Acredita.PROVINCIAS["EC-SD"] = (nombre, reglas)
+    Acredita.reglasProvincia.cache_clear()
+
+
+def _igual(a, b, prov):
+    assert np.array_equal(a.compilar(prov), b.compilar(prov))
+    assert np.array_equal(a._acumulado(prov), b._acumulado(prov))
+    assert a._nombresDe(prov) == b._nombresDe(prov)
+    for anio in range(DESDE, HASTA + 1):
+        assert a.feriadosDelAnio(prov, anio) == b.feriadosDelAnio(prov, anio)
+    assert a.diasHabilesEntre(prov, datetime.date(DESDE, 1, 1), datetime.date(HASTA, 12, 31)) == \
+        b.diasHabilesEntre(prov, datetime.date(DESDE, 1, 1), datetime.date(HASTA, 12, 31))
+
+
+def test_guardar_y_abrir_conserva_el_indice(tmp_path):
+    ruta = str(tmp_path / "calendarios.bin")
+    original = Acredita.IndiceFeriados(DESDE, HASTA)
+    original.guardar(ruta, ["EC-SD", "EC-P"])
+    abierto = Acredita.IndiceFeriados.abrir(ruta)
+    assert (abierto.desde, abierto.hasta) == (DESDE, HASTA)
+    for prov in ("EC-SD", "EC-P"):
+        # los arreglos se leen del archivo, sin copiarlos
+        assert not abierto._mapas[prov].flags.owndata and not abierto._mapas[prov].flags.writeable
+        _igual(original, abierto, prov)
+    # una provincia que no está en la instantánea se compila al pedirla
+    assert "EC-G" not in abierto._mapas
+    _igual(original, abierto, "EC-G")
+
+
+def test_abrir_rechaza_archivos_ajenos_o_de_otra_version(tmp_path, monkeypatch):
+    ruta = tmp_path / "calendarios.bin"
+    ruta.write_bytes(b"no es una instantanea de feriados" * 4)
+    with pytest.raises(ValueError, match="no es una instantánea"):
+        Acredita.IndiceFeriados.abrir(str(ruta))
+    Acredita.IndiceFeriados(DESDE, HASTA).guardar(str(ruta), ["EC-SD"])
+    monkeypatch.setattr(Acredita, "VERSION_COMPILADOR", Acredita.VERSION_COMPILADOR + 1)
+    with pytest.raises(ValueError, match="versión del compilador"):
+        Acredita.IndiceFeriados.abrir(str(ruta))
+
+
+def test_modificar_un_indice_abierto_con_mmap(tmp_path):
+    ruta = str(tmp_path / "calendarios.bin")
+    Acredita.IndiceFeriados(DESDE, HASTA).guardar(ruta, ["EC-SD"])
+    abierto = Acredita.IndiceFeriados.abrir(ruta)
+    enMemoria = Acredita.IndiceFeriados(DESDE, HASTA)
+    agregado, quitado = datetime.date(2024, 3, 4), datetime.date(2024, 12, 25)
+    mapaAnterior = abierto.compilar("EC-SD")
+    for indice in (abierto, enMemoria):
+        indice.modificar("EC-SD", [agregado], [quitado], nombre="Decreto")
+    _igual(enMemoria, abierto, "EC-SD")
+    assert abierto.esFeriado("EC-SD", agregado.toordinal())
+    assert not abierto.esFeriado("EC-SD", quitado.toordinal())
+    assert abierto.feriadosDelAnio("EC-SD", 2024)[agregado] == "Decreto"
+    # quien tenía el mapa anterior y el archivo no cambian
+    assert not mapaAnterior[agregado.toordinal() - abierto._inicio]
+    _igual(Acredita.IndiceFeriados(DESDE, HASTA), Acredita.IndiceFeriados.abrir(ruta), "EC-SD")
+
+
+def test_usar_instantanea_reutiliza_o_regenera_el_archivo(tmp_path, monkeypatch, guardados, agregarRegla):
+    monkeypatch.setattr(Acredita, "INDICE_FERIADOS", Acredita.INDICE_FERIADOS)
+    ruta = str(tmp_path / "calendarios.bin")
+
+    indice = Acredita.usarInstantanea(ruta, DESDE, HASTA)
+    assert Acredita.INDICE_FERIADOS is indice
+    assert set(indice._mapas) == set(Acredita.PROVINCIAS)
+    assert len(guardados) == 1
+    Acredita.usarInstantanea(ruta, DESDE, HASTA)
+    assert len(guardados) == 1
+
+    # otros años
+    assert (Acredita.usarInstantanea(ruta, DESDE, HASTA + 1).hasta, len(guardados)) == (HASTA + 1, 2)
+    # otra versión del formato
+    monkeypatch.setattr(Acredita, "FORMATO_INSTANTANEA", Acredita.FORMATO_INSTANTANEA + 1)
+    Acredita.usarInstantanea(ruta, DESDE, HASTA + 1)
+    assert len(guardados) == 3
+    # otra versión del compilador
+    monkeypatch.setattr(Acredita, "VERSION_COMPILADOR", Acredita.VERSION_COMPILADOR + 1)
+    Acredita.usarInstantanea(ruta, DESDE, HASTA + 1)
+    assert len(guardados) == 4
+    # otras reglas
+    agregarRegla(Acredita.Regla("Nuevo", 3, 4))
+    indice = Acredita.usarInstantanea(ruta, DESDE, HASTA + 1)
+    assert len(guardados) == 5
+    assert indice.esFeriado("EC-SD", datetime.date(2024, 3, 4).toordinal())
+    Acredita.usarInstantanea(ruta, DESDE, HASTA + 1)
+    assert len(guardados) == 5
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+import Acredita
+
+
+def _registro(i, **cambios):
+    registro = {"nombre": f"n{i}", "sexo": "MF"[i % 2], "edad": 30 + i, "fecha": f"2021-12-{20 + i:02d}",
+                "ocupacion": "o", "ingresos": 100, "enfermedades": "No", "bono": 20 + i, "cedula": str(1700000000 + i)}
+    registro.update(cambios)
+    return registro
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    """JSONL con líneas vacías entre los registros"""
+    ruta = tmp_path / "entrada.jsonl"
+    lineas = [json.dumps(_registro(i)) for i in range(6)]
+    lineas[2:2] = [""]
+    lineas[5:5] = ["", "   "]
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return str(ruta)
+
+
+def _filas(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+
+def test_leer_registros_numera_las_lineas_de_la_entrada(entrada):
+    filas = [(fila, registro["nombre"]) for fila, registro in Acredita.leerRegistros(entrada)]
+    assert filas == [(0, "n0"), (1, "n1"), (3, "n2"), (4, "n3"), (7, "n4"), (8, "n5")]
+    assert list(Acredita.leerRegistros(entrada, desde=4)) == [f for f in Acredita.leerRegistros(entrada) if f[0] >= 4]
+
+
+@pytest.mark.parametrize("escritas", [0, 1, 3, 5])
+def test_reanudar_continua_despues_de_la_ultima_fila(entrada, tmp_path, escritas):
+    completa, salida = str(tmp_path / "completa.jsonl"), str(tmp_path / "salida.jsonl")
+    Acredita.procesarLote(entrada, completa, procesos=1)
+    with open(completa, encoding="utf-8") as archivo:
+        lineas = archivo.readlines()
+    # salida interrumpida a mitad de una línea
+    with open(salida, "w", encoding="utf-8") as archivo:
+        archivo.writelines(lineas[:escritas])
+        archivo.write(lineas[escritas][:10])
+    Acredita.procesarLote(entrada, salida, procesos=1, tamanoBloque=2, reanudar=True)
+    assert _filas(salida) == _filas(completa)
+
+
+def test_reanudar_csv_respeta_desde(entrada, tmp_path):
+    completa, salida = str(tmp_path / "completa.csv"), str(tmp_path / "salida.csv")
+    Acredita.procesarLote(entrada, completa, procesos=1, desde=3)
+    with open(completa, encoding="utf-8") as archivo:
+        lineas = archivo.readlines()
+    with open(salida, "w", encoding="utf-8") as archivo:
+        archivo.writelines(lineas[:3])
+    Acredita.procesarLote(entrada, salida, procesos=1, desde=3, reanudar=True)
+    with open(salida, encoding="utf-8") as archivo:
+        assert archivo.readlines() == lineas
+    assert [linea.split(",")[0] for linea in lineas[1:]] == ["3", "4", "7", "8"]
+
+
+def test_un_registro_invalido_no_detiene_el_lote(tmp_path):
+    entrada, salida = tmp_path / "entrada.jsonl", str(tmp_path / "salida.jsonl")
+    registros = [_registro(0), _registro(1, edad=float("inf")), _registro(2, fecha="2021/12/22"), _registro(3, bono=None),
+                 {"nombre": "sin edad"}, _registro(5)]
+    entrada.write_text("".join(json.dumps(r) + "\n" for r in registros), encoding="utf-8")
+    assert Acredita.procesarLote(str(entrada), salida, procesos=1) == 6
+    errores = [fila["error"] is not None for fila in _filas(salida)]
+    assert errores == [False, True, True, False, True, False]
+
+
+def test_procesos_escriben_lo_mismo_que_un_proceso(tmp_path):
+    entrada = tmp_path / "entrada.jsonl"
+    entrada.write_text("".join(json.dumps(_registro(i % 8, edad=20 + i % 70)) + "\n" for i in range(500)), encoding="utf-8")
+    uno, varios = str(tmp_path / "uno.jsonl"), str(tmp_path / "varios.jsonl")
+    Acredita.procesarLote(str(entrada), uno, procesos=1, tamanoBloque=64)
+    Acredita.procesarLote(str(entrada), varios, procesos=2, tamanoBloque=64)
+    assert _filas(uno) == _filas(varios)
@@ -0,0 +1,124 @@
+import datetime
+import json
+
+import numpy as np
+import pytest
+
+import Acredita
+
+
+def _registros(cantidad, semilla=0):
+    aleatorio = np.random.default_rng(semilla)
+    inicio = datetime.date(2021, 1, 1).toordinal()
+    return [{"nombre": f"n{i}", "sexo": "MF"[i % 2], "edad": int(aleatorio.integers(18, 95)),
+             "fecha": datetime.date.fromordinal(inicio + int(aleatorio.integers(0, 730))).isoformat(),
+             "ocupacion": "o", "ingresos": 0, "enfermedades": "Si" if aleatorio.random() < 0.2 else "No",
+             "bono": round(float(aleatorio.uniform(0, 60)), 2), "cedula": str(1700000000 + i)}
+            for i in range(cantidad)]
+
+
+def test_reglas_por_defecto_equivalen_a_evaluar_registro(estadoGlobal):
+    Acredita.cambiarUmbrales(bdh=30.0)
+    registros = _registros(3000)
+    motor = Acredita.MotorReglas(Acredita.reglasPorDefecto())
+    resultados, errores = motor.evaluarLote(registros)
+    assert errores == [None] * len(registros)
+    for fila, registro in enumerate(registros):
+        esperado = Acredita.evaluarRegistro(fila, registro)
+        assert resultados["esHombre"][0][fila] == bool(esperado["esHombre"])
+        assert resultados["discapacidad"][0][fila] == bool(esperado["discapacidad"])
+        assert resultados["feriado"][0][fila] == esperado["feriado"]
+        # bdh y ptv_mma devuelven False si el bono no supera el umbral y None si lo supera
+        assert resultados["bdh"][0][fila] == (esperado["bdh"] is None)
+        assert resultados["ptv_mma"][0][fila] == (esperado["ptv_mma"] is None)
+
+
+def test_orden_por_costo_y_selectividad_sin_cambiar_el_resultado():
+    decisiones = {"credito": {"modo": "todas", "reglas": [
+        {"nombre": "adulto", "campo": "edad", "operador": ">=", "valor": 0},
+        {"nombre": "diaHabil", "campo": "fecha", "operador": "noFeriado"},
+        {"nombre": "bonoAlto", "campo": "bono", "operador": ">", "valor": 59}]}}
+    motor = Acredita.MotorReglas(decisiones)
+    # antes de medir, las comparaciones numéricas van antes que las consultas de feriados
+    assert motor.orden("credito") == ["adulto", "bonoAlto", "diaHabil"]
+    primero, _ = motor.evaluarLote(_registros(2000, 1))
+    # bonoAlto casi nunca se cumple, así que decide casi todos los registros
+    assert motor.orden("credito")[0] == "bonoAlto"
+    evaluadas = {e["regla"]: e["evaluadas"] for e in motor.estadisticas()["credito"]}
+    registros = _registros(2000, 2)
+    segundo, _ = motor.evaluarLote(registros)
+    despues = {e["regla"]: e["evaluadas"] for e in motor.estadisticas()["credito"]}
+    # las reglas siguientes solo ven los registros que bonoAlto no decidió
+    pendientes = sum(1 for r in registros if r["bono"] > 59)
+    assert despues["bonoAlto"] - evaluadas["bonoAlto"] == len(registros)
+    assert despues["adulto"] - evaluadas["adulto"] <= pendientes
+    # el mismo lote con un motor nuevo (orden declarado) da los mismos valores
+    nuevo, _ = Acredita.MotorReglas(decisiones).evaluarLote(registros)
+    assert np.array_equal(nuevo["credito"][0], segundo["credito"][0])
+
+
+def test_modo_alguna_y_regla_que_decide():
+    motor = Acredita.MotorReglas({"prioridad": {"modo": "alguna", "reglas": [
+        {"nombre": "mayor", "campo": "edad", "operador": ">=", "valor": 65},
+        {"nombre": "enfermo", "campo": "enfermedades", "operador": "==", "valor": "Si"}]}})
+    assert motor.evaluar({"edad": 70, "enfermedades": "No"}) == {"prioridad": (True, "mayor")}
+    assert motor.evaluar({"edad": 30, "enfermedades": "Si"}) == {"prioridad": (True, "enfermo")}
+    assert motor.evaluar({"edad": 30, "enfermedades": "No"}) == {"prioridad": (False, None)}
+    assert motor.decisiones == ["prioridad"]
+
+
+def test_explicar():
+    motor = Acredita.MotorReglas({
+        "bdh": {"reglas": [{"nombre": "bonoSobreUmbralBdh", "campo": "bono", "operador": ">", "valor": 28.2}]},
+        "credito": {"reglas": [{"nombre": "adulto", "campo": "edad", "operador": ">=", "valor": 18}]}})
+    assert motor.explicar({"bono": 20, "edad": 40}) == [
+        "bdh: False (bonoSobreUmbralBdh: bono > 28.2 no se cumple)",
+        "credito: True (se cumplen todas las reglas)"]
+
+
+def test_operador_en_y_valores_faltantes():
+    motor = Acredita.MotorReglas({
+        "edades": {"modo": "alguna", "reglas": [{"nombre": "edad", "campo": "edad", "operador": "en", "valor": [65, 70]}]},
+        "sexo": {"modo": "alguna", "reglas": [{"nombre": "sexo", "campo": "sexo", "operador": "en", "valor": ["F"]}]},
+        "bono": {"reglas": [{"nombre": "bono", "campo": "bono", "operador": "<=", "valor": 30}]}})
+    registros = [{"edad": "70", "sexo": "F", "bono": "10"}, {"edad": 65, "sexo": "M", "bono": 40},
+                 {"edad": 66, "sexo": "", "bono": ""}, {}, {"edad": "setenta", "bono": "x"}]
+    resultados, errores = motor.evaluarLote(registros)
+    assert resultados["edades"][0].tolist() == [True, True, False, False, False]
+    assert resultados["sexo"][0].tolist() == [True, False, False, False, False]
+    # un valor vacío o inválido no cumple ninguna regla
+    assert resultados["bono"][0].tolist() == [True, False, False, False, False]
+    assert errores[:4] == [None] * 4
+    assert "no es numérico" in errores[4]
+
+
+@pytest.mark.parametrize("decisiones", [
+    {"d": {"reglas": []}},
+    {"d": {"modo": "varias", "reglas": [{"campo": "edad", "operador": ">", "valor": 1}]}},
+    {"d": {"reglas": [{"campo": "edad", "operador": "~", "valor": 1}]}},
+    {"d": {"reglas": [{"campo": "edad", "operador": "en", "valor": 1}]}},
+    {"d": {"reglas": [{"operador": ">", "valor": 1}]}},
+])
+def test_decisiones_invalidas(decisiones):
+    with pytest.raises(ValueError):
+        Acredita.MotorReglas(decisiones)
+
+
+def test_procesar_lote_con_reglas(tmp_path):
+    reglas, entrada, salida = tmp_path / "reglas.json", tmp_path / "entrada.jsonl", str(tmp_path / "salida.jsonl")
+    reglas.write_text(json.dumps({"feriado": {"reglas": [
+        {"nombre": "navidad", "campo": "fecha", "operador": "feriado", "valor": "EC-SD"}]}}), encoding="utf-8")
+    entrada.write_text("".join(json.dumps({"cedula": str(i), "fecha": f}) + "\n"
+                               for i, f in enumerate(["2021-12-25", "2021-12-24", "24/12/2021"])), encoding="utf-8")
+    motor = Acredita.MotorReglas.desdeArchivo(str(reglas))
+    assert Acredita.procesarLoteReglas(str(entrada), salida, motor) == 3
+    with open(salida, encoding="utf-8") as archivo:
+        filas = [json.loads(linea) for linea in archivo]
+    assert [(f["feriado"], f["feriado_regla"]) for f in filas] == [(True, None), (False, "navidad"), (False, "navidad")]
+    assert [f["error"] is None for f in filas] == [True, True, False]
+
+
+@pytest.mark.parametrize("opcion", [["--procesos", "2"], ["--desde", "3"], ["--reanudar"], ["--dependencias"]])
+def test_reglas_rechaza_opciones_incompatibles(opcion):
+    with pytest.raises(SystemExit):
+        Acredita._argumentos(["--lote", "entrada.jsonl", "--reglas", "reglas.json"] + opcion)
@@ -0,0 +1,82 @@
+import collections
+import datetime
+
+import numpy as np
+import pytest
+
+import Acredita
+
+
+def test_asignar_pagos_respeta_capacidad_dias_habiles_y_fecha():
+    aleatorio = np.random.default_rng(0)
+    provincias = ["EC-SD", "EC-P", "EC-G"]
+    inicio = datetime.date(2024, 12, 1).toordinal()
+    registros = [(fila, {"cedula": str(1700000000 + fila), "sucursal": f"S{fila % 7}",
+                         "fecha": datetime.date.fromordinal(inicio + int(aleatorio.integers(0, 40))).isoformat(),
+                         "prov": provincias[fila % 7 % 3] if fila % 5 else None})
+                 for fila in range(2000)]
+    registros.append((2000, {"cedula": "1", "sucursal": "S0", "fecha": "2024-12-02", "prov": "EC-G"}))
+    capacidades = {"S0": 3}
+    asignaciones = list(Acredita.asignarPagos(registros, capacidades, capacidadPorDefecto=5))
+
+    assert sorted(a["fila"] for a in asignaciones) == list(range(2001))
+    errores = [a for a in asignaciones if a["error"]]
+    assert [a["fila"] for a in errores] == [2000]
+    pagos = collections.Counter()
+    for asignacion in asignaciones:
+        if asignacion["error"]:
+            continue
+        prov = provincias[int(asignacion["sucursal"][1:]) % 3]
+        assert asignacion["prov"] == prov
+        solicitada = datetime.date.fromisoformat(asignacion["fechaSolicitada"])
+        pago = datetime.date.fromisoformat(asignacion["fechaPago"])
+        assert pago >= solicitada
+        assert Acredita.INDICE_FERIADOS.esDiaHabil(prov, pago)
+        primero = Acredita.INDICE_FERIADOS.siguienteDiaHabil(prov, solicitada, incluir=True)
+        assert asignacion["espera"] == Acredita.INDICE_FERIADOS.diasHabilesEntre(prov, primero, pago) - 1
+        pagos[asignacion["sucursal"], pago] += 1
+    for (sucursal, _), cantidad in pagos.items():
+        assert cantidad <= capacidades.get(sucursal, 5)
+
+
+def test_asignar_pagos_cuenta_la_capacidad_por_sucursal():
+    registros = [(fila, {"cedula": str(fila), "sucursal": "S1", "fecha": "2024-03-04",
+                         "prov": "EC-P" if fila % 2 else None}) for fila in range(6)]
+    asignaciones = list(Acredita.asignarPagos(registros, capacidadPorDefecto=1))
+    assert not any(a["error"] for a in asignaciones)
+    assert {a["prov"] for a in asignaciones} == {"EC-P"}
+    assert len({a["fechaPago"] for a in asignaciones}) == 6
+
+
+def test_asignar_pagos_rechaza_provincias_desconocidas():
+    registros = [(0, {"cedula": "0", "sucursal": "S1", "fecha": "2024-03-04", "prov": "EC-XX"}),
+                 (1, {"cedula": "1", "sucursal": "S1", "fecha": "2024-03-04"}),
+                 (2, {"cedula": "2", "sucursal": "S2", "fecha": "2024-03-04", "prov": "EC-XX"})]
+    indice = Acredita.INDICE_FERIADOS
+    asignaciones = {a["fila"]: a for a in Acredita.asignarPagos(registros)}
+    assert asignaciones[0]["error"] == asignaciones[2]["error"] == "Provincia desconocida: EC-XX"
+    assert asignaciones[0]["fechaPago"] is None
+    # la sucursal no queda asociada a la provincia rechazada
+    assert (asignaciones[1]["prov"], asignaciones[1]["error"]) == ("EC-SD", None)
+    assert "EC-XX" not in indice._mapas
+
+
+def test_asignar_pagos_fechas_invalidas_o_fuera_del_indice():
+    registros = [(0, {"cedula": "0", "fecha": "04/03/2024"}), (1, {"cedula": "1", "fecha": "2100-12-31"}),
+                 (2, {"cedula": "2", "fecha": "2100-12-31"}), (3, {"cedula": "3", "fecha": "1989-12-29"}),
+                 (4, {"cedula": "4", "fecha": "2024-03-04"})]
+    asignaciones = {a["fila"]: a for a in Acredita.asignarPagos(registros, capacidadPorDefecto=1)}
+    assert asignaciones[0]["error"] == Acredita.MENSAJE_FECHA
+    # el último día del índice solo tiene cupo para uno
+    assert (asignaciones[1]["fechaPago"], asignaciones[1]["error"]) == ("2100-12-31", None)
+    for fila in (2, 3):
+        assert asignaciones[fila]["fechaPago"] is None
+        assert "índice de feriados" in asignaciones[fila]["error"]
+    assert (asignaciones[4]["fechaPago"], asignaciones[4]["espera"]) == ("2024-03-04", 0)
+
+
+def test_capacidad_invalida():
+    with pytest.raises(ValueError):
+        list(Acredita.asignarPagos([], capacidades={"S1": 0}))
+    with pytest.raises(ValueError):
+        list(Acredita.asignarPagos([], capacidadPorDefecto=0))
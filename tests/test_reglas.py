@@ -0,0 +1,94 @@
+import collections
+import datetime
+
+import pytest
+
+import Acredita
+from Acredita import APR, AUG, DEC, JAN, JUL, MAY, NOV, OCT
+
+
+def _populateOriginal(prov, year):
+    """
+    HolidayEcuador._populate tal como estaba antes de la tabla de reglas, con
+    las fechas de Santo Domingo como date(year, mes, dia) y las de Pichincha y
+    Guayaquil evaluadas sobre su propia fecha. Devuelve {fecha: {nombres}}.
+    """
+    from dateutil.easter import easter
+    from dateutil.relativedelta import relativedelta as rd, FR
+    feriados = collections.defaultdict(set)
+
+    def ley858(fecha, nombre):
+        if year > 2015 and fecha.weekday() in (5, 1):
+            fecha -= datetime.timedelta(days=1)
+        elif year > 2015 and fecha.weekday() == 6:
+            fecha += datetime.timedelta(days=1)
+        elif year > 2015 and fecha.weekday() in (2, 3):
+            fecha += rd(weekday=FR)
+        feriados[fecha].add(nombre)
+
+    if prov == "EC-SD":
+        feriados[datetime.date(year, JUL, 3)].add("Cantonalización de Santo Domingo")
+        feriados[datetime.date(year, NOV, 6)].add("Provincialización de Santo Domingo")
+        feriados[datetime.date(year, AUG, 2)].add("Fiestas patronales")
+    feriados[datetime.date(year, JAN, 1)].add("Año Nuevo [New Year's Day]")
+    feriados[datetime.date(year, DEC, 25)].add("Navidad [Christmas]")
+    feriados[easter(year) + rd(weekday=FR(-1))].add("Semana Santa (Viernes Santo) [Good Friday)]")
+    feriados[easter(year)].add("Día de Pascuas [Easter Day]")
+    feriados[easter(year) - datetime.timedelta(days=48)].add("Lunes de carnaval [Carnival of Monday)]")
+    feriados[easter(year) - datetime.timedelta(days=47)].add("Martes de carnaval [Tuesday of Carnival)]")
+    ley858(datetime.date(year, MAY, 1), "Día Nacional del Trabajo [Labour Day]")
+    ley858(datetime.date(year, MAY, 24), "Batalla del Pichincha [Pichincha Battle]")
+    ley858(datetime.date(year, AUG, 10), "Primer Grito de la Independencia [First Cry of Independence]")
+    ley858(datetime.date(year, OCT, 9), "Independencia de Guayaquil [Guayaquil's Independence]")
+    fieles = "Día de los difuntos [Day of the Dead]"
+    noviembre3 = datetime.date(year, NOV, 3).weekday()
+    if datetime.date(year, NOV, 2).weekday() == 5 and noviembre3 == 6:
+        feriados[datetime.date(year, NOV, 1)].add(fieles)
+    elif noviembre3 in (3, 0):
+        feriados[datetime.date(year, NOV, 4)].add(fieles)
+    else:
+        feriados[datetime.date(year, NOV, 2)].add(fieles)
+    if prov == "EC-P":
+        ley858(datetime.date(year, DEC, 6), "Fundación de Quito [Foundation of Quito]")
+    return feriados
+
+
+@pytest.mark.parametrize("prov", ["EC-SD", "EC-P", None])
+def test_tabla_de_reglas_equivale_a_populate(prov):
+    # una provincia que no está en PROVINCIAS solo tiene los feriados nacionales
+    compilados = Acredita.compilarFeriados(prov, 1990, 2100)
+    esperados = {}
+    for anio in range(1990, 2101):
+        esperados.update(_populateOriginal(prov, anio))
+    obtenidos = {datetime.date.fromordinal(o): set(nombre.split("; ")) for o, nombre in compilados.items()}
+    assert obtenidos == esperados
+
+
+def test_calendario_provincial_agrega_sus_feriados():
+    nacionales = set(Acredita.compilarFeriados(None, 2024, 2024))
+    guayas = Acredita.calcularFeriados("EC-G", 2024)
+    assert set(d.toordinal() for d in guayas) - nacionales == {datetime.date(2024, JUL, 25).toordinal()}
+    assert datetime.date(2024, APR, 23) not in guayas
+
+
+@pytest.mark.parametrize("prov", sorted(Acredita.PROVINCIAS))
+def test_cada_provincia_tiene_los_feriados_nacionales_y_los_suyos(prov):
+    nacionales = Acredita.compilarFeriados(None, 2016, 2030)
+    provincia = Acredita.compilarFeriados(prov, 2016, 2030)
+    assert set(nacionales) <= set(provincia)
+    propios = {nombre for texto in provincia.values() for nombre in texto.split("; ")}
+    assert {regla.nombre for regla in Acredita.PROVINCIAS[prov][1]} <= propios
+
+
+def test_compilar_un_rango_equivale_a_compilar_cada_anio():
+    for prov in ("EC-SD", "EC-P", "EC-A"):
+        porAnio = {}
+        for anio in range(2010, 2031):
+            porAnio.update(Acredita.compilarFeriados(prov, anio, anio))
+        assert Acredita.compilarFeriados(prov, 2010, 2030) == porAnio
+
+
+def test_holiday_ecuador_usa_las_reglas_compiladas():
+    calendario = Acredita.HolidayEcuador(prov="EC-P", years=2024)
+    assert dict(calendario) == Acredita.calcularFeriados("EC-P", 2024)
+    assert datetime.date(2024, DEC, 6) in calendario
@@ -0,0 +1,112 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import Acredita
+
+
+@pytest.fixture
+def servicio():
+    servidor = Acredita.crearServicio(puerto=0, desde=2024, hasta=2024)
+    threading.Thread(target=servidor.serve_forever, args=(0.01,), daemon=True).start()
+    conexion = http.client.HTTPConnection("127.0.0.1", servidor.server_port, timeout=5)
+    yield conexion
+    conexion.close()
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(conexion, metodo, ruta, cuerpo=None):
+    """Hace una petición en la misma conexión (keep-alive) y devuelve (estado, JSON de la respuesta)"""
+    if cuerpo is not None and not isinstance(cuerpo, bytes):
+        cuerpo = json.dumps(cuerpo).encode()
+    conexion.request(metodo, ruta, body=cuerpo, headers={"Content-Type": "application/json"})
+    respuesta = conexion.getresponse()
+    return respuesta.status, json.loads(respuesta.read())
+
+
+REGISTRO = {"nombre": "Ana", "sexo": "F", "edad": 70, "fecha": "2024-12-25", "ocupacion": "o", "ingresos": 0,
+            "enfermedades": "No", "bono": 20, "cedula": "1710034065"}
+
+
+def test_evaluar(servicio):
+    estado, resultado = _pedir(servicio, "POST", "/evaluar?origen=prueba", REGISTRO)
+    assert estado == 200
+    assert resultado == Acredita.evaluarRegistro(0, REGISTRO)
+    assert resultado["feriado"] is True and resultado["error"] is None
+
+
+def test_evaluar_lote_informa_el_error_de_cada_registro(servicio):
+    registros = [REGISTRO, dict(REGISTRO, fecha="25/12/2024"), dict(REGISTRO, edad=1e400)]
+    cuerpo = json.dumps({"registros": registros}).replace("Infinity", "1e400").encode()
+    estado, respuesta = _pedir(servicio, "POST", "/evaluar/lote", cuerpo)
+    assert estado == 200
+    assert [r["error"] is None for r in respuesta["resultados"]] == [True, False, False]
+
+
+@pytest.mark.parametrize("ruta, cuerpo", [
+    ("/evaluar", b"[1, 2]"),
+    ("/evaluar", b"no es JSON"),
+    ("/evaluar/lote", {"registros": [REGISTRO, 3]}),
+    ("/evaluar/lote", {"registros": {"a": REGISTRO}}),
+    ("/evaluar/lote", {}),
+    ("/diasHabiles", b'"sumar"'),
+    ("/diasHabiles", {"operacion": "sumar", "fecha": "2024-01-02", "n": 1e30}),
+    ("/diasHabiles", {"operacion": "esHabil", "fecha": "2024-01-02", "prov": "EC-XX"}),
+    ("/diasHabiles", {"operacion": "dividir"}),
+    ("/diasHabiles/lote", {"consultas": "todas"}),
+])
+def test_peticiones_invalidas_responden_400(servicio, ruta, cuerpo):
+    estado, respuesta = _pedir(servicio, "POST", ruta, cuerpo)
+    assert estado == 400
+    assert respuesta["error"]
+    # la conexión sigue sirviendo
+    assert _pedir(servicio, "GET", "/salud") == (200, {"estado": "ok"})
+
+
+def test_dias_habiles_lote_informa_el_error_de_cada_consulta(servicio):
+    consultas = [{"operacion": "siguiente", "fecha": "2024-12-24"},
+                 {"operacion": "sumar", "fecha": "2024-01-02", "n": 1e30},
+                 {"operacion": "esHabil", "fecha": "2024-01-02", "prov": "EC-XX"},
+                 {"operacion": "delMes", "anio": 2024, "mes": 12, "n": 1, "prov": "EC-P"}]
+    estado, respuesta = _pedir(servicio, "POST", "/diasHabiles/lote", {"consultas": consultas})
+    assert estado == 200
+    resultados = respuesta["resultados"]
+    assert [r["resultado"] for r in resultados] == ["2024-12-26", None, None, "2024-12-02"]
+    assert [r["error"] is None for r in resultados] == [True, False, False, True]
+
+
+def test_ruta_desconocida_descarta_el_cuerpo(servicio):
+    estado, respuesta = _pedir(servicio, "POST", "/no/existe", {"registros": [REGISTRO] * 50})
+    assert estado == 404
+    # el cuerpo no leído no se interpreta como la siguiente petición
+    assert _pedir(servicio, "POST", "/evaluar", REGISTRO)[0] == 200
+    assert _pedir(servicio, "GET", "/tampoco")[0] == 404
+    assert _pedir(servicio, "GET", "/salud")[0] == 200
+
+
+def test_error_inesperado_responde_500(servicio, monkeypatch):
+    def fallar(fila, registro, dependencias=False):
+        raise RuntimeError("fallo")
+
+    monkeypatch.setattr(Acredita, "evaluarRegistro", fallar)
+    estado, respuesta = _pedir(servicio, "POST", "/evaluar", REGISTRO)
+    assert estado == 500
+    assert respuesta == {"error": "Error interno: RuntimeError"}
+    assert _pedir(servicio, "GET", "/estadisticas")[1]["/evaluar"]["errores"] == 1
+
+
+def test_estadisticas_cuentan_peticiones_y_errores(servicio):
+    _pedir(servicio, "POST", "/evaluar", REGISTRO)
+    _pedir(servicio, "POST", "/evaluar", b"[]")
+    _pedir(servicio, "POST", "/evaluar?x=1", REGISTRO)
+    _pedir(servicio, "POST", "/diasHabiles", {"operacion": "sumar", "fecha": "2024-01-02", "n": 1e30})
+    _pedir(servicio, "GET", "/uno")
+    _pedir(servicio, "POST", "/dos", REGISTRO)
+    estado, resumen = _pedir(servicio, "GET", "/estadisticas")
+    assert estado == 200
+    conteos = {ruta: (datos["peticiones"], datos["errores"]) for ruta, datos in resumen.items()}
+    assert conteos == {"/evaluar": (3, 1), "/diasHabiles": (1, 1), "desconocida": (2, 2)}
+    assert all(datos["p99_ms"] >= datos["p50_ms"] >= 0 for datos in resumen.values())